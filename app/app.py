@@ -7,8 +7,11 @@ from flask_cors import CORS
 from flask_migrate import upgrade
 
 from utils import setup_routes
+from compression import init_compression
 from config import create_app, db
 from models.user import User
+from services.prediction_service import init_prediction_triggers
+from services.scheduler import init_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,10 @@ setup_routes(app)
 
 CORS(app)
 
+init_compression(app)
+
+init_scheduler(app)
+
 # Swagger configuration
 SWAGGER_URL = "/swagger"
 API_URL = "/static/swagger.json"
@@ -49,4 +56,5 @@ if __name__ == "__main__":
     with app.app_context():
         upgrade()
         seed_admin()
+    init_prediction_triggers(app)
     app.run(host="0.0.0.0", port=5000, debug=True)
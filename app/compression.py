@@ -0,0 +1,129 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv"}
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data, level):
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def available_codecs():
+    """Codificações suportadas, em ordem de preferência do servidor."""
+    codecs = []
+    if brotli is not None:
+        codecs.append(("br", _brotli, "COMPRESS_LEVEL_BR", 4))
+    if zstandard is not None:
+        codecs.append(("zstd", _zstd, "COMPRESS_LEVEL_ZSTD", 3))
+    codecs.append(("gzip", _gzip, "COMPRESS_LEVEL_GZIP", 6))
+    return codecs
+
+
+# Sufixos que etag_route aceita em If-None-Match para variantes comprimidas.
+ENCODINGS = ("br", "zstd", "gzip")
+
+
+class CompressedCache:
+    """LRU de corpos comprimidos indexado por (ETag, codificação, nível).
+
+    Só recebe respostas com ETag forte, que já identifica o corpo por
+    completo; assim a mesma página pedida de novo não é recomprimida.
+    """
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data, max_items):
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+compressed_cache = CompressedCache()
+
+
+def _should_compress(response, config):
+    return (
+        config.get("COMPRESS_ENABLED", True)
+        and response.status_code == 200
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and (response.content_length or 0) >= config.get("COMPRESS_MIN_SIZE", 1024)
+    )
+
+
+def compress_response(response, config):
+    """Comprime o corpo conforme Accept-Encoding. Retorna a própria resposta."""
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if not _should_compress(response, config):
+        return response
+
+    codecs = {
+        name: (func, config.get(level_key, default))
+        for name, func, level_key, default in available_codecs()
+    }
+    encoding = request.accept_encodings.best_match(list(codecs))
+    if encoding is None:
+        return response
+    func, level = codecs[encoding]
+
+    etag, weak = response.get_etag()
+    key = (etag, encoding, level) if etag and not weak else None
+    data = compressed_cache.get(key) if key else None
+    if data is None:
+        data = func(response.get_data(), level)
+        if key:
+            compressed_cache.put(key, data, config.get("COMPRESS_CACHE_SIZE", 128))
+
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        # O corpo comprimido é outra representação: ETag forte distinto.
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
+
+
+def init_compression(app):
+    app.after_request(lambda response: compress_response(response, app.config))
@@ -5,6 +5,8 @@ from flask_migrate import Migrate
 from dotenv import load_dotenv
 import os
 
+from json_provider import FastJSONProvider
+
 load_dotenv()
 
 db = SQLAlchemy()
@@ -14,6 +16,7 @@ migrate = Migrate()
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
         "DATABASE_URL", "sqlite:///:memory:"
     )
@@ -21,6 +24,72 @@ def create_app():
     app.config["JWT_TOKEN_LOCATION"] = ["headers", "cookies"]
     app.config["JWT_HEADER_NAME"] = "Authorization"
     app.config["JWT_HEADER_TYPE"] = "Bearer"
+    app.config["SCREENER_ENGINE_ENABLED"] = (
+        os.getenv("SCREENER_ENGINE_ENABLED", "false").lower() == "true"
+    )
+    app.config["SCREENER_ENGINE_MAX_AGE"] = int(
+        os.getenv("SCREENER_ENGINE_MAX_AGE", "60")
+    )
+    app.config["DATASET_VERSION_CHECK_SECONDS"] = int(
+        os.getenv("DATASET_VERSION_CHECK_SECONDS", "5")
+    )
+    app.config["COMPRESS_ENABLED"] = (
+        os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    )
+    app.config["COMPRESS_MIN_SIZE"] = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    app.config["COMPRESS_LEVEL_GZIP"] = int(os.getenv("COMPRESS_LEVEL_GZIP", "6"))
+    app.config["COMPRESS_LEVEL_BR"] = int(os.getenv("COMPRESS_LEVEL_BR", "4"))
+    app.config["COMPRESS_LEVEL_ZSTD"] = int(os.getenv("COMPRESS_LEVEL_ZSTD", "3"))
+    app.config["COMPRESS_CACHE_SIZE"] = int(os.getenv("COMPRESS_CACHE_SIZE", "128"))
+    app.config["STATUSINVEST_BASE_URL"] = os.getenv(
+        "STATUSINVEST_BASE_URL", "https://statusinvest.com.br"
+    )
+    app.config["STATUSINVEST_PAGE_SIZE"] = int(
+        os.getenv("STATUSINVEST_PAGE_SIZE", "500")
+    )
+    app.config["STATUSINVEST_MAX_WORKERS"] = int(
+        os.getenv("STATUSINVEST_MAX_WORKERS", "4")
+    )
+    app.config["STATUSINVEST_TIMEOUT"] = float(os.getenv("STATUSINVEST_TIMEOUT", "15"))
+    app.config["INGESTION_HTTP_RETRIES"] = int(os.getenv("INGESTION_HTTP_RETRIES", "3"))
+    app.config["INGESTION_HTTP_BACKOFF"] = float(
+        os.getenv("INGESTION_HTTP_BACKOFF", "0.5")
+    )
+    app.config["INGESTION_HTTP_BACKOFF_MAX"] = float(
+        os.getenv("INGESTION_HTTP_BACKOFF_MAX", "8")
+    )
+    app.config["INGESTION_HTTP_CONNECT_TIMEOUT"] = float(
+        os.getenv("INGESTION_HTTP_CONNECT_TIMEOUT", "5")
+    )
+    app.config["INGESTION_HTTP_POOL_SIZE"] = int(
+        os.getenv("INGESTION_HTTP_POOL_SIZE", "10")
+    )
+    app.config["INGESTION_UPSERT_BATCH_SIZE"] = int(
+        os.getenv("INGESTION_UPSERT_BATCH_SIZE", "1000")
+    )
+    app.config["JOBS_MAX_WORKERS"] = int(os.getenv("JOBS_MAX_WORKERS", "1"))
+    app.config["INGESTION_LOCK_STALE_SECONDS"] = int(
+        os.getenv("INGESTION_LOCK_STALE_SECONDS", "3600")
+    )
+    app.config["SCHEDULER_ENABLED"] = (
+        os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+    )
+    app.config["SCHEDULER_TIMEZONE"] = os.getenv(
+        "SCHEDULER_TIMEZONE", "America/Sao_Paulo"
+    )
+    app.config["SCHEDULER_JITTER_SECONDS"] = int(
+        os.getenv("SCHEDULER_JITTER_SECONDS", "60")
+    )
+    # Expressões cron separadas por ";"; vazio desliga o job.
+    app.config["SCHEDULE_STOCKS"] = os.getenv(
+        "SCHEDULE_STOCKS", "*/15 10-17 * * 1-5; 0 21 * * *"
+    )
+    app.config["SCHEDULE_FIIS"] = os.getenv(
+        "SCHEDULE_FIIS", "*/30 10-17 * * 1-5; 30 21 * * *"
+    )
+    app.config["SCHEDULE_PREDICTIONS"] = os.getenv(
+        "SCHEDULE_PREDICTIONS", "0 22 * * 1-5"
+    )
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -0,0 +1,99 @@
+import dataclasses
+import decimal
+import json
+import math
+import uuid
+from datetime import date
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def _default(o):
+    """Tipos que nenhum dos dois encoders serializa sozinho."""
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return _finite(float(o))
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "item"):  # escalares NumPy
+        return _finite(o.item())
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _finite(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _sanitize(o):
+    """NaN/Infinity viram null, como no orjson (o stdlib geraria JSON inválido)."""
+    if isinstance(o, float):
+        return _finite(o)
+    if isinstance(o, dict):
+        return {k: _sanitize(v) for k, v in o.items()}
+    if isinstance(o, (list, tuple)):
+        return [_sanitize(v) for v in o]
+    return o
+
+
+class FastJSONProvider(JSONProvider):
+    """Provider JSON da aplicação.
+
+    Usa orjson quando instalado e o json da biblioteca padrão caso contrário,
+    com a mesma saída nos dois casos: chaves na ordem de inserção, NaN e
+    Infinity como null, datas em ISO 8601 e Decimal como número. As respostas
+    são montadas direto a partir dos bytes codificados.
+    """
+
+    mimetype = "application/json"
+    use_orjson = orjson is not None
+
+    def dumps_bytes(self, obj):
+        if self.use_orjson:
+            return orjson.dumps(
+                obj,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        try:
+            encoded = self._stdlib_dumps(obj)
+        except ValueError:
+            # Só percorre o objeto quando há NaN/Infinity a substituir.
+            encoded = self._stdlib_dumps(_sanitize(obj))
+        return encoded.encode("utf-8")
+
+    @staticmethod
+    def _stdlib_dumps(obj):
+        return json.dumps(
+            obj,
+            default=lambda o: _sanitize(_default(o)),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            return json.dumps(_sanitize(obj), **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,28 @@
+from config import db
+
+
+class AssetPercentile(db.Model):
+    """Percentil de uma métrica de um ativo no universo (pct) e dentro do
+    setor (sector_pct), de 0 a 100 em ordem crescente do valor.
+
+    Os índices (asset, metric, pct, ticker) tornam filtros como "P/L entre os
+    20% menores" uma varredura de intervalo.
+    """
+
+    __tablename__ = "asset_percentiles"
+    __table_args__ = (
+        db.Index("ix_asset_percentiles_pct", "asset", "metric", "pct", "ticker"),
+        db.Index(
+            "ix_asset_percentiles_sector_pct",
+            "asset",
+            "metric",
+            "sector_pct",
+            "ticker",
+        ),
+    )
+
+    asset = db.Column(db.String(16), primary_key=True)
+    ticker = db.Column(db.String(10), primary_key=True)
+    metric = db.Column(db.String(64), primary_key=True)
+    pct = db.Column(db.Float)
+    sector_pct = db.Column(db.Float)
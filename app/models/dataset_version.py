@@ -0,0 +1,19 @@
+from config import db
+
+
+class DatasetVersion(db.Model):
+    """Contador de versão de um conjunto de dados (stocks, fiis, predictions,
+    favoritos de cada usuário), incrementado a cada escrita."""
+
+    __tablename__ = "dataset_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime)
+
+    def to_json(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -3,6 +3,9 @@ from config import db
 
 class Favorite(db.Model):
     __tablename__ = "favorites"
+    __table_args__ = (
+        db.Index("uq_favorites_user_stock", "user_id", "stock_ticker", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -23,8 +26,8 @@ class Favorite(db.Model):
             f"ceiling_price={self.ceiling_price}, target_price={self.target_price})>"
         )
 
-    def to_json(self):
-        stock_json = self.stock.to_json() if self.stock else None
+    def to_json(self, stock_fields=None):
+        stock_json = self.stock.to_json(stock_fields) if self.stock else None
         return {
             "id": self.id,
             "user_id": self.user_id,
@@ -3,6 +3,9 @@ from config import db
 
 class FavoriteFii(db.Model):
     __tablename__ = "favorites_fii"
+    __table_args__ = (
+        db.Index("uq_favorites_fii_user_fii", "user_id", "fii_ticker", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -23,8 +26,8 @@ class FavoriteFii(db.Model):
             f"ceiling_price={self.ceiling_price}, target_price={self.target_price})>"
         )
 
-    def to_json(self):
-        fii_json = self.fii.to_json() if self.fii else None
+    def to_json(self, fii_fields=None):
+        fii_json = self.fii.to_json(fii_fields) if self.fii else None
         return {
             "id": self.id,
             "user_id": self.user_id,
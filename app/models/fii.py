@@ -3,6 +3,10 @@ from config import db
 
 class Fii(db.Model):
     __tablename__ = "fiis"
+    __table_args__ = (
+        db.Index("ix_fiis_dy", "dy", "ticker"),
+        db.Index("ix_fiis_p_vp", "p_vp", "ticker"),
+    )
 
     ticker = db.Column(db.String(10), primary_key=True)
     companyid = db.Column(db.String(80))
@@ -38,7 +42,9 @@ class Fii(db.Model):
             f"price={self.price})>"
         )
 
-    def to_json(self):
+    def to_json(self, fields=None):
+        if fields is not None:
+            return {field: getattr(self, field) for field in fields}
         return {
             "ticker": self.ticker,
             "companyid": self.companyid,
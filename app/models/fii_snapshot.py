@@ -0,0 +1,23 @@
+from config import db
+
+
+class FiiSnapshot(db.Model):
+    """Métricas de um FII na data de uma atualização (ver StockSnapshot)."""
+
+    __tablename__ = "fii_snapshots"
+    __table_args__ = (db.Index("ix_fii_snapshots_snapshot_date", "snapshot_date"),)
+
+    ticker = db.Column(db.String(10), primary_key=True)
+    snapshot_date = db.Column(db.Date, primary_key=True)
+    price = db.Column(db.Float)
+    dy = db.Column(db.Float)
+    p_vp = db.Column(db.Float)
+    valorpatrimonialcota = db.Column(db.Float)
+    liquidezmediadiaria = db.Column(db.Float)
+    percentualcaixa = db.Column(db.Float)
+    dividend_cagr = db.Column(db.Float)
+    cota_cagr = db.Column(db.Float)
+    numerocotistas = db.Column(db.Float)
+    numerocotas = db.Column(db.Float)
+    patrimonio = db.Column(db.Float)
+    lastdividend = db.Column(db.Float)
@@ -0,0 +1,39 @@
+from config import db
+
+
+class IngestionJob(db.Model):
+    """Execução de uma atualização (stocks, fiis) feita em segundo plano.
+
+    phase, rows e timings são atualizados pelo worker a cada etapa, de modo
+    que GET /v1/jobs/<id> acompanha o progresso.
+    """
+
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (db.Index("ix_ingestion_jobs_kind_status", "kind", "status"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    phase = db.Column(db.String(32), nullable=False, default="queued")
+    rows = db.Column(db.JSON)
+    timings = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "rows": self.rows or {},
+            "timings": self.timings or {},
+            "error": self.error,
+            "created_by": self.created_by,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,14 @@
+from config import db
+
+
+class IngestionLock(db.Model):
+    """Lock nomeado de uma atualização em bancos sem advisory locks (SQLite).
+
+    Existir a linha é estar com o lock; ela é apagada ao fim do job (ver
+    services.ingestion_lock).
+    """
+
+    __tablename__ = "ingestion_locks"
+
+    name = db.Column(db.String(32), primary_key=True)
+    acquired_at = db.Column(db.DateTime, nullable=False)
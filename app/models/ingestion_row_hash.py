@@ -0,0 +1,15 @@
+from config import db
+
+
+class IngestionRowHash(db.Model):
+    """Hash da última versão de uma linha gravada pela ingestão.
+
+    A atualização compara o hash de cada linha vinda do StatusInvest com este
+    e só grava as que mudaram (ver services.change_detection).
+    """
+
+    __tablename__ = "ingestion_row_hashes"
+
+    asset = db.Column(db.String(16), primary_key=True)
+    ticker = db.Column(db.String(10), primary_key=True)
+    row_hash = db.Column(db.String(40), nullable=False)
@@ -0,0 +1,34 @@
+from config import db
+
+
+class LatestStockPrediction(db.Model):
+    """Predição mais recente de cada ticker.
+
+    Mantida por trigger AFTER INSERT em stock_predictions (ver migration
+    7c2d4e9b1a53), de modo que a leitura é uma busca por chave primária em vez
+    de um GROUP BY sobre todo o histórico.
+    """
+
+    __tablename__ = "latest_stock_predictions"
+
+    ticker = db.Column(db.String(10), primary_key=True)
+    prediction_id = db.Column(db.Integer, nullable=False)
+    run_date = db.Column(db.DateTime, nullable=False)
+    label = db.Column(db.String(20), nullable=False)
+    prob_barata = db.Column(db.Float)
+    prob_neutra = db.Column(db.Float)
+    prob_cara = db.Column(db.Float)
+    composite_score = db.Column(db.Float)
+    model_version = db.Column(db.String(50))
+
+    def to_json(self):
+        return {
+            "ticker": self.ticker,
+            "label": self.label,
+            "prob_barata": self.prob_barata,
+            "prob_neutra": self.prob_neutra,
+            "prob_cara": self.prob_cara,
+            "composite_score": self.composite_score,
+            "model_version": self.model_version,
+            "run_date": self.run_date.isoformat() if self.run_date else None,
+        }
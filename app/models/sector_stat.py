@@ -0,0 +1,33 @@
+from config import db
+
+
+class SectorStat(db.Model):
+    """Estatísticas de uma métrica dentro de um grupo (setor, subsetor ou
+    segmento), recalculadas a cada atualização do universo."""
+
+    __tablename__ = "sector_stats"
+
+    asset = db.Column(db.String(16), primary_key=True)
+    level = db.Column(db.String(16), primary_key=True)
+    group_name = db.Column(db.String(255), primary_key=True)
+    metric = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+    mean = db.Column(db.Float)
+    median = db.Column(db.Float)
+    p25 = db.Column(db.Float)
+    p75 = db.Column(db.Float)
+    min = db.Column(db.Float)
+    max = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime)
+
+    def to_json(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "median": self.median,
+            "p25": self.p25,
+            "p75": self.p75,
+            "min": self.min,
+            "max": self.max,
+        }
@@ -3,8 +3,30 @@ import math
 from config import db
 
 
+def graham_formula(lpa, vpa):
+    """√(22.5 x LPA x VPA), ou 0.0 sem LPA/VPA positivos. Também usada pela
+    ingestão, que grava as linhas sem instanciar Stock."""
+    if lpa and vpa and lpa >= 0 and vpa >= 0:
+        return round(math.sqrt(22.5 * lpa * vpa), 2)
+    return 0.0
+
+
+def discount_to_graham(price, graham):
+    """Desconto percentual do preço em relação a graham."""
+    if price and graham:
+        return round(((price - graham) / price) * 100, 2)
+    return 0.0
+
+
 class Stock(db.Model):
     __tablename__ = "stocks"
+    __table_args__ = (
+        db.Index("ix_stocks_magic_formula_rank", "magic_formula_rank", "ticker"),
+        db.Index("ix_stocks_discount_to_graham", "discount_to_graham", "ticker"),
+        db.Index("ix_stocks_dy", "dy", "ticker"),
+        db.Index("ix_stocks_p_l", "p_l", "ticker"),
+        db.Index("ix_stocks_p_vp", "p_vp", "ticker"),
+    )
 
     ticker = db.Column(db.String(10), primary_key=True)
     companyid = db.Column(db.String(80))
@@ -67,26 +89,18 @@ class Stock(db.Model):
         Calculate the percentage discount to the Graham Formula:
         Discount = ((Market Value - Graham Formula) / Market Value) * 100
         """
-        graham_formula_value = self.get_graham_formula()
-        discount = (
-            ((self.price - graham_formula_value) / self.price) * 100
-            if self.price and graham_formula_value
-            else 0.0
-        )
-        return round(discount, 2)
+        return discount_to_graham(self.price, self.get_graham_formula())
 
     def get_graham_formula(self):
         """
         Calculate the Graham Formula: Intrinsic Value = √ (22.5 x LPA x VPA).
         LPA is Earnings Per Share and VPA is Book Value Per Share.
         """
-        if self.lpa and self.vpa and self.lpa >= 0 and self.vpa >= 0:
-            formula = math.sqrt(22.5 * self.lpa * self.vpa)
-            return round(formula, 2)
-        else:
-            return 0.0
+        return graham_formula(self.lpa, self.vpa)
 
-    def to_json(self):
+    def to_json(self, fields=None):
+        if fields is not None:
+            return {field: getattr(self, field) for field in fields}
         return {
             "ticker": self.ticker,
             "companyid": self.companyid,
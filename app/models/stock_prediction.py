@@ -25,3 +25,10 @@ class StockPrediction(db.Model):
             "model_version": self.model_version,
             "run_date": self.run_date.isoformat() if self.run_date else None,
         }
+
+
+db.Index(
+    "ix_stock_predictions_ticker_run_date",
+    StockPrediction.ticker,
+    StockPrediction.run_date.desc(),
+)
@@ -0,0 +1,49 @@
+from config import db
+
+
+class StockSnapshot(db.Model):
+    """Métricas de uma ação na data de uma atualização (só acrescentado).
+
+    A chave (ticker, snapshot_date) faz de uma consulta por período uma
+    varredura de intervalo no índice da chave, qualquer que seja o tamanho
+    do histórico. O índice por data serve à atualização, que compara a foto
+    do dia antes de gravar.
+    """
+
+    __tablename__ = "stock_snapshots"
+    __table_args__ = (db.Index("ix_stock_snapshots_snapshot_date", "snapshot_date"),)
+
+    ticker = db.Column(db.String(10), primary_key=True)
+    snapshot_date = db.Column(db.Date, primary_key=True)
+    price = db.Column(db.Float)
+    p_l = db.Column(db.Float)
+    dy = db.Column(db.Float)
+    p_vp = db.Column(db.Float)
+    p_ebit = db.Column(db.Float)
+    p_ativo = db.Column(db.Float)
+    ev_ebit = db.Column(db.Float)
+    margembruta = db.Column(db.Float)
+    margemebit = db.Column(db.Float)
+    margemliquida = db.Column(db.Float)
+    p_sr = db.Column(db.Float)
+    p_capitalgiro = db.Column(db.Float)
+    p_ativocirculante = db.Column(db.Float)
+    giroativos = db.Column(db.Float)
+    roe = db.Column(db.Float)
+    roa = db.Column(db.Float)
+    roic = db.Column(db.Float)
+    dividaliquidapatrimonioliquido = db.Column(db.Float)
+    dividaliquidaebit = db.Column(db.Float)
+    pl_ativo = db.Column(db.Float)
+    passivo_ativo = db.Column(db.Float)
+    liquidezcorrente = db.Column(db.Float)
+    peg_ratio = db.Column(db.Float)
+    receitas_cagr5 = db.Column(db.Float)
+    vpa = db.Column(db.Float)
+    lpa = db.Column(db.Float)
+    valormercado = db.Column(db.Float)
+    graham_formula = db.Column(db.Float)
+    discount_to_graham = db.Column(db.Float)
+    roic_rank = db.Column(db.Integer)
+    ey_rank = db.Column(db.Integer)
+    magic_formula_rank = db.Column(db.Integer)
@@ -13,7 +13,8 @@ from services.favorite_fii_services import (
 
 def list_favorites_fii_json():
     user_id = get_jwt_identity()
-    return list_favorites_fii(user_id)
+    fields = request.args.get("fields", None)
+    return list_favorites_fii(user_id, fields)
 
 
 def view_favorite_fii_json(favorite_id):
@@ -14,7 +14,8 @@ from services.favorite_services import (
 
 def list_favorites_json():
     user_id = get_jwt_identity()
-    return list_favorites(user_id)
+    fields = request.args.get("fields", None)
+    return list_favorites(user_id, fields)
 
 
 def view_favorite_json(favorite_id):
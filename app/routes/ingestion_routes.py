@@ -0,0 +1,15 @@
+from services.ingestion_http import get_ingestion_http_stats
+from services.job_runner import get_job
+from services.scheduler import get_scheduler_status
+
+
+def ingestion_http_stats_json():
+    return get_ingestion_http_stats()
+
+
+def job_json(job_id):
+    return get_job(job_id)
+
+
+def scheduler_json():
+    return get_scheduler_status()
@@ -1,4 +1,11 @@
-from services.prediction_service import get_all_predictions, get_prediction_by_ticker
+from flask import request
+
+from services.prediction_service import (
+    export_predictions,
+    get_all_predictions,
+    get_prediction_by_ticker,
+    get_prediction_cache_stats,
+)
 
 
 def list_predictions_json():
@@ -7,3 +14,11 @@ def list_predictions_json():
 
 def view_prediction_json(ticker):
     return get_prediction_by_ticker(ticker.upper())
+
+
+def prediction_cache_stats_json():
+    return get_prediction_cache_stats()
+
+
+def export_predictions_json():
+    return export_predictions(request.args.get("format", "ndjson"))
@@ -0,0 +1,27 @@
+from flask import request
+
+from services.dataset_versions import FIIS, STOCKS
+from services.sector_stats_service import get_sector_stats, rebuild_sector_stats
+
+
+def _sector_stats(asset):
+    level = request.args.get("level", "sector")
+    group = request.args.get("group", None)
+    metrics = request.args.get("metrics", None)
+    return get_sector_stats(asset, level, group, metrics)
+
+
+def stock_sector_stats_json():
+    return _sector_stats(STOCKS)
+
+
+def fii_sector_stats_json():
+    return _sector_stats(FIIS)
+
+
+def rebuild_stock_sector_stats_json():
+    return rebuild_sector_stats(STOCKS)
+
+
+def rebuild_fii_sector_stats_json():
+    return rebuild_sector_stats(FIIS)
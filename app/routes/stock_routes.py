@@ -2,13 +2,18 @@ import json
 from flask import request
 from flask_jwt_extended import get_jwt_identity
 
+from services.dataset_versions import STOCKS
+from services.history_service import get_history
+
 from services.stock_services import (
     list_stocks,
     view_stock,
     new_stock,
     edit_stock,
     delete_stock,
-    update_all_stocks,
+    enqueue_stock_update,
+    export_stocks,
+    batch_stocks,
 )
 
 
@@ -20,11 +25,39 @@ def list_stocks_json():
     sort_dir = request.args.get("sort_dir", "asc")
     filters_raw = request.args.get("filters", None)
     filters = json.loads(filters_raw) if filters_raw else None
-    return list_stocks(user_id, page, per_page, sort_by, sort_dir, filters)
+    cursor = request.args.get("cursor", None)
+    with_total = request.args.get("with_total", "false").lower() == "true"
+    fields = request.args.get("fields", None)
+    return list_stocks(
+        user_id, page, per_page, sort_by, sort_dir, filters, cursor, with_total, fields
+    )
+
+
+def export_stocks_json():
+    user_id = get_jwt_identity()
+    sort_by = request.args.get("sort_by", None)
+    sort_dir = request.args.get("sort_dir", "asc")
+    filters_raw = request.args.get("filters", None)
+    filters = json.loads(filters_raw) if filters_raw else None
+    fmt = request.args.get("format", "ndjson")
+    fields = request.args.get("fields", None)
+    return export_stocks(user_id, sort_by, sort_dir, filters, fmt, fields)
 
 
 def view_stock_json(ticker):
-    return view_stock(ticker.upper())
+    fields = request.args.get("fields", None)
+    return view_stock(ticker.upper(), fields)
+
+
+def batch_stocks_json():
+    user_id = get_jwt_identity()
+    raw = request.args.get("tickers", "")
+    # Remove vazios e repetidos, mantendo a ordem pedida.
+    tickers = list(
+        dict.fromkeys(t.strip().upper() for t in raw.split(",") if t.strip())
+    )
+    fields = request.args.get("fields", None)
+    return batch_stocks(user_id, tickers, fields)
 
 
 def new_stock_json():
@@ -42,4 +75,14 @@ def delete_stock_json(ticker):
 
 
 def update_stocks():
-    return update_all_stocks()
+    return enqueue_stock_update(get_jwt_identity())
+
+
+def stock_history_json(ticker):
+    return get_history(
+        STOCKS,
+        ticker.upper(),
+        request.args.get("from", None),
+        request.args.get("to", None),
+        request.args.get("fields", None),
+    )
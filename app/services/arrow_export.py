@@ -0,0 +1,102 @@
+import io
+
+from flask import Response, stream_with_context
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer
+
+from config import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependência opcional
+    pa = pc = pq = None
+
+BATCH_ROWS = 10000
+
+ARROW_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ArrowUnavailableError(RuntimeError):
+    pass
+
+
+def arrow_type(sa_type):
+    if isinstance(sa_type, Boolean):
+        return pa.bool_()
+    if isinstance(sa_type, (Integer, BigInteger)):
+        return pa.int64()
+    if isinstance(sa_type, Float):
+        return pa.float64()
+    if isinstance(sa_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _batches(stmt, schema, transforms):
+    """RecordBatches montados coluna a coluna a partir das tuplas do DBAPI.
+
+    Cada partição do resultado (BATCH_ROWS linhas, cursor do lado do servidor
+    no PostgreSQL) é transposta com zip(*rows); nenhum dict por linha é criado.
+    """
+    result = db.session.execute(stmt.execution_options(yield_per=BATCH_ROWS))
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(schema, columns):
+            array = pa.array(values, type=field.type)
+            if field.name in transforms:
+                array = transforms[field.name](array)
+            arrays.append(array)
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _arrow_stream(stmt, schema, transforms):
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in _batches(stmt, schema, transforms):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def _parquet_file(stmt, schema, transforms):
+    # O rodapé do Parquet só existe no fim do arquivo; cada partição vira um
+    # row group e o arquivo (já comprimido) é enviado de uma vez.
+    sink = io.BytesIO()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in _batches(stmt, schema, transforms):
+            writer.write_batch(batch)
+    return sink.getvalue()
+
+
+def arrow_response(stmt, columns, fmt, filename, transforms=None):
+    """Resposta Arrow IPC (stream) ou Parquet para um select() do Core.
+
+    columns é a lista [(nome, tipo SQLAlchemy)] na mesma ordem do select.
+    transforms mapeia nome -> função aplicada ao pyarrow.Array da coluna.
+    """
+    if pa is None:
+        raise ArrowUnavailableError("pyarrow is not installed")
+    mimetype, extension = ARROW_FORMATS[fmt]
+    schema = pa.schema([(name, arrow_type(sa_type)) for name, sa_type in columns])
+    transforms = transforms or {}
+    headers = {"Content-Disposition": f"attachment; filename={filename}.{extension}"}
+    if fmt == "parquet":
+        return Response(
+            _parquet_file(stmt, schema, transforms), mimetype=mimetype, headers=headers
+        )
+    return Response(
+        stream_with_context(_arrow_stream(stmt, schema, transforms)),
+        mimetype=mimetype,
+        headers=headers,
+    )
+
+
+def round_score(array):
+    return pc.round(array, 1)
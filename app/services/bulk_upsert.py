@@ -0,0 +1,59 @@
+from flask import current_app, has_app_context
+from sqlalchemy.dialects import postgresql, sqlite
+
+from config import db
+
+DEFAULT_BATCH_SIZE = 1000
+
+# insert() com suporte a ON CONFLICT de cada dialeto.
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _batch_size():
+    if not has_app_context():
+        return DEFAULT_BATCH_SIZE
+    return current_app.config.get("INGESTION_UPSERT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+
+def upsert_statement(model, columns):
+    """INSERT ... ON CONFLICT (pk) DO UPDATE das colunas não-chave em
+    columns, no dialeto da sessão corrente."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise ValueError(f"Bulk upsert not supported on {dialect}")
+    primary_key = [column.name for column in model.__table__.primary_key]
+    stmt = UPSERT_INSERTS[dialect](model.__table__)
+    update_columns = [column for column in columns if column not in primary_key]
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=primary_key)
+    return stmt.on_conflict_do_update(
+        index_elements=primary_key,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+
+
+def payload_columns(model, rows):
+    """Colunas de model presentes em alguma linha, na ordem da tabela."""
+    present = set().union(*rows) if rows else set()
+    return [column for column in model.__table__.columns.keys() if column in present]
+
+
+def upsert_rows(model, rows, batch_size=None):
+    """Grava rows (dicts) em model por upsert, sem criar instâncias do ORM.
+
+    Só as colunas da tabela são gravadas; chaves desconhecidas são ignoradas
+    e colunas ausentes de uma linha vão como NULL. Cada lote de batch_size
+    linhas é um executemany na transação corrente, que o psycopg2 transforma
+    em INSERTs de várias linhas (insertmanyvalues, como execute_values). O
+    commit é do chamador; retorna o número de linhas enviadas.
+    """
+    columns = payload_columns(model, rows)
+    if not columns:
+        return 0
+
+    stmt = upsert_statement(model, columns)
+    params = [{column: row.get(column) for column in columns} for row in rows]
+    batch_size = batch_size or _batch_size()
+    for start in range(0, len(params), batch_size):
+        db.session.execute(stmt, params[start : start + batch_size])
+    return len(params)
@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from sqlalchemy import and_, delete, select
+
+from models.ingestion_row_hash import IngestionRowHash
+from config import db
+from services.bulk_upsert import payload_columns, upsert_rows
+
+
+def row_hash(row, columns):
+    """SHA-1 dos valores de row nas colunas dadas (ordem fixa)."""
+    payload = json.dumps(
+        [row.get(column) for column in columns], separators=(",", ":"), default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _stored_hashes(asset, model):
+    # Parte da tabela do ativo: um ticker apagado à mão volta como novo mesmo
+    # que o hash antigo ainda esteja gravado.
+    (key,) = model.__table__.primary_key
+    join = and_(IngestionRowHash.asset == asset, IngestionRowHash.ticker == key)
+    query = select(key, IngestionRowHash.row_hash).outerjoin(IngestionRowHash, join)
+    return dict(db.session.execute(query).all())
+
+
+def write_changed_rows(asset, model, rows):
+    """Grava em model só as linhas de rows novas ou diferentes da última
+    ingestão, e os hashes delas, na transação corrente.
+
+    Retorna as contagens inserted, updated, unchanged e removed (tickers
+    gravados que não vieram em rows; não são apagados, pois favoritos e
+    predições apontam para eles).
+    """
+    columns = payload_columns(model, rows)
+    stored = _stored_hashes(asset, model)
+    changed, hashes = [], []
+    inserted = 0
+    for row in rows:
+        ticker = row["ticker"]
+        digest = row_hash(row, columns)
+        if ticker not in stored:
+            inserted += 1
+        elif stored[ticker] == digest:
+            continue
+        changed.append(row)
+        hashes.append({"asset": asset, "ticker": ticker, "row_hash": digest})
+
+    if changed:
+        upsert_rows(model, changed)
+        upsert_rows(IngestionRowHash, hashes)
+    seen = {row["ticker"] for row in rows}
+    return {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(rows) - len(changed),
+        "removed": len(stored.keys() - seen),
+    }
+
+
+def forget_row_hash(asset, ticker):
+    """Descarta o hash de um ticker editado fora da ingestão, para que a
+    próxima atualização volte a gravá-lo."""
+    db.session.execute(
+        delete(IngestionRowHash).where(
+            IngestionRowHash.asset == asset, IngestionRowHash.ticker == ticker
+        )
+    )
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.dataset_version import DatasetVersion
+from config import db
+
+STOCKS = "stocks"
+FIIS = "fiis"
+PREDICTIONS = "predictions"
+
+
+def favorites_key(user_id):
+    return f"favorites:{user_id}"
+
+
+def favorites_fii_key(user_id):
+    return f"favorites_fii:{user_id}"
+
+
+class VersionCache:
+    """Cópia local das versões, relida do banco no máximo a cada
+    DATASET_VERSION_CHECK_SECONDS por nome."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def forget(self, name):
+        with self._lock:
+            self._versions.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+
+    def get_many(self, names):
+        ttl = current_app.config.get("DATASET_VERSION_CHECK_SECONDS", 5)
+        now = time.monotonic()
+        with self._lock:
+            versions = {}
+            missing = []
+            for name in names:
+                entry = self._versions.get(name)
+                if entry is not None and now - entry[1] < ttl:
+                    versions[name] = entry[0]
+                else:
+                    missing.append(name)
+            if missing:
+                rows = (
+                    db.session.query(DatasetVersion.name, DatasetVersion.version)
+                    .filter(DatasetVersion.name.in_(missing))
+                    .all()
+                )
+                found = dict(rows)
+                for name in missing:
+                    versions[name] = found.get(name, 0)
+                    self._versions[name] = (versions[name], now)
+            return versions
+
+
+version_cache = VersionCache()
+
+
+def get_versions(names):
+    """Retorna {nome: versão}; nomes nunca incrementados valem 0."""
+    return version_cache.get_many(names)
+
+
+def get_version(name):
+    return get_versions([name])[name]
+
+
+def bump_version(name):
+    """Incrementa a versão na transação corrente; o commit é do chamador."""
+    dialect = db.session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(DatasetVersion).values(name=name, version=1, updated_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DatasetVersion.name],
+        set_={"version": DatasetVersion.version + 1, "updated_at": func.now()},
+    )
+    db.session.execute(stmt)
+    version_cache.forget(name)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from services.ranking import descending_ranks
+
+GRAHAM_FACTOR = 22.5
+
+
+def _column(rows, name):
+    # None vira NaN na conversão para float64.
+    return np.array([row.get(name) for row in rows], dtype=np.float64)
+
+
+def stock_metrics(price, lpa, vpa, roic):
+    """Métricas derivadas das ações sobre colunas inteiras (arrays float64).
+
+    - graham_formula: √(22.5 x LPA x VPA) com LPA e VPA positivos, senão 0;
+    - discount_to_graham: desconto percentual do preço sobre Graham (0 sem
+      preço ou sem Graham);
+    - ey: LPA / preço (0 sem preço ou sem LPA);
+    - ey_rank, roic_rank: posição decrescente com empates na menor posição
+      (ranking de competição), ausentes por último;
+    - magic_formula_rank: roic_rank + ey_rank.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        has_graham = (lpa > 0) & (vpa > 0)
+        graham = np.where(
+            has_graham, np.round(np.sqrt(GRAHAM_FACTOR * lpa * vpa), 2), 0
+        )
+        has_price = ~np.isnan(price) & (price != 0)
+        discount = np.where(
+            has_price & (graham != 0), np.round((price - graham) / price * 100, 2), 0
+        )
+        ey = np.where(has_price & ~np.isnan(lpa), lpa / price, 0)
+    roic_rank = descending_ranks(roic, method="min")
+    ey_rank = descending_ranks(ey, method="min")
+    return {
+        "graham_formula": graham,
+        "discount_to_graham": discount,
+        "ey": ey,
+        "roic_rank": roic_rank,
+        "ey_rank": ey_rank,
+        "magic_formula_rank": roic_rank + ey_rank,
+    }
+
+
+def enrich_stocks(rows):
+    """Acrescenta a cada dict de rows as métricas de stock_metrics, numa única
+    passada NumPy sobre o lote. Altera rows no lugar e o devolve."""
+    if not rows:
+        return rows
+    metrics = stock_metrics(
+        _column(rows, "price"),
+        _column(rows, "lpa"),
+        _column(rows, "vpa"),
+        _column(rows, "roic"),
+    )
+    columns = {name: values.tolist() for name, values in metrics.items()}
+    names = list(columns)
+    for row, values in zip(rows, zip(*columns.values())):
+        row.update(zip(names, values))
+    return rows
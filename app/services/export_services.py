@@ -0,0 +1,68 @@
+import csv
+import io
+
+from flask import Response, current_app, stream_with_context
+
+# Linhas buscadas por round trip do cursor e linhas por pedaço enviado.
+YIELD_PER = 1000
+CHUNK_ROWS = 500
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+class InvalidExportFormatError(ValueError):
+    pass
+
+
+def _ndjson_lines(rows, to_dict):
+    dumps = current_app.json.dumps
+    buffer = []
+    for row in rows:
+        buffer.append(dumps(to_dict(row)))
+        if len(buffer) >= CHUNK_ROWS:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _csv_lines(rows, to_dict, columns):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(to_dict(row))
+        count += 1
+        if count >= CHUNK_ROWS:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+            count = 0
+    if out.tell():
+        yield out.getvalue()
+
+
+def export_response(query, to_dict, columns, fmt, filename):
+    """Resposta em streaming com todas as linhas da query.
+
+    As linhas vêm do banco em lotes de YIELD_PER (cursor do lado do servidor
+    no PostgreSQL) e saem em pedaços de CHUNK_ROWS, então a memória não cresce
+    com o tamanho da exportação.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise InvalidExportFormatError(fmt)
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    rows = query.yield_per(YIELD_PER)
+    if fmt == "csv":
+        body = _csv_lines(rows, to_dict, columns)
+    else:
+        body = _ndjson_lines(rows, to_dict)
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"},
+    )
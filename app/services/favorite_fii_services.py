@@ -2,10 +2,13 @@ import functools
 import logging
 
 from flask import jsonify
+from sqlalchemy.orm import joinedload
 from config import db
 from models.favorite_fiis import FavoriteFii
 from models.user import User
 from models.fii import Fii
+from services.dataset_versions import bump_version, favorites_fii_key
+from services.fieldsets import load_only_option, model_fields, parse_fields
 
 
 def handle_db_operations(func):
@@ -27,9 +30,15 @@ def handle_db_operations(func):
 
 
 @handle_db_operations
-def list_favorites_fii(user_id):
-    user_favorites = FavoriteFii.query.filter_by(user_id=user_id).all()
-    favorites_json = [favorite.to_json() for favorite in user_favorites]
+def list_favorites_fii(user_id, fields=None):
+    fields = parse_fields(fields, model_fields(Fii))
+    query = FavoriteFii.query.filter_by(user_id=user_id)
+    if fields is not None:
+        query = query.options(
+            joinedload(FavoriteFii.fii).options(load_only_option(Fii, fields))
+        )
+    user_favorites = query.all()
+    favorites_json = [favorite.to_json(fields) for favorite in user_favorites]
     return jsonify(favorites_json), 200
 
 
@@ -60,6 +69,7 @@ def new_favorite_fii(favorite_data):
 
     new_favorite = FavoriteFii(**favorite_data)
     db.session.add(new_favorite)
+    bump_version(favorites_fii_key(user_id))
     return jsonify({"message": "Favorite added successfully"}), 201
 
 
@@ -78,9 +88,13 @@ def edit_favorite_fii(favorite_id, favorite_data):
     if favorite is None:
         return jsonify({"message": "Favorite not found"}), 404
 
+    previous_user_id = favorite.user_id
     for key, value in favorite_data.items():
         setattr(favorite, key, value)
 
+    for owner in {previous_user_id, favorite.user_id}:
+        bump_version(favorites_fii_key(owner))
+
     return jsonify({"message": "Favorite edited successfully"}), 200
 
 
@@ -91,6 +105,7 @@ def delete_favorite_fii(favorite_id):
         return jsonify({"message": "Favorite not found"}), 404
 
     db.session.delete(favorite)
+    bump_version(favorites_fii_key(favorite.user_id))
     return jsonify({"message": "Favorite deleted successfully"}), 200
 
 
@@ -104,6 +119,7 @@ def add_favorite_fii(user_id, ticker):
 
     new_favorite = FavoriteFii(user_id=user_id, fii_ticker=ticker)
     db.session.add(new_favorite)
+    bump_version(favorites_fii_key(user_id))
     return jsonify({"message": "Favorite added successfully"}), 201
 
 
@@ -114,4 +130,5 @@ def remove_favorite_fii(user_id, ticker):
         return jsonify({"message": "Favorite not found"}), 404
 
     db.session.delete(favorite)
+    bump_version(favorites_fii_key(user_id))
     return jsonify({"message": "Favorite deleted successfully"}), 200
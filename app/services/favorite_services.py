@@ -2,11 +2,15 @@ import functools
 import logging
 
 from flask import jsonify
+from sqlalchemy.orm import joinedload
 from config import db
 from models.favorite import Favorite
+from models.latest_stock_prediction import LatestStockPrediction
 from models.stock import Stock
 from models.user import User
-from services.prediction_service import get_latest_predictions_map, attach_ml_fields
+from services.prediction_service import ML_FIELDS, attach_ml_fields
+from services.dataset_versions import bump_version, favorites_key
+from services.fieldsets import load_only_option, model_fields, parse_fields
 
 
 def handle_db_errors(func):
@@ -31,17 +35,32 @@ def handle_db_errors(func):
 
 
 @handle_db_errors
-def list_favorites(user_id):
-    user_favorites = Favorite.query.filter_by(user_id=user_id).all()
-    pred_map = get_latest_predictions_map()
+def list_favorites(user_id, fields=None):
+    """Favoritos do usuário com a ação embutida.
+
+    fields restringe os campos da ação (e os de ML) como em list_stocks.
+    """
+    fields = parse_fields(fields, model_fields(Stock) + ML_FIELDS)
+    stock_load = joinedload(Favorite.stock)
+    if fields is not None:
+        stock_load = stock_load.options(load_only_option(Stock, fields))
+    query = Favorite.query.filter_by(user_id=user_id)
+    wants_ml = fields is None or any(name in ML_FIELDS for name in fields)
+    if wants_ml:
+        query = query.outerjoin(
+            LatestStockPrediction,
+            LatestStockPrediction.ticker == Favorite.stock_ticker,
+        ).add_entity(LatestStockPrediction)
+    rows = query.options(stock_load).all()
+    stock_fields = None
+    if fields is not None:
+        stock_fields = [f for f in fields if f in Stock.__table__.columns]
     favorites_json = []
-    for favorite in user_favorites:
-        fav_dict = favorite.to_json()
+    for row in rows:
+        favorite, pred = row if wants_ml else (row, None)
+        fav_dict = favorite.to_json(stock_fields)
         if fav_dict["stock"] is not None:
-            ticker = fav_dict["stock"].get("ticker")
-            fav_dict["stock"] = attach_ml_fields(
-                fav_dict["stock"], pred_map.get(ticker)
-            )
+            fav_dict["stock"] = attach_ml_fields(fav_dict["stock"], pred, fields)
         favorites_json.append(fav_dict)
     return jsonify(favorites_json), 200
 
@@ -72,6 +91,7 @@ def new_favorite(favorite_data):
         return jsonify({"message": "This stock is already favorited by this user"}), 400
 
     db.session.add(Favorite(**favorite_data))
+    bump_version(favorites_key(user_id))
     db.session.commit()
     return jsonify({"message": "Favorite added successfully"}), 201
 
@@ -91,9 +111,12 @@ def edit_favorite(favorite_id, favorite_data):
     if favorite is None:
         return jsonify({"message": "Favorite not found"}), 404
 
+    previous_user_id = favorite.user_id
     for key, value in favorite_data.items():
         setattr(favorite, key, value)
 
+    for owner in {previous_user_id, favorite.user_id}:
+        bump_version(favorites_key(owner))
     db.session.commit()
     return jsonify({"message": "Favorite edited successfully"}), 200
 
@@ -105,6 +128,7 @@ def delete_favorite(favorite_id):
         return jsonify({"message": "Favorite not found"}), 404
 
     db.session.delete(favorite)
+    bump_version(favorites_key(favorite.user_id))
     db.session.commit()
     return jsonify({"message": "Favorite deleted successfully"}), 200
 
@@ -118,6 +142,7 @@ def add_favorite(user_id, ticker):
         return jsonify({"message": "This stock is already favorited by this user"}), 400
 
     db.session.add(Favorite(user_id=user_id, stock_ticker=ticker))
+    bump_version(favorites_key(user_id))
     db.session.commit()
     return jsonify({"message": "Favorite added successfully"}), 201
 
@@ -129,5 +154,6 @@ def remove_favorite(user_id, ticker):
         return jsonify({"message": "Favorite not found"}), 404
 
     db.session.delete(favorite)
+    bump_version(favorites_key(user_id))
     db.session.commit()
     return jsonify({"message": "Favorite deleted successfully"}), 200
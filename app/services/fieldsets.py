@@ -0,0 +1,36 @@
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(raw, allowed, always=("ticker",)):
+    """Converte "ticker,price,dy" na lista de campos pedidos, na ordem.
+
+    Campos fora de allowed são ignorados, como nos filtros. Retorna None
+    quando o parâmetro não foi enviado (resposta completa).
+    """
+    if raw is None or not raw.strip():
+        return None
+    fields = list(always)
+    for name in raw.split(","):
+        name = name.strip()
+        if name in allowed and name not in fields:
+            fields.append(name)
+    return fields
+
+
+def model_fields(model):
+    return tuple(model.__table__.columns.keys())
+
+
+def load_only_option(model, fields, extra=()):
+    """load_only() com as colunas do modelo presentes em fields (e extra)."""
+    columns = model.__table__.columns
+    names = [name for name in fields if name in columns]
+    names += [name for name in extra if name and name not in names]
+    return load_only(*[getattr(model, name) for name in names])
+
+
+def project(row, fields):
+    """Restringe um dict já serializado aos campos pedidos."""
+    if fields is None:
+        return row
+    return {name: row[name] for name in fields if name in row}
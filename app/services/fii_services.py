@@ -1,11 +1,21 @@
 import logging
-import json
-import requests
 from flask import jsonify
+from sqlalchemy import Boolean, select, type_coerce
 
 from models.fii import Fii
 from models.favorite_fiis import FavoriteFii
 from config import db
+from services.pagination import InvalidCursorError, keyset_paginate
+from services.dataset_versions import FIIS, bump_version
+from services.sector_stats_service import refresh_sector_stats
+from services.percentile_service import percentile_filter, refresh_percentiles
+from services.statusinvest import FII_CATEGORY, fetch_category
+from services.job_runner import IngestionError, JobProgress, enqueue_job
+from services.change_detection import forget_row_hash, write_changed_rows
+from services.history_service import record_snapshot
+from services.export_services import InvalidExportFormatError, export_response
+from services.arrow_export import ARROW_FORMATS, ArrowUnavailableError, arrow_response
+from services.fieldsets import load_only_option, model_fields, parse_fields
 
 FII_ALLOWED_COLS = {
     "ticker",
@@ -27,12 +37,38 @@ FII_ALLOWED_COLS = {
     "lastdividend",
 }
 
+FII_FIELDS = model_fields(Fii) + ("favorita",)
+
+MAX_BATCH_TICKERS = 300
+
+
+def _fii_json(fii, favorites, fields=None):
+    if fields is None:
+        return {**fii.to_json(), "favorita": fii.ticker in favorites}
+    fii_json = fii.to_json([f for f in fields if f in Fii.__table__.columns])
+    if "favorita" in fields:
+        fii_json["favorita"] = fii.ticker in favorites
+    return fii_json
+
+
+def _fii_columns(fields=None):
+    """Cabeçalho da exportação, na ordem das chaves de _fii_json."""
+    if fields is None:
+        return list(FII_FIELDS)
+    return [f for f in fields if f in Fii.__table__.columns] + [
+        f for f in ("favorita",) if f in fields
+    ]
+
 
 def _apply_filters_and_sort(query, model, allowed_cols, sort_by, sort_dir, filters):
     if filters:
         for f in filters:
             col_id = f.get("id")
             value = f.get("value")
+            clause = percentile_filter(model, col_id, value)
+            if clause is not None:
+                query = query.filter(clause)
+                continue
             if col_id not in allowed_cols or value is None:
                 continue
             col = getattr(model, col_id)
@@ -50,31 +86,119 @@ def _apply_filters_and_sort(query, model, allowed_cols, sort_by, sort_dir, filte
     return query
 
 
-def list_fiis(user_id, page=1, per_page=50, sort_by=None, sort_dir="asc", filters=None):
+def list_fiis(
+    user_id,
+    page=1,
+    per_page=50,
+    sort_by=None,
+    sort_dir="asc",
+    filters=None,
+    cursor=None,
+    with_total=False,
+    fields=None,
+):
     try:
         per_page = min(per_page, 500)
-        favorites = {
-            fav.fii_ticker for fav in FavoriteFii.query.filter_by(user_id=user_id).all()
-        }
+        fields = parse_fields(fields, FII_FIELDS)
+        favorites = set()
+        if fields is None or "favorita" in fields:
+            favorites = {
+                fav.fii_ticker
+                for fav in FavoriteFii.query.filter_by(user_id=user_id).all()
+            }
+        base_query = Fii.query
+        if fields is not None:
+            base_query = base_query.options(
+                load_only_option(Fii, fields, extra=(sort_by,))
+            )
+        if cursor is not None:
+            if sort_by not in FII_ALLOWED_COLS:
+                sort_by = None
+            query = _apply_filters_and_sort(
+                base_query, Fii, FII_ALLOWED_COLS, None, sort_dir, filters
+            )
+            fiis, pagination = keyset_paginate(
+                query,
+                Fii,
+                "ticker",
+                sort_by,
+                sort_dir,
+                filters,
+                cursor,
+                per_page,
+                with_total,
+            )
+        else:
+            query = _apply_filters_and_sort(
+                base_query, Fii, FII_ALLOWED_COLS, sort_by, sort_dir, filters
+            )
+            paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+            fiis = paginated.items
+            pagination = {
+                "total": paginated.total,
+                "pages": paginated.pages,
+                "current_page": paginated.page,
+                "per_page": per_page,
+            }
+        fiis_json = [_fii_json(fii, favorites, fields) for fii in fiis]
+        return jsonify({"data": fiis_json, "pagination": pagination}), 200
+    except InvalidCursorError:
+        return jsonify({"message": "Invalid cursor"}), 400
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def view_fii(ticker, fields=None):
+    try:
+        fields = parse_fields(fields, model_fields(Fii))
+        if fields is None:
+            fii = db.session.get(Fii, ticker)
+        else:
+            fii = (
+                Fii.query.options(load_only_option(Fii, fields))
+                .filter(Fii.ticker == ticker)
+                .first()
+            )
+        if fii is None:
+            return jsonify({"message": "FII not found"}), 404
+        return jsonify(fii.to_json(fields)), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def batch_fiis(user_id, tickers, fields=None):
+    """Vários FIIs por ticker em uma consulta; ausentes vêm em missing."""
+    try:
+        if not tickers:
+            return jsonify({"message": "tickers is required"}), 400
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return (
+                jsonify(
+                    {"message": f"At most {MAX_BATCH_TICKERS} tickers per request"}
+                ),
+                400,
+            )
+        fields = parse_fields(fields, FII_FIELDS)
+        favorites = set()
+        if fields is None or "favorita" in fields:
+            favorites = {
+                fav.fii_ticker
+                for fav in FavoriteFii.query.filter_by(user_id=user_id).all()
+            }
         query = Fii.query
-        query = _apply_filters_and_sort(
-            query, Fii, FII_ALLOWED_COLS, sort_by, sort_dir, filters
-        )
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        fiis_json = [
-            {**fii.to_json(), "favorita": fii.ticker in favorites}
-            for fii in paginated.items
-        ]
+        if fields is not None:
+            query = query.options(load_only_option(Fii, fields))
+        found = {
+            fii.ticker: _fii_json(fii, favorites, fields)
+            for fii in query.filter(Fii.ticker.in_(tickers)).all()
+        }
         return (
             jsonify(
                 {
-                    "data": fiis_json,
-                    "pagination": {
-                        "total": paginated.total,
-                        "pages": paginated.pages,
-                        "current_page": paginated.page,
-                        "per_page": per_page,
-                    },
+                    "data": [found[t] for t in tickers if t in found],
+                    "missing": [t for t in tickers if t not in found],
                 }
             ),
             200,
@@ -84,12 +208,61 @@ def list_fiis(user_id, page=1, per_page=50, sort_by=None, sort_dir="asc", filter
         return jsonify({"message": "An error occurred, please try again later"}), 500
 
 
-def view_fii(ticker):
+def _export_fiis_arrow(favorites, sort_by, sort_dir, filters, fmt, fields=None):
+    names = list(FII_FIELDS) if fields is None else fields
+    table_cols = Fii.__table__.columns
+    exprs = []
+    columns = []
+    for name in names:
+        if name == "favorita":
+            expr = type_coerce(Fii.ticker.in_(sorted(favorites)), Boolean)
+            sa_type = Boolean()
+        else:
+            expr, sa_type = getattr(Fii, name), table_cols[name].type
+        exprs.append(expr.label(name))
+        columns.append((name, sa_type))
+
+    stmt = _apply_filters_and_sort(
+        select(*exprs), Fii, FII_ALLOWED_COLS, sort_by, sort_dir, filters
+    ).order_by(Fii.ticker)
+    return arrow_response(stmt, columns, fmt, "fiis")
+
+
+def export_fiis(
+    user_id, sort_by=None, sort_dir="asc", filters=None, fmt="ndjson", fields=None
+):
+    """Exporta todos os FIIs filtrados em NDJSON, CSV, Arrow ou Parquet."""
     try:
-        fii = db.session.get(Fii, ticker)
-        if fii is None:
-            return jsonify({"message": "FII not found"}), 404
-        return jsonify(fii.to_json()), 200
+        fields = parse_fields(fields, FII_FIELDS)
+        favorites = set()
+        if fields is None or "favorita" in fields:
+            favorites = {
+                fav.fii_ticker
+                for fav in FavoriteFii.query.filter_by(user_id=user_id).all()
+            }
+        if fmt in ARROW_FORMATS:
+            return _export_fiis_arrow(
+                favorites, sort_by, sort_dir, filters, fmt, fields
+            )
+
+        query = Fii.query
+        if fields is not None:
+            query = query.options(load_only_option(Fii, fields, extra=(sort_by,)))
+        query = _apply_filters_and_sort(
+            query, Fii, FII_ALLOWED_COLS, sort_by, sort_dir, filters
+        ).order_by(Fii.ticker)
+
+        return export_response(
+            query,
+            lambda fii: _fii_json(fii, favorites, fields),
+            _fii_columns(fields),
+            fmt,
+            "fiis",
+        )
+    except InvalidExportFormatError:
+        return jsonify({"message": "Invalid format"}), 400
+    except ArrowUnavailableError:
+        return jsonify({"message": "Format not available"}), 501
     except Exception as e:
         logging.error(f"An error occurred: {e}")
         return jsonify({"message": "An error occurred, please try again later"}), 500
@@ -103,6 +276,8 @@ def new_fii(fii_data):
         new_fii = Fii(**fii_data)
 
         db.session.add(new_fii)
+        refresh_percentiles(FIIS)
+        bump_version(FIIS)
         db.session.commit()
         return jsonify({"message": "FII added successfully"}), 201
     except Exception as e:
@@ -120,6 +295,9 @@ def edit_fii(ticker, fii_data):
         for key, value in fii_data.items():
             setattr(fii, key, value)
 
+        forget_row_hash(FIIS, ticker)
+        refresh_percentiles(FIIS)
+        bump_version(FIIS)
         db.session.commit()
         return jsonify({"message": "FII edited successfully"}), 200
     except Exception as e:
@@ -135,6 +313,8 @@ def delete_fii(ticker):
             return jsonify({"message": "FII not found"}), 404
 
         db.session.delete(fii)
+        refresh_percentiles(FIIS)
+        bump_version(FIIS)
         db.session.commit()
         return jsonify({"message": "FII deleted successfully"}), 200
     except Exception as e:
@@ -144,101 +324,80 @@ def delete_fii(ticker):
 
 
 def get_all_fiis_from_statusinvest():
-    try:
-        url = "https://statusinvest.com.br/category/advancedsearchresultpaginated"
-        search_params = {
-            "Segment": "",
-            "Gestao": "",
-            "my_range": "0;20",
-            "dy": {"Item1": None, "Item2": None},
-            "p_vp": {"Item1": None, "Item2": None},
-            "percentualcaixa": {"Item1": None, "Item2": None},
-            "numerocotistas": {"Item1": None, "Item2": None},
-            "dividend_cagr": {"Item1": None, "Item2": None},
-            "cota_cagr": {"Item1": None, "Item2": None},
-            "liquidezmediadiaria": {"Item1": None, "Item2": None},
-            "patrimonio": {"Item1": None, "Item2": None},
-            "valorpatrimonialcota": {"Item1": None, "Item2": None},
-            "numerocotas": {"Item1": None, "Item2": None},
-            "lastdividend": {"Item1": None, "Item2": None},
-        }
-        params = {
-            "search": json.dumps(search_params),
-            "orderColumn": "",
-            "isAsc": "",
-            "page": 0,
-            "take": 1000,
-            "CategoryType": 2,
-        }
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-            )
-        }
-
-        response = requests.get(url, params=params, headers=headers)
-
-        if response.status_code != 200:
-            logging.error(f"HTTP error occurred: {response.status_code}")
-            return None
-
-        return response.json()
-    except Exception as e:
-        logging.error(f"An error occurred: {e}")
-        return None
+    search_params = {
+        "Segment": "",
+        "Gestao": "",
+        "my_range": "0;20",
+        "dy": {"Item1": None, "Item2": None},
+        "p_vp": {"Item1": None, "Item2": None},
+        "percentualcaixa": {"Item1": None, "Item2": None},
+        "numerocotistas": {"Item1": None, "Item2": None},
+        "dividend_cagr": {"Item1": None, "Item2": None},
+        "cota_cagr": {"Item1": None, "Item2": None},
+        "liquidezmediadiaria": {"Item1": None, "Item2": None},
+        "patrimonio": {"Item1": None, "Item2": None},
+        "valorpatrimonialcota": {"Item1": None, "Item2": None},
+        "numerocotas": {"Item1": None, "Item2": None},
+        "lastdividend": {"Item1": None, "Item2": None},
+    }
+    return fetch_category(FII_CATEGORY, search_params)
+
+
+def run_fii_update(progress):
+    """Busca, transforma e grava o universo de FIIs (uma transação)."""
+    progress.phase("fetch")
+    fiis_data = get_all_fiis_from_statusinvest()
+    if not fiis_data or "list" not in fiis_data:
+        raise IngestionError("Error fetching FII data from StatusInvest.")
+
+    progress.phase("parse")
+    cached_fiis = fiis_data["list"]
+
+    numeric_fields = [
+        "price",
+        "sectorid",
+        "subsectorid",
+        "segmentid",
+        "gestao",
+        "dy",
+        "p_vp",
+        "valorpatrimonialcota",
+        "liquidezmediadiaria",
+        "percentualcaixa",
+        "dividend_cagr",
+        "cota_cagr",
+        "numerocotistas",
+        "numerocotas",
+        "patrimonio",
+        "lastdividend",
+    ]
+
+    for fii_data in cached_fiis:
+        for field in numeric_fields:
+            fii_data[field] = fii_data.get(field, 0.0)
+
+    progress.phase("write")
+    counts = write_changed_rows(FIIS, Fii, cached_fiis)
+    if counts["inserted"] or counts["updated"]:
+        refresh_sector_stats(FIIS)
+        refresh_percentiles(FIIS)
+        bump_version(FIIS)
+    snapshot = record_snapshot(FIIS, cached_fiis)
+    db.session.commit()
+    progress.count(fetched=len(cached_fiis), snapshot=snapshot, **counts)
 
 
 def update_all_fiis():
     try:
-        fiis_data = get_all_fiis_from_statusinvest()
-        if not fiis_data or "list" not in fiis_data:
-            return jsonify({"error": "Error fetching FII data from StatusInvest."}), 500
-
-        cached_fiis = fiis_data["list"]
-        tickers = {fii["ticker"] for fii in cached_fiis}
-
-        existing_fiis = Fii.query.filter(Fii.ticker.in_(tickers)).all()
-        existing_tickers = {fii.ticker for fii in existing_fiis}
-
-        numeric_fields = [
-            "price",
-            "sectorid",
-            "subsectorid",
-            "segmentid",
-            "gestao",
-            "dy",
-            "p_vp",
-            "valorpatrimonialcota",
-            "liquidezmediadiaria",
-            "percentualcaixa",
-            "dividend_cagr",
-            "cota_cagr",
-            "numerocotistas",
-            "numerocotas",
-            "patrimonio",
-            "lastdividend",
-        ]
-
-        for fii_data in cached_fiis:
-            for field in numeric_fields:
-                fii_data[field] = fii_data.get(field, 0.0)
-
-        cached_map = {item["ticker"]: item for item in cached_fiis}
-        for fii in existing_fiis:
-            for key, value in cached_map[fii.ticker].items():
-                setattr(fii, key, value)
-
-        new_fiis = [
-            Fii(**fii_data)
-            for fii_data in cached_fiis
-            if fii_data["ticker"] not in existing_tickers
-        ]
-
-        db.session.add_all(new_fiis)
-        db.session.commit()
+        run_fii_update(JobProgress())
         return jsonify({"message": "FIIs updated successfully."}), 200
+    except IngestionError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         db.session.rollback()
         logging.error(f"An error occurred: {e}")
         return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def enqueue_fii_update(user_id=None):
+    return enqueue_job(FIIS, run_fii_update, user_id, message="FII update queued")
@@ -0,0 +1,104 @@
+import logging
+from datetime import date, datetime
+
+from flask import jsonify
+from sqlalchemy import select
+
+from models.fii_snapshot import FiiSnapshot
+from models.stock_snapshot import StockSnapshot
+from config import db
+from services.bulk_upsert import upsert_rows
+from services.dataset_versions import FIIS, STOCKS, bump_version
+from services.fieldsets import parse_fields
+
+STOCK_HISTORY = "stock_history"
+FII_HISTORY = "fii_history"
+
+# asset -> (tabela de snapshots, dataset versionado para o ETag)
+HISTORY_SOURCES = {
+    STOCKS: (StockSnapshot, STOCK_HISTORY),
+    FIIS: (FiiSnapshot, FII_HISTORY),
+}
+
+KEY_COLUMNS = ("ticker", "snapshot_date")
+
+
+def snapshot_metrics(model):
+    return tuple(
+        name for name in model.__table__.columns.keys() if name not in KEY_COLUMNS
+    )
+
+
+def _today_snapshot(model, metrics, day):
+    query = select(model.ticker, *[getattr(model, m) for m in metrics]).where(
+        model.snapshot_date == day
+    )
+    return {row[0]: tuple(row[1:]) for row in db.session.execute(query)}
+
+
+def record_snapshot(asset, rows, snapshot_date=None):
+    """Grava a foto do dia de rows na tabela de snapshots do asset.
+
+    Só as métricas de snapshot_metrics são guardadas. Rodar de novo no mesmo
+    dia só regrava os tickers cujas métricas mudaram desde a foto do dia (ou
+    que ainda não têm foto nele), e a versão do histórico só sobe se algo foi
+    gravado. O commit é do chamador; retorna o número de linhas gravadas.
+    """
+    model, dataset = HISTORY_SOURCES[asset]
+    day = snapshot_date or datetime.utcnow().date()
+    metrics = snapshot_metrics(model)
+    stored = _today_snapshot(model, metrics, day) if rows else {}
+    records = []
+    for row in rows:
+        values = tuple(row.get(metric) for metric in metrics)
+        if stored.get(row["ticker"]) == values:
+            continue
+        records.append(
+            {
+                "ticker": row["ticker"],
+                "snapshot_date": day,
+                **dict(zip(metrics, values)),
+            }
+        )
+    if records:
+        upsert_rows(model, records)
+        bump_version(dataset)
+    return len(records)
+
+
+def _parse_date(raw):
+    if raw in (None, ""):
+        return None
+    return date.fromisoformat(raw)
+
+
+def get_history(asset, ticker, date_from=None, date_to=None, fields=None):
+    """Série de um ativo entre date_from e date_to (inclusive, ISO 8601),
+    lendo só as colunas pedidas em fields (todas as métricas por padrão)."""
+    try:
+        model, _ = HISTORY_SOURCES[asset]
+        try:
+            start, end = _parse_date(date_from), _parse_date(date_to)
+        except ValueError:
+            return jsonify({"message": "Invalid date"}), 400
+        if start and end and start > end:
+            return jsonify({"message": "from must not be after to"}), 400
+
+        metrics = snapshot_metrics(model)
+        fields = parse_fields(fields, metrics, always=()) or list(metrics)
+        query = select(model.snapshot_date, *[getattr(model, f) for f in fields])
+        query = query.where(model.ticker == ticker)
+        if start:
+            query = query.where(model.snapshot_date >= start)
+        if end:
+            query = query.where(model.snapshot_date <= end)
+        query = query.order_by(model.snapshot_date)
+
+        data = [
+            {"date": row[0].isoformat(), **dict(zip(fields, row[1:]))}
+            for row in db.session.execute(query)
+        ]
+        return jsonify({"ticker": ticker, "fields": fields, "data": data}), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
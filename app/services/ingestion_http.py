@@ -0,0 +1,156 @@
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from flask import current_app, has_app_context, jsonify
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+RetryPolicy = namedtuple(
+    "RetryPolicy", "retries backoff backoff_max connect_timeout pool_size"
+)
+
+DEFAULT_POLICY = RetryPolicy(
+    retries=3, backoff=0.5, backoff_max=8.0, connect_timeout=5.0, pool_size=10
+)
+
+
+def retry_policy():
+    """Política lida da configuração do app. Deve ser obtida na thread da
+    requisição e repassada às threads de trabalho, que não têm contexto."""
+    if not has_app_context():
+        return DEFAULT_POLICY
+    config = current_app.config
+    return RetryPolicy(
+        retries=config.get("INGESTION_HTTP_RETRIES", DEFAULT_POLICY.retries),
+        backoff=config.get("INGESTION_HTTP_BACKOFF", DEFAULT_POLICY.backoff),
+        backoff_max=config.get(
+            "INGESTION_HTTP_BACKOFF_MAX", DEFAULT_POLICY.backoff_max
+        ),
+        connect_timeout=config.get(
+            "INGESTION_HTTP_CONNECT_TIMEOUT", DEFAULT_POLICY.connect_timeout
+        ),
+        pool_size=config.get("INGESTION_HTTP_POOL_SIZE", DEFAULT_POLICY.pool_size),
+    )
+
+
+def backoff_delay(attempt, policy, response=None):
+    """Espera antes da tentativa attempt + 1: exponencial com jitter total,
+    limitada a backoff_max; um Retry-After numérico é respeitado até o mesmo
+    limite."""
+    delay = random.uniform(0, min(policy.backoff_max, policy.backoff * 2**attempt))
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return min(delay, policy.backoff_max)
+
+
+class CallStats:
+    __slots__ = ("calls", "errors", "retries", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def to_json(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else None,
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1),
+        }
+
+
+class IngestionClient:
+    """Cliente HTTP compartilhado pela ingestão.
+
+    Uma única requests.Session (keep-alive, pool de pool_size conexões por
+    host) atende todas as threads; falhas de rede e respostas em
+    RETRY_STATUSES são repetidas com backoff exponencial. Latência, erros e
+    novas tentativas são contados por nome de chamada.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def session(self, policy):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=policy.pool_size, pool_maxsize=policy.pool_size
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _record(self, name, elapsed_ms=None, error=False, retry=False):
+        with self._lock:
+            stats = self._stats.setdefault(name, CallStats())
+            if elapsed_ms is not None:
+                stats.calls += 1
+                stats.total_ms += elapsed_ms
+                stats.last_ms = elapsed_ms
+                stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.errors += error
+            stats.retries += retry
+
+    def get(self, url, name, policy=None, timeout=None, **kwargs):
+        """GET com novas tentativas. Retorna a última resposta (mesmo que com
+        erro HTTP) ou propaga a última exceção de rede."""
+        policy = policy or retry_policy()
+        session = self.session(policy)
+        timeout = (policy.connect_timeout, timeout)
+        for attempt in range(policy.retries + 1):
+            last = attempt == policy.retries
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(name, (time.perf_counter() - started) * 1000, error=True)
+                if last:
+                    raise
+                logging.warning(f"{name}: {e}; retrying")
+                self._record(name, retry=True)
+                time.sleep(backoff_delay(attempt, policy))
+                continue
+
+            failed = response.status_code >= 400
+            self._record(name, (time.perf_counter() - started) * 1000, error=failed)
+            if response.status_code not in RETRY_STATUSES or last:
+                return response
+            logging.warning(f"{name}: HTTP {response.status_code}; retrying")
+            self._record(name, retry=True)
+            time.sleep(backoff_delay(attempt, policy, response))
+
+    def stats(self):
+        with self._lock:
+            return {name: stats.to_json() for name, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+ingestion_client = IngestionClient()
+
+
+def get_ingestion_http_stats():
+    try:
+        return jsonify(ingestion_client.stats()), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
@@ -0,0 +1,139 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+
+from models.ingestion_job import IngestionJob
+from models.ingestion_lock import IngestionLock
+from config import db
+
+
+class JobAlreadyRunning(RuntimeError):
+    """Outra execução da mesma atualização está com o lock."""
+
+    def __init__(self, name, job_id=None):
+        self.name = name
+        self.job_id = job_id
+        message = "Update already running"
+        if job_id is not None:
+            message += f", job id {job_id}"
+        super().__init__(message)
+
+
+def _advisory_key(name):
+    # pg_try_advisory_lock recebe um bigint; o hash é estável entre processos.
+    digest = hashlib.sha1(f"ingestion:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class NamedLock:
+    """Lock entre processos de uma atualização (stocks, fiis, predictions).
+
+    No PostgreSQL é um pg_try_advisory_lock de sessão, preso a uma conexão
+    própria até release(); se o processo morrer, o banco solta o lock. Nos
+    demais bancos é uma linha em ingestion_locks, inserida ou recusada pela
+    chave primária; uma linha mais velha que INGESTION_LOCK_STALE_SECONDS é
+    tida como de um processo que morreu e é substituída.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.held = False
+        self._conn = None
+        self._acquired_at = None
+
+    def acquire(self):
+        if db.engine.dialect.name == "postgresql":
+            self.held = self._acquire_advisory()
+        else:
+            self.held = self._acquire_row()
+        return self.held
+
+    def _acquire_advisory(self):
+        conn = db.engine.connect()
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": _advisory_key(self.name)},
+            ).scalar()
+            # O lock é da sessão: sobrevive ao commit e segura a conexão.
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def _acquire_row(self):
+        now = datetime.utcnow()
+        stale_after = current_app.config.get("INGESTION_LOCK_STALE_SECONDS", 3600)
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    delete(IngestionLock).where(
+                        IngestionLock.name == self.name,
+                        IngestionLock.acquired_at
+                        < now - timedelta(seconds=stale_after),
+                    )
+                )
+                conn.execute(
+                    insert(IngestionLock).values(name=self.name, acquired_at=now)
+                )
+        except IntegrityError:
+            return False
+        self._acquired_at = now
+        return True
+
+    def release(self):
+        if not self.held:
+            return
+        self.held = False
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": _advisory_key(self.name)},
+                )
+                conn.commit()
+            except Exception as e:
+                # Sem unlock a conexão não pode voltar ao pool com o lock.
+                logging.error(f"Advisory unlock of {self.name} failed: {e}")
+                conn.invalidate()
+            finally:
+                conn.close()
+            return
+        # Só apaga a própria linha, caso ela tenha sido tomada como velha.
+        with db.engine.begin() as conn:
+            conn.execute(
+                delete(IngestionLock).where(
+                    IngestionLock.name == self.name,
+                    IngestionLock.acquired_at == self._acquired_at,
+                )
+            )
+
+
+def running_job_id(kind, exclude=None):
+    """Id do job mais recente de kind ainda na fila ou rodando, fora exclude."""
+    query = select(func.max(IngestionJob.id)).where(
+        IngestionJob.kind == kind,
+        IngestionJob.status.in_(("queued", "running")),
+    )
+    if exclude is not None:
+        query = query.where(IngestionJob.id != exclude)
+    return db.session.scalar(query)
+
+
+def acquire_ingestion_lock(kind, job_id=None):
+    """Retorna o NamedLock de kind já adquirido para o job job_id ou levanta
+    JobAlreadyRunning com o job que está com ele."""
+    lock = NamedLock(kind)
+    if not lock.acquire():
+        raise JobAlreadyRunning(kind, running_job_id(kind, exclude=job_id))
+    return lock
@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app, jsonify
+from sqlalchemy import update
+
+from models.ingestion_job import IngestionJob
+from config import db
+from services.ingestion_lock import JobAlreadyRunning, acquire_ingestion_lock
+
+
+class IngestionError(RuntimeError):
+    """Falha esperada da ingestão (fonte indisponível, dados inválidos)."""
+
+
+def _update_job(job_id, **values):
+    # Conexão própria: o progresso fica visível sem dar commit na transação
+    # da ingestão, que só é confirmada no fim da etapa de escrita.
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(IngestionJob).where(IngestionJob.id == job_id).values(**values)
+        )
+
+
+class JobProgress:
+    """Etapas, contagens e tempos de uma execução.
+
+    Sem job_id (execução síncrona) só acumula os valores; com job_id cada
+    mudança é gravada em ingestion_jobs.
+    """
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id
+        self.rows = {}
+        self.timings = {}
+        self._phase = None
+        self._phase_started = None
+        self._started = time.perf_counter()
+
+    def _close_phase(self):
+        if self._phase is not None:
+            elapsed = (time.perf_counter() - self._phase_started) * 1000
+            self.timings[self._phase] = round(elapsed, 1)
+        self.timings["total"] = round((time.perf_counter() - self._started) * 1000, 1)
+
+    def _save(self, **values):
+        if self.job_id is not None:
+            _update_job(
+                self.job_id, rows=dict(self.rows), timings=dict(self.timings), **values
+            )
+
+    def phase(self, name):
+        self._close_phase()
+        self._phase = name
+        self._phase_started = time.perf_counter()
+        self._save(phase=name)
+
+    def count(self, **rows):
+        self.rows.update(rows)
+
+    def finish(self, **values):
+        self._close_phase()
+        self._phase = None
+        self._save(**values)
+
+
+class JobRunner:
+    """Executa jobs de ingestão fora da thread da requisição.
+
+    O job é gravado como "queued" e entregue a um pool de JOBS_MAX_WORKERS
+    threads (1 por padrão, o que serializa as atualizações no processo); a
+    função recebe um JobProgress e roda dentro de um contexto do app.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get("JOBS_MAX_WORKERS", 1),
+                    thread_name_prefix="ingestion-job",
+                )
+            return self._executor
+
+    def submit(self, kind, func, user_id=None):
+        job = IngestionJob(
+            kind=kind,
+            status="queued",
+            phase="queued",
+            created_by=int(user_id) if user_id is not None else None,
+            created_at=datetime.utcnow(),
+        )
+        db.session.add(job)
+        db.session.commit()
+        # O job é gravado antes do lock: quem tem o lock sempre já tem uma
+        # linha em ingestion_jobs para o 409 apontar. O lock fica com o job até
+        # o fim de _run; se outro processo já o tem, o job é marcado como
+        # falho e JobAlreadyRunning é levantada.
+        lock = None
+        try:
+            lock = acquire_ingestion_lock(kind, job.id)
+            app = current_app._get_current_object()
+            self._get_executor().submit(self._run, app, job.id, func, lock)
+        except Exception as e:
+            if lock is not None:
+                lock.release()
+            _update_job(
+                job.id, status="failed", error=str(e), finished_at=datetime.utcnow()
+            )
+            raise
+        return job
+
+    def _run(self, app, job_id, func, lock=None):
+        with app.app_context():
+            progress = JobProgress(job_id)
+            try:
+                _update_job(job_id, status="running", started_at=datetime.utcnow())
+                func(progress)
+                progress.finish(
+                    status="succeeded", phase="done", finished_at=datetime.utcnow()
+                )
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Job {job_id} failed: {e}")
+                progress.finish(
+                    status="failed", error=str(e), finished_at=datetime.utcnow()
+                )
+            finally:
+                if lock is not None:
+                    try:
+                        lock.release()
+                    except Exception as e:
+                        logging.error(f"Job {job_id} lock release failed: {e}")
+                db.session.remove()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+job_runner = JobRunner()
+
+
+def enqueue_job(kind, func, user_id=None, message="Job queued"):
+    try:
+        job = job_runner.submit(kind, func, user_id)
+        location = f"/v1/jobs/{job.id}"
+        return (
+            jsonify({"message": message, "job_id": job.id, "status_url": location}),
+            202,
+            {"Location": location},
+        )
+    except JobAlreadyRunning as e:
+        db.session.rollback()
+        body = {"message": str(e)}
+        if e.job_id is not None:
+            body["job_id"] = e.job_id
+            body["status_url"] = f"/v1/jobs/{e.job_id}"
+        return jsonify(body), 409
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def get_job(job_id):
+    try:
+        job = db.session.get(IngestionJob, job_id)
+        if job is None:
+            return jsonify({"message": "Job not found"}), 404
+        return jsonify(job.to_json()), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
@@ -0,0 +1,136 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+
+from sqlalchemy import and_, or_
+from sqlalchemy.engine import Row
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise InvalidCursorError(str(e))
+    if not isinstance(payload, dict) or "k" not in payload:
+        raise InvalidCursorError("Malformed cursor")
+    return payload
+
+
+def filters_fingerprint(filters):
+    raw = json.dumps(filters or [], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def _keyset_order(sort_col, key_col, descending):
+    if sort_col is None:
+        return [key_col.desc() if descending else key_col.asc()]
+    if descending:
+        return [sort_col.desc().nulls_first(), key_col.desc()]
+    return [sort_col.asc().nulls_last(), key_col.asc()]
+
+
+def _seek_condition(sort_col, key_col, descending, value, key):
+    """Linhas estritamente depois de (value, key) na ordem de _keyset_order.
+
+    A ordem segue o padrão do PostgreSQL: NULLs por último em ASC e
+    primeiro em DESC, com o ticker como desempate.
+    """
+    if sort_col is None:
+        return key_col < key if descending else key_col > key
+    if descending:
+        if value is None:
+            return or_(and_(sort_col.is_(None), key_col < key), sort_col.isnot(None))
+        return or_(sort_col < value, and_(sort_col == value, key_col < key))
+    if value is None:
+        return and_(sort_col.is_(None), key_col > key)
+    return or_(
+        sort_col > value,
+        and_(sort_col == value, key_col > key),
+        sort_col.is_(None),
+    )
+
+
+def keyset_paginate(
+    query,
+    model,
+    key_name,
+    sort_by,
+    sort_dir,
+    filters,
+    cursor,
+    per_page,
+    with_total=False,
+):
+    """Pagina por chave (seek) em vez de OFFSET.
+
+    O cursor carrega o valor da coluna de ordenação e a chave da última linha
+    entregue, além do total já contado (quando pedido), para que as páginas
+    seguintes não voltem a executar COUNT(*).
+
+    Retorna (items, pagination_dict).
+    """
+    descending = sort_dir == "desc"
+    key_col = getattr(model, key_name)
+    sort_col = getattr(model, sort_by) if sort_by else None
+    fingerprint = filters_fingerprint(filters)
+
+    state = decode_cursor(cursor) if cursor else None
+    if state is not None and (
+        state.get("s") != sort_by
+        or state.get("d") != ("desc" if descending else "asc")
+        or state.get("f") != fingerprint
+    ):
+        raise InvalidCursorError("Cursor does not match the current query")
+
+    total = state.get("n") if state else None
+    if with_total and total is None:
+        total = query.order_by(None).count()
+
+    if state is not None:
+        query = query.filter(
+            _seek_condition(sort_col, key_col, descending, state.get("v"), state["k"])
+        )
+    items = (
+        query.order_by(None)
+        .order_by(*_keyset_order(sort_col, key_col, descending))
+        .limit(per_page + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        # Em queries com mais de uma entidade a primeira é o modelo paginado.
+        if isinstance(last, Row):
+            last = last[0]
+        next_cursor = encode_cursor(
+            {
+                "s": sort_by,
+                "d": "desc" if descending else "asc",
+                "f": fingerprint,
+                "v": getattr(last, sort_by) if sort_by else None,
+                "k": getattr(last, key_name),
+                "n": total,
+            }
+        )
+
+    pagination = {
+        "next_cursor": next_cursor,
+        "per_page": per_page,
+        "total": total,
+        "pages": math.ceil(total / per_page) if total else (0 if with_total else None),
+    }
+    return items, pagination
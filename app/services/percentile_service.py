@@ -0,0 +1,144 @@
+import numpy as np
+from sqlalchemy import delete, select
+
+from models.asset_percentile import AssetPercentile
+from models.fii import Fii
+from models.stock import Stock
+from config import db
+from services.bulk_upsert import upsert_rows
+from services.dataset_versions import FIIS, STOCKS
+from services.ranking import percentile_ranks, split_percentile_id
+from services.sector_stats_service import FII_STAT_METRICS, STOCK_STAT_METRICS
+
+# Todas as colunas numéricas de STOCK_ALLOWED_COLS / FII_ALLOWED_COLS.
+STOCK_PERCENTILE_METRICS = STOCK_STAT_METRICS + (
+    "roic_rank",
+    "ey_rank",
+    "magic_formula_rank",
+)
+FII_PERCENTILE_METRICS = FII_STAT_METRICS
+
+PERCENTILE_SOURCES = {
+    STOCKS: (Stock, STOCK_PERCENTILE_METRICS),
+    FIIS: (Fii, FII_PERCENTILE_METRICS),
+}
+
+DELETE_BATCH_SIZE = 500
+
+_ASSET_BY_MODEL = {model: asset for asset, (model, _) in PERCENTILE_SOURCES.items()}
+
+
+def _stored_percentiles(asset, tickers, metrics):
+    """Matrizes (pct, sector_pct, presente) gravadas, alinhadas a tickers x
+    metrics, e os tickers gravados que não estão mais no universo."""
+    row_of = {ticker: i for i, ticker in enumerate(tickers)}
+    column_of = {metric: j for j, metric in enumerate(metrics)}
+    shape = (len(tickers), len(metrics))
+    pct = np.full(shape, np.nan)
+    sector_pct = np.full(shape, np.nan)
+    present = np.zeros(shape, dtype=bool)
+    removed = set()
+    result = db.session.execute(
+        select(
+            AssetPercentile.ticker,
+            AssetPercentile.metric,
+            AssetPercentile.pct,
+            AssetPercentile.sector_pct,
+        ).where(AssetPercentile.asset == asset)
+    )
+    for ticker, metric, stored_pct, stored_sector_pct in result:
+        i = row_of.get(ticker)
+        j = column_of.get(metric)
+        if i is None:
+            removed.add(ticker)
+        elif j is not None:
+            present[i, j] = True
+            pct[i, j] = np.nan if stored_pct is None else stored_pct
+            sector_pct[i, j] = (
+                np.nan if stored_sector_pct is None else stored_sector_pct
+            )
+    return pct, sector_pct, present, sorted(removed)
+
+
+def _differs(new, old):
+    return ~((new == old) | (np.isnan(new) & np.isnan(old)))
+
+
+def refresh_percentiles(asset):
+    """Recalcula asset_percentiles do asset na transação corrente.
+
+    Cada métrica é ranqueada de uma vez com NumPy sobre a coluna inteira, no
+    universo e dentro de cada setor. Só os percentis que mudaram são gravados
+    (upsert) e os de tickers que saíram do universo são apagados: uma edição
+    ou um pregão mexem em uma fração dos ~30 percentis de cada ativo. O commit
+    é do chamador; retorna o número de percentis gravados.
+    """
+    model, metrics = PERCENTILE_SOURCES[asset]
+    result = db.session.execute(
+        select(model.ticker, model.sectorname, *[getattr(model, m) for m in metrics])
+    ).all()
+    tickers = [row[0] for row in result]
+    sectors = [row[1] for row in result]
+    matrix = np.array([row[2:] for row in result], dtype=np.float64).reshape(
+        len(result), len(metrics)
+    )
+
+    pct = np.empty_like(matrix)
+    sector_pct = np.empty_like(matrix)
+    for j in range(len(metrics)):
+        pct[:, j] = percentile_ranks(matrix[:, j])
+        sector_pct[:, j] = percentile_ranks(matrix[:, j], sectors)
+
+    stored_pct, stored_sector_pct, present, removed = _stored_percentiles(
+        asset, tickers, metrics
+    )
+    changed = (
+        ~present | _differs(pct, stored_pct) | _differs(sector_pct, stored_sector_pct)
+    )
+    records = [
+        {
+            "asset": asset,
+            "ticker": tickers[i],
+            "metric": metrics[j],
+            "pct": None if np.isnan(pct[i, j]) else float(pct[i, j]),
+            "sector_pct": (
+                None if np.isnan(sector_pct[i, j]) else float(sector_pct[i, j])
+            ),
+        }
+        for i, j in zip(*np.nonzero(changed))
+    ]
+
+    for start in range(0, len(removed), DELETE_BATCH_SIZE):
+        db.session.execute(
+            delete(AssetPercentile).where(
+                AssetPercentile.asset == asset,
+                AssetPercentile.ticker.in_(removed[start : start + DELETE_BATCH_SIZE]),
+            )
+        )
+    upsert_rows(AssetPercentile, records)
+    return len(records)
+
+
+def percentile_filter(model, col_id, value):
+    """Cláusula para filtros "<métrica>__pct" / "<métrica>__sector_pct" com
+    value = [min, max] (0-100), ou None se col_id não for um deles.
+
+    Vira um ticker IN (subconsulta) resolvido pelo índice de asset_percentiles.
+    """
+    parsed = split_percentile_id(col_id)
+    asset = _ASSET_BY_MODEL.get(model)
+    if parsed is None or asset is None or not isinstance(value, list):
+        return None
+    metric, kind = parsed
+    if metric not in PERCENTILE_SOURCES[asset][1]:
+        return None
+    column = getattr(AssetPercentile, kind)
+    subquery = select(AssetPercentile.ticker).where(
+        AssetPercentile.asset == asset, AssetPercentile.metric == metric
+    )
+    min_val, max_val = value[0], value[1]
+    if min_val not in (None, ""):
+        subquery = subquery.where(column >= float(min_val))
+    if max_val not in (None, ""):
+        subquery = subquery.where(column <= float(max_val))
+    return model.ticker.in_(subquery)
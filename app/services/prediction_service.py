@@ -1,43 +1,204 @@
 import logging
+import threading
 
 from flask import jsonify
-from sqlalchemy import func
+from sqlalchemy import select
 
 from models.stock_prediction import StockPrediction
+from models.latest_stock_prediction import LatestStockPrediction
 from config import db
+from services.dataset_versions import PREDICTIONS, bump_version, get_version
+from services.export_services import InvalidExportFormatError, export_response
+from services.prediction_triggers import ensure_prediction_triggers
+from services.arrow_export import ARROW_FORMATS, ArrowUnavailableError, arrow_response
+
+ML_FIELDS = (
+    "ml_label",
+    "ml_score",
+    "ml_prob_barata",
+    "ml_prob_neutra",
+    "ml_prob_cara",
+)
+
+LATEST_COLUMNS = [
+    "ticker",
+    "run_date",
+    "label",
+    "prob_barata",
+    "prob_neutra",
+    "prob_cara",
+    "composite_score",
+    "model_version",
+]
+
+# Campos de LatestStockPrediction.to_json(), cabeçalho da exportação.
+EXPORT_COLUMNS = (
+    "ticker",
+    "label",
+    "prob_barata",
+    "prob_neutra",
+    "prob_cara",
+    "composite_score",
+    "model_version",
+    "run_date",
+)
+
+
+class CachedPrediction:
+    """Cópia desacoplada da sessão de uma LatestStockPrediction."""
+
+    __slots__ = tuple(LATEST_COLUMNS)
+
+    def __init__(self, prediction):
+        for col in LATEST_COLUMNS:
+            setattr(self, col, getattr(prediction, col))
+
+    def to_json(self):
+        return {
+            "ticker": self.ticker,
+            "label": self.label,
+            "prob_barata": self.prob_barata,
+            "prob_neutra": self.prob_neutra,
+            "prob_cara": self.prob_cara,
+            "composite_score": self.composite_score,
+            "model_version": self.model_version,
+            "run_date": self.run_date.isoformat() if self.run_date else None,
+        }
+
+
+class PredictionCache:
+    """Mapa {ticker: CachedPrediction} compartilhado pelo processo.
+
+    O mapa é recarregado quando a versão do dataset "predictions" muda; ela é
+    incrementada pelo trigger de stock_predictions e por
+    refresh_latest_predictions, e lida via cache de versões (ver
+    services.dataset_versions).
+    """
+
+    def __init__(self):
+        self._map = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._map = None
+            self._version = None
+
+    def get_map(self):
+        version = get_version(PREDICTIONS)
+        with self._lock:
+            if self._map is not None and version == self._version:
+                self.hits += 1
+                return self._map
+
+            self.misses += 1
+            predictions = db.session.query(LatestStockPrediction).all()
+            self._map = {p.ticker: CachedPrediction(p) for p in predictions}
+            self._version = version
+            return self._map
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._map) if self._map is not None else 0,
+                "version": self._version,
+            }
+
+
+prediction_cache = PredictionCache()
 
 
 def get_latest_predictions_map():
-    """Retorna {ticker: StockPrediction} com a predição mais recente por ticker."""
-    latest_subq = (
-        db.session.query(
-            StockPrediction.ticker,
-            func.max(StockPrediction.run_date).label("max_run_date"),
-        )
-        .group_by(StockPrediction.ticker)
-        .subquery()
+    """Retorna {ticker: CachedPrediction} com a predição mais recente."""
+    return prediction_cache.get_map()
+
+
+def get_predictions_for_tickers(tickers):
+    """Retorna {ticker: CachedPrediction} só para os tickers pedidos."""
+    if not tickers:
+        return {}
+    pred_map = prediction_cache.get_map()
+    return {ticker: pred_map[ticker] for ticker in tickers if ticker in pred_map}
+
+
+def get_latest_prediction(ticker):
+    """Retorna a predição mais recente do ticker ou None."""
+    return prediction_cache.get_map().get(ticker)
+
+
+def refresh_latest_predictions():
+    """Reconstrói latest_stock_predictions a partir do histórico.
+
+    O trigger em stock_predictions mantém a tabela em dia a cada INSERT; esta
+    função serve para quando o histórico é alterado por fora (UPDATE/DELETE)
+    e reinstala o trigger se o pipeline de ML tiver recriado a tabela.
+    """
+    ensure_prediction_triggers()
+    newer = db.aliased(StockPrediction)
+    latest_id = (
+        select(newer.id)
+        .where(newer.ticker == StockPrediction.ticker)
+        .order_by(newer.run_date.desc(), newer.id.desc())
+        .limit(1)
+        .scalar_subquery()
     )
-    predictions = (
-        db.session.query(StockPrediction)
-        .join(
-            latest_subq,
-            db.and_(
-                StockPrediction.ticker == latest_subq.c.ticker,
-                StockPrediction.run_date == latest_subq.c.max_run_date,
-            ),
+    source = select(
+        StockPrediction.id.label("prediction_id"),
+        *[getattr(StockPrediction, col) for col in LATEST_COLUMNS],
+    ).where(StockPrediction.id == latest_id)
+
+    db.session.execute(LatestStockPrediction.__table__.delete())
+    db.session.execute(
+        LatestStockPrediction.__table__.insert().from_select(
+            ["prediction_id", *LATEST_COLUMNS], source
         )
-        .all()
     )
-    return {p.ticker: p for p in predictions}
+    bump_version(PREDICTIONS)
+    db.session.commit()
+    prediction_cache.invalidate()
+
+
+def init_prediction_triggers(app):
+    """Na partida, reinstala o trigger de stock_predictions se ele sumiu e,
+    nesse caso, reconstrói latest_stock_predictions."""
+    with app.app_context():
+        try:
+            if ensure_prediction_triggers():
+                refresh_latest_predictions()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"An error occurred: {e}")
+        finally:
+            db.session.remove()
 
 
-def attach_ml_fields(stock_json, pred):
-    """Adiciona campos de ML ao dict da ação. pred pode ser None."""
-    stock_json["ml_label"] = pred.label if pred else None
-    stock_json["ml_score"] = round(pred.composite_score, 1) if pred else None
-    stock_json["ml_prob_barata"] = pred.prob_barata if pred else None
-    stock_json["ml_prob_neutra"] = pred.prob_neutra if pred else None
-    stock_json["ml_prob_cara"] = pred.prob_cara if pred else None
+def run_prediction_refresh(progress):
+    """Job de refresh_latest_predictions (usado pelo agendador)."""
+    progress.phase("write")
+    refresh_latest_predictions()
+    progress.count(latest=db.session.query(LatestStockPrediction).count())
+
+
+def attach_ml_fields(stock_json, pred, fields=None):
+    """Adiciona campos de ML ao dict da ação. pred pode ser None.
+
+    Com fields informado, só os campos de ML presentes nele são adicionados.
+    """
+    ml_json = {
+        "ml_label": pred.label if pred else None,
+        "ml_score": round(pred.composite_score, 1) if pred else None,
+        "ml_prob_barata": pred.prob_barata if pred else None,
+        "ml_prob_neutra": pred.prob_neutra if pred else None,
+        "ml_prob_cara": pred.prob_cara if pred else None,
+    }
+    for name, value in ml_json.items():
+        if fields is None or name in fields:
+            stock_json[name] = value
     return stock_json
 
 
@@ -52,12 +213,7 @@ def get_all_predictions():
 
 def get_prediction_by_ticker(ticker):
     try:
-        prediction = (
-            db.session.query(StockPrediction)
-            .filter(StockPrediction.ticker == ticker)
-            .order_by(StockPrediction.run_date.desc())
-            .first()
-        )
+        prediction = get_latest_prediction(ticker)
 
         if prediction is None:
             return jsonify({"message": "Prediction not found"}), 404
@@ -66,3 +222,35 @@ def get_prediction_by_ticker(ticker):
     except Exception as e:
         logging.error(f"An error occurred: {e}")
         return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def export_predictions(fmt="ndjson"):
+    """Exporta as últimas predições em NDJSON, CSV, Arrow ou Parquet."""
+    try:
+        names = list(EXPORT_COLUMNS)
+        if fmt in ARROW_FORMATS:
+            table_cols = LatestStockPrediction.__table__.columns
+            stmt = select(
+                *[getattr(LatestStockPrediction, name) for name in names]
+            ).order_by(LatestStockPrediction.ticker)
+            columns = [(name, table_cols[name].type) for name in names]
+            return arrow_response(stmt, columns, fmt, "predictions")
+        query = LatestStockPrediction.query.order_by(LatestStockPrediction.ticker)
+        return export_response(
+            query, lambda pred: pred.to_json(), names, fmt, "predictions"
+        )
+    except InvalidExportFormatError:
+        return jsonify({"message": "Invalid format"}), 400
+    except ArrowUnavailableError:
+        return jsonify({"message": "Format not available"}), 501
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def get_prediction_cache_stats():
+    try:
+        return jsonify(prediction_cache.stats()), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
@@ -0,0 +1,96 @@
+from sqlalchemy import inspect, text
+
+from config import db
+
+TRIGGER = "trg_latest_stock_prediction"
+BUMP_TRIGGER = "trg_bump_predictions_version"
+
+COLUMNS = (
+    "ticker, prediction_id, run_date, label, prob_barata, prob_neutra, "
+    "prob_cara, composite_score, model_version"
+)
+
+NEW_VALUES = (
+    "NEW.ticker, NEW.id, NEW.run_date, NEW.label, NEW.prob_barata, "
+    "NEW.prob_neutra, NEW.prob_cara, NEW.composite_score, NEW.model_version"
+)
+
+UPSERT_SET = (
+    "prediction_id = excluded.prediction_id, run_date = excluded.run_date, "
+    "label = excluded.label, prob_barata = excluded.prob_barata, "
+    "prob_neutra = excluded.prob_neutra, prob_cara = excluded.prob_cara, "
+    "composite_score = excluded.composite_score, "
+    "model_version = excluded.model_version"
+)
+
+UPSERT = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) VALUES ({NEW_VALUES}) "
+    f"ON CONFLICT (ticker) DO UPDATE SET {UPSERT_SET} "
+    "WHERE latest_stock_predictions.run_date <= excluded.run_date"
+)
+
+BUMP_PREDICTIONS = (
+    "UPDATE dataset_versions SET version = version + 1, "
+    "updated_at = CURRENT_TIMESTAMP WHERE name = 'predictions'"
+)
+
+
+def trigger_statements(dialect_name):
+    """DDL dos triggers de stock_predictions (os mesmos das migrations).
+
+    No PostgreSQL a versão é incrementada por um trigger FOR EACH STATEMENT,
+    uma vez por INSERT; no SQLite, que só tem FOR EACH ROW, pelo próprio
+    trigger de linha.
+    """
+    if dialect_name == "postgresql":
+        return [
+            "CREATE OR REPLACE FUNCTION refresh_latest_stock_prediction() "
+            f"RETURNS trigger AS $$ BEGIN {UPSERT}; RETURN NULL; END; $$ "
+            "LANGUAGE plpgsql",
+            "CREATE OR REPLACE FUNCTION bump_predictions_version() "
+            f"RETURNS trigger AS $$ BEGIN {BUMP_PREDICTIONS}; RETURN NULL; END; $$ "
+            "LANGUAGE plpgsql",
+            f"DROP TRIGGER IF EXISTS {TRIGGER} ON stock_predictions",
+            f"CREATE TRIGGER {TRIGGER} AFTER INSERT ON stock_predictions "
+            "FOR EACH ROW EXECUTE FUNCTION refresh_latest_stock_prediction()",
+            f"DROP TRIGGER IF EXISTS {BUMP_TRIGGER} ON stock_predictions",
+            f"CREATE TRIGGER {BUMP_TRIGGER} AFTER INSERT ON stock_predictions "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_predictions_version()",
+        ]
+    return [
+        f"DROP TRIGGER IF EXISTS {TRIGGER}",
+        f"CREATE TRIGGER {TRIGGER} AFTER INSERT ON stock_predictions "
+        f"FOR EACH ROW BEGIN {UPSERT}; {BUMP_PREDICTIONS}; END",
+    ]
+
+
+def trigger_names(dialect_name):
+    if dialect_name == "postgresql":
+        return [TRIGGER, BUMP_TRIGGER]
+    return [TRIGGER]
+
+
+def _has_trigger(conn, name):
+    if conn.dialect.name == "postgresql":
+        sql = "SELECT 1 FROM pg_trigger WHERE tgname = :name AND NOT tgisinternal"
+    else:
+        sql = "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"
+    return conn.execute(text(sql), {"name": name}).first() is not None
+
+
+def ensure_prediction_triggers():
+    """Instala os triggers se stock_predictions existe sem eles.
+
+    O pipeline de ML pode recriar stock_predictions (DROP/CREATE), levando os
+    triggers junto. Retorna True quando eles acabaram de ser instalados, caso
+    em que latest_stock_predictions precisa ser reconstruída.
+    """
+    with db.engine.begin() as conn:
+        if not inspect(conn).has_table("stock_predictions"):
+            return False
+        names = trigger_names(conn.dialect.name)
+        if all(_has_trigger(conn, name) for name in names):
+            return False
+        for statement in trigger_statements(conn.dialect.name):
+            conn.exec_driver_sql(statement)
+    return True
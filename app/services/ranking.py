@@ -0,0 +1,77 @@
+import numpy as np
+
+# Sufixos aceitos nos filtros de percentil: "<métrica>__pct" (universo) e
+# "<métrica>__sector_pct" (dentro do setor).
+PERCENTILE_KINDS = ("pct", "sector_pct")
+
+
+def split_percentile_id(col_id):
+    """Separa "p_l__sector_pct" em ("p_l", "sector_pct"); None se não for."""
+    metric, sep, kind = str(col_id).rpartition("__")
+    if sep and metric and kind in PERCENTILE_KINDS:
+        return metric, kind
+    return None
+
+
+def group_indices(labels):
+    """Gera (rótulo, índices das linhas) para cada rótulo; None fica de fora."""
+    labels = np.array(["" if label is None else label for label in labels], dtype=str)
+    present = np.flatnonzero(labels != "")
+    if not present.size:
+        return
+    groups, inverse = np.unique(labels[present], return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+    for group, rows in zip(groups, np.split(present[order], bounds)):
+        yield str(group), rows
+
+
+def descending_ranks(values, method="ordinal"):
+    """Posição de cada valor na ordem decrescente (1 = maior).
+
+    method="ordinal": empates ficam na ordem de entrada, como em
+    sorted(..., reverse=True). method="min": empates recebem a menor posição
+    do grupo (ranking de competição, 1, 2, 2, 4). Valores ausentes (None/NaN)
+    vão para o fim, empatados entre si no modo "min".
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keys = np.where(np.isnan(values), np.inf, -values)
+    order = np.argsort(keys, kind="stable")
+    positions = np.arange(1, values.size + 1)
+    if method == "min" and values.size:
+        ordered = keys[order]
+        starts = np.r_[True, ordered[1:] != ordered[:-1]]
+        positions = np.maximum.accumulate(np.where(starts, positions, 0))
+    elif method != "ordinal":
+        raise ValueError(f"Unknown rank method: {method}")
+    ranks = np.empty(values.size, dtype=np.int64)
+    ranks[order] = positions
+    return ranks
+
+
+def _percentiles(values):
+    out = np.full(values.shape, np.nan)
+    valid = ~np.isnan(values)
+    count = np.count_nonzero(valid)
+    if not count:
+        return out
+    present = values[valid]
+    ordered = np.sort(present)
+    below = np.searchsorted(ordered, present, side="left")
+    upto = np.searchsorted(ordered, present, side="right")
+    # Posto médio dos empates (1..n) sobre n, em 0-100.
+    out[valid] = (below + upto + 1) / 2 / count * 100
+    return out
+
+
+def percentile_ranks(values, groups=None):
+    """Percentil (0-100, crescente) de cada valor no universo ou, com groups,
+    dentro do próprio grupo. Empates recebem o posto médio; valores ou grupos
+    ausentes resultam em NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    if groups is None:
+        return _percentiles(values)
+    out = np.full(values.shape, np.nan)
+    for _, rows in group_indices(groups):
+        out[rows] = _percentiles(values[rows])
+    return out
@@ -0,0 +1,321 @@
+import logging
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from flask import jsonify
+from sqlalchemy import func, select
+
+from models.ingestion_job import IngestionJob
+from config import db
+from services.dataset_versions import FIIS, PREDICTIONS, STOCKS
+from services.fii_services import run_fii_update
+from services.ingestion_lock import JobAlreadyRunning
+from services.job_runner import job_runner
+from services.prediction_service import run_prediction_refresh
+from services.stock_services import run_stock_update
+
+# (nome, menor, maior) de cada campo de uma expressão cron.
+CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+# kind -> (chave da agenda na configuração, função do job)
+SCHEDULED_JOBS = {
+    STOCKS: ("SCHEDULE_STOCKS", run_stock_update),
+    FIIS: ("SCHEDULE_FIIS", run_fii_update),
+    PREDICTIONS: ("SCHEDULE_PREDICTIONS", run_prediction_refresh),
+}
+
+MAX_SLEEP_SECONDS = 60
+CATCH_UP_RETRY_SECONDS = 5
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        expr, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(value) for value in expr.split("-", 1))
+        else:
+            start = int(expr)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Invalid cron field: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+def _ran_since(kind, moment):
+    """Se ingestion_jobs já tem um job de kind criado em moment ou depois."""
+    since = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (
+        db.session.scalar(
+            select(IngestionJob.id)
+            .where(IngestionJob.kind == kind, IngestionJob.created_at >= since)
+            .limit(1)
+        )
+        is not None
+    )
+
+
+class CronSchedule:
+    """Expressão cron de 5 campos (minuto hora dia mês dia-da-semana).
+
+    Aceita *, listas, intervalos e passos (*/15, 10-17, 1-5, 0,30). Domingo é
+    0 ou 7. Como no cron, se dia e dia-da-semana forem restritos basta um
+    deles casar.
+    """
+
+    def __init__(self, expr):
+        parts = expr.split()
+        if len(parts) != len(CRON_FIELDS):
+            raise ValueError(f"Invalid cron expression: {expr}")
+        self.expr = " ".join(parts)
+        fields = [
+            _parse_field(part, low, high)
+            for part, (_, low, high) in zip(parts, CRON_FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = frozenset(0 if day == 7 else day for day in weekdays)
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday
+        if self._any_weekday:
+            return day
+        return day or weekday
+
+    def next_after(self, moment):
+        """Primeiro minuto cheio depois de moment que casa com a expressão
+        (no fuso de moment)."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                first = candidate.replace(day=1, hour=0, minute=0)
+                candidate = (first + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            else:
+                later = [m for m in self.minutes if m >= candidate.minute]
+                if later:
+                    return candidate.replace(minute=min(later))
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+        raise ValueError(f"Cron expression never matches: {self.expr}")
+
+
+class Schedule:
+    """Uma ou mais expressões cron separadas por ";" (por exemplo, uma para
+    o pregão e outra para a noite); vale a próxima de qualquer uma."""
+
+    def __init__(self, text):
+        self.text = text
+        self.crons = [CronSchedule(expr) for expr in text.split(";") if expr.strip()]
+
+    def next_after(self, moment):
+        return min(cron.next_after(moment) for cron in self.crons)
+
+
+class ScheduledJob:
+    def __init__(self, kind, schedule, func):
+        self.kind = kind
+        self.schedule = schedule
+        self.func = func
+        self.next_run = None
+        # Horário da agenda a que next_run corresponde, sem o jitter.
+        self.slot = None
+        self.last_run = None
+        self.last_job_id = None
+
+    def to_json(self):
+        return {
+            "kind": self.kind,
+            "schedule": self.schedule.text,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_job_id": self.last_job_id,
+        }
+
+
+class Scheduler:
+    """Agenda as atualizações dentro do processo.
+
+    Uma thread acorda a cada execução prevista (no máximo a cada
+    MAX_SLEEP_SECONDS) e entrega os jobs vencidos ao job_runner, como um PUT
+    de um admin. Cada horário recebe até SCHEDULER_JITTER_SECONDS de atraso
+    aleatório; antes de submeter, um job criado desde o horário sem jitter
+    (por outro processo ou por um admin) faz o horário ser pulado. Execuções
+    perdidas (processo parado, thread atrasada) viram uma única execução
+    imediata: na partida, a última linha de ingestion_jobs de cada tipo diz se
+    o horário seguinte a ela já passou.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.timezone = timezone.utc
+        self.jitter = 0
+        self.enabled = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.enabled = config.get("SCHEDULER_ENABLED", False)
+        self.timezone = ZoneInfo(config.get("SCHEDULER_TIMEZONE", "America/Sao_Paulo"))
+        self.jitter = config.get("SCHEDULER_JITTER_SECONDS", 60)
+        jobs = {}
+        for kind, (key, job_func) in SCHEDULED_JOBS.items():
+            schedule = Schedule(config.get(key) or "")
+            if schedule.crons:
+                jobs[kind] = ScheduledJob(kind, schedule, job_func)
+        with self._lock:
+            self.jobs = jobs
+
+    def _now(self):
+        return datetime.now(self.timezone)
+
+    def _plan(self, job, after):
+        """Guarda em job.slot o próximo horário da agenda depois de after e
+        retorna esse horário com o jitter."""
+        job.slot = job.schedule.next_after(after.astimezone(self.timezone))
+        return job.slot + timedelta(seconds=random.uniform(0, self.jitter))
+
+    def catch_up(self, now=None):
+        """Define a primeira execução de cada job; se o horário seguinte à
+        última execução registrada já passou (ou nunca houve execução), o job
+        roda já."""
+        now = now or self._now()
+        for job in self.jobs.values():
+            last = db.session.scalar(
+                select(func.max(IngestionJob.created_at)).where(
+                    IngestionJob.kind == job.kind
+                )
+            )
+            if last is not None:
+                job.last_run = last.replace(tzinfo=timezone.utc)
+            missed = (
+                job.schedule.next_after(job.last_run.astimezone(self.timezone))
+                if last is not None
+                else None
+            )
+            if missed is None or missed <= now:
+                job.slot = missed
+                job.next_run = now
+            else:
+                job.next_run = self._plan(job, now)
+
+    def tick(self, now=None):
+        """Submete os jobs vencidos e replaneja; retorna os segundos até o
+        próximo."""
+        now = now or self._now()
+        with self._lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if job.next_run is None or job.next_run > now:
+                continue
+            try:
+                # Com vários processos cada um sorteia seu jitter; o primeiro a
+                # chegar roda o horário e os demais o encontram já atendido.
+                if job.slot is not None and _ran_since(job.kind, job.slot):
+                    logging.info(
+                        f"Scheduled {job.kind} update for {job.slot.isoformat()} "
+                        "already ran"
+                    )
+                else:
+                    submitted = job_runner.submit(job.kind, job.func)
+                    job.last_job_id = submitted.id
+            except JobAlreadyRunning as e:
+                db.session.rollback()
+                logging.info(f"Scheduled {job.kind} update skipped: {e}")
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Scheduled {job.kind} update failed to start: {e}")
+            job.last_run = now
+            # Vários horários perdidos viram uma execução só.
+            job.next_run = self._plan(job, now)
+        pending = [job.next_run for job in jobs if job.next_run is not None]
+        if not pending:
+            return MAX_SLEEP_SECONDS
+        wait = (min(pending) - now).total_seconds()
+        return min(max(wait, 0), MAX_SLEEP_SECONDS)
+
+    def _loop(self, app):
+        caught_up = False
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    # Na partida o banco pode ainda estar migrando; tenta de
+                    # novo até conseguir ler ingestion_jobs.
+                    if not caught_up:
+                        self.catch_up()
+                        caught_up = True
+                    wait = self.tick()
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"An error occurred: {e}")
+                    wait = (
+                        CATCH_UP_RETRY_SECONDS if not caught_up else MAX_SLEEP_SECONDS
+                    )
+                finally:
+                    db.session.remove()
+                self._stop.wait(wait)
+
+    def start(self, app):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(app,), name="scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def status(self):
+        with self._lock:
+            jobs = [job.to_json() for job in self.jobs.values()]
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "timezone": str(self.timezone),
+            "jitter_seconds": self.jitter,
+            "jobs": jobs,
+        }
+
+
+scheduler = Scheduler()
+
+
+def init_scheduler(app):
+    """Lê as agendas da configuração e, com SCHEDULER_ENABLED, inicia a
+    thread do agendador."""
+    scheduler.configure(app.config)
+    if scheduler.enabled:
+        scheduler.start(app)
+
+
+def get_scheduler_status():
+    try:
+        return jsonify(scheduler.status()), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
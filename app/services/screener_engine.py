@@ -0,0 +1,202 @@
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import Float, Integer
+
+from config import db
+from services.dataset_versions import get_version
+from services.ranking import percentile_ranks, split_percentile_id
+
+LIKE_WILDCARDS = ("%", "_")
+
+
+class ScreenerPage:
+    __slots__ = ("rows", "total", "pages", "page", "per_page")
+
+    def __init__(self, rows, total, pages, page, per_page):
+        self.rows = rows
+        self.total = total
+        self.pages = pages
+        self.page = page
+        self.per_page = per_page
+
+
+class ScreenerSnapshot:
+    """Cópia colunar e imutável do universo, com uma linha por registro.
+
+    Colunas numéricas viram arrays float64 (None -> NaN) e colunas de texto
+    viram arrays em minúsculas para o filtro ilike. A ordem ascendente de cada
+    coluna (NULLs por último, desempate pelo ticker) é calculada na carga, de
+    modo que ordenar uma consulta é só indexar a permutação pela máscara.
+    """
+
+    def __init__(self, rows, allowed_cols, numeric_cols):
+        self.rows = sorted(rows, key=lambda row: row["ticker"])
+        self.size = len(self.rows)
+        self.numeric = {}
+        self.text = {}
+        self.text_present = {}
+        self.order = {}
+        self.percentiles = {}
+
+        for col in allowed_cols:
+            values = [row.get(col) for row in self.rows]
+            if col in numeric_cols:
+                array = np.array(
+                    [np.nan if v is None else v for v in values], dtype=np.float64
+                )
+                self.numeric[col] = array
+                self.order[col] = np.argsort(array, kind="stable")
+            else:
+                self.text[col] = np.array(
+                    [str(v).lower() if v is not None else "" for v in values],
+                    dtype=str,
+                )
+                self.text_present[col] = np.array(
+                    [v is not None for v in values], dtype=bool
+                )
+                self.order[col] = np.array(
+                    sorted(
+                        range(self.size),
+                        key=lambda i: (values[i] is None, values[i] or ""),
+                    ),
+                    dtype=np.intp,
+                )
+
+    def _percentile(self, col_id, value):
+        """Percentis de "<métrica>__pct" / "<métrica>__sector_pct", calculados
+        na primeira consulta e guardados no snapshot."""
+        parsed = split_percentile_id(col_id)
+        if parsed is None or parsed[0] not in self.numeric:
+            return None
+        if not isinstance(value, list):
+            return None
+        if col_id not in self.percentiles:
+            metric, kind = parsed
+            groups = None
+            if kind == "sector_pct":
+                groups = [row.get("sectorname") for row in self.rows]
+            self.percentiles[col_id] = percentile_ranks(self.numeric[metric], groups)
+        return self.percentiles[col_id]
+
+    def _filter_mask(self, filters):
+        """Mesma semântica de _apply_filters_and_sort; None se não suportado."""
+        mask = np.ones(self.size, dtype=bool)
+        for f in filters or []:
+            col_id = f.get("id")
+            value = f.get("value")
+            percentile = self._percentile(col_id, value)
+            if (col_id not in self.order and percentile is None) or value is None:
+                continue
+            if isinstance(value, list):
+                if percentile is not None:
+                    col = percentile
+                elif col_id in self.numeric:
+                    col = self.numeric[col_id]
+                else:
+                    return None
+                min_val, max_val = value[0], value[1]
+                if min_val not in (None, ""):
+                    mask &= col >= float(min_val)
+                if max_val not in (None, ""):
+                    mask &= col <= float(max_val)
+            elif value != "":
+                needle = str(value).lower()
+                if col_id not in self.text or any(w in needle for w in LIKE_WILDCARDS):
+                    return None
+                mask &= self.text_present[col_id]
+                mask &= np.char.find(self.text[col_id], needle) >= 0
+        return mask
+
+    def select(self, page, per_page, sort_by=None, sort_dir="asc", filters=None):
+        """Filtra, ordena e pagina em memória. Retorna None se a consulta
+        precisar de algo que só o banco sabe fazer."""
+        mask = self._filter_mask(filters)
+        if mask is None:
+            return None
+
+        if sort_by and sort_by in self.order:
+            order = self.order[sort_by]
+            if sort_dir == "desc":
+                order = order[::-1]
+            selected = order[mask[order]]
+        else:
+            selected = np.flatnonzero(mask)
+
+        page = page if page and page > 0 else 1
+        per_page = per_page if per_page and per_page > 0 else 20
+        total = int(selected.size)
+        start = (page - 1) * per_page
+        rows = [self.rows[i] for i in selected[start : start + per_page]]
+        pages = math.ceil(total / per_page) if total else 0
+        return ScreenerPage(rows, total, pages, page, per_page)
+
+
+class ScreenerEngine:
+    """Mantém o snapshot mais recente de um modelo e o recarrega quando
+    invalidado, quando a versão do dataset muda ou quando fica mais velho que
+    SCREENER_ENGINE_MAX_AGE."""
+
+    def __init__(self, model, allowed_cols, dataset=None):
+        self.model = model
+        self.allowed_cols = set(allowed_cols)
+        self.dataset = dataset
+        self.numeric_cols = {
+            col
+            for col in self.allowed_cols
+            if isinstance(model.__table__.c[col].type, (Float, Integer))
+        }
+        self._snapshot = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def _current_version(self):
+        return get_version(self.dataset) if self.dataset else None
+
+    def reload(self, version=None):
+        if version is None:
+            version = self._current_version()
+        records = db.session.query(self.model).all()
+        snapshot = ScreenerSnapshot(
+            [record.to_json() for record in records],
+            self.allowed_cols,
+            self.numeric_cols,
+        )
+        self._snapshot = snapshot
+        self._version = version
+        self._loaded_at = time.monotonic()
+        logging.info(
+            f"Screener snapshot for {self.model.__tablename__} loaded "
+            f"with {snapshot.size} rows"
+        )
+        return snapshot
+
+    def _is_fresh(self, snapshot, version, max_age):
+        return (
+            snapshot is not None
+            and version == self._version
+            and time.monotonic() - self._loaded_at < max_age
+        )
+
+    def snapshot(self):
+        max_age = current_app.config.get("SCREENER_ENGINE_MAX_AGE", 60)
+        version = self._current_version()
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot, version, max_age):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._is_fresh(snapshot, version, max_age):
+                snapshot = self.reload(version)
+        return snapshot
+
+    def select(self, page, per_page, sort_by=None, sort_dir="asc", filters=None):
+        return self.snapshot().select(page, per_page, sort_by, sort_dir, filters)
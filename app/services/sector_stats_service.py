@@ -0,0 +1,255 @@
+import logging
+import threading
+import warnings
+from datetime import datetime
+
+import numpy as np
+from flask import jsonify
+from sqlalchemy import delete, insert, select
+
+from models.fii import Fii
+from models.sector_stat import SectorStat
+from models.stock import Stock
+from config import db
+from services.dataset_versions import FIIS, STOCKS, bump_version, get_version
+from services.fieldsets import parse_fields
+from services.ranking import group_indices
+
+SECTOR_STATS = "sector_stats"
+
+STOCK_STAT_METRICS = (
+    "price",
+    "p_l",
+    "dy",
+    "p_vp",
+    "p_ebit",
+    "p_ativo",
+    "ev_ebit",
+    "margembruta",
+    "margemebit",
+    "margemliquida",
+    "p_capitalgiro",
+    "p_ativocirculante",
+    "giroativos",
+    "roe",
+    "roa",
+    "roic",
+    "dividaliquidapatrimonioliquido",
+    "dividaliquidaebit",
+    "pl_ativo",
+    "passivo_ativo",
+    "liquidezcorrente",
+    "peg_ratio",
+    "receitas_cagr5",
+    "vpa",
+    "lpa",
+    "valormercado",
+    "graham_formula",
+    "discount_to_graham",
+)
+
+FII_STAT_METRICS = (
+    "price",
+    "dy",
+    "p_vp",
+    "valorpatrimonialcota",
+    "liquidezmediadiaria",
+    "percentualcaixa",
+    "dividend_cagr",
+    "cota_cagr",
+    "numerocotistas",
+    "numerocotas",
+    "patrimonio",
+    "lastdividend",
+)
+
+# asset -> (modelo, {nível na API: coluna de agrupamento}, métricas)
+SECTOR_SOURCES = {
+    STOCKS: (
+        Stock,
+        {
+            "sector": "sectorname",
+            "subsector": "subsectorname",
+            "segment": "segmentname",
+        },
+        STOCK_STAT_METRICS,
+    ),
+    FIIS: (
+        Fii,
+        {"sector": "sectorname", "subsector": "subsectorname", "segment": "segment"},
+        FII_STAT_METRICS,
+    ),
+}
+
+QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+def _float_or_none(value):
+    return None if np.isnan(value) else float(value)
+
+
+def group_stats(labels, matrix):
+    """Agrega as colunas de matrix (linhas x métricas, NaN = ausente) por
+    rótulo. Linhas com rótulo None ficam de fora.
+
+    Gera (grupo, linhas do grupo, contagens, médias, quantis) com os vetores
+    já calculados para todas as métricas de uma vez; quantis tem uma linha
+    por valor de QUANTILES (interpolação linear, como percentile_cont).
+    """
+    for group, rows in group_indices(labels):
+        block = matrix[rows]
+        counts = np.count_nonzero(~np.isnan(block), axis=0)
+        with warnings.catch_warnings():
+            # Métrica sem nenhum valor no grupo: o resultado NaN vira null.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            means = np.nanmean(block, axis=0)
+            quantiles = np.nanquantile(block, QUANTILES, axis=0)
+        yield group, len(rows), counts, means, quantiles
+
+
+def refresh_sector_stats(asset):
+    """Recalcula sector_stats do asset na transação corrente.
+
+    Lê só as colunas de agrupamento e as métricas (sem instanciar modelos) e
+    substitui as linhas do asset; o commit é do chamador. Retorna o número de
+    linhas gravadas.
+    """
+    model, levels, metrics = SECTOR_SOURCES[asset]
+    group_cols = list(levels.values())
+    result = db.session.execute(
+        select(*[getattr(model, col) for col in group_cols + list(metrics)])
+    ).all()
+    matrix = np.array(
+        [row[len(group_cols) :] for row in result], dtype=np.float64
+    ).reshape(len(result), len(metrics))
+
+    now = datetime.utcnow()
+    records = []
+    for position, level in enumerate(levels):
+        labels = [row[position] for row in result]
+        for group, size, counts, means, quantiles in group_stats(labels, matrix):
+            for i, metric in enumerate(metrics):
+                lo, p25, median, p75, hi = quantiles[:, i]
+                records.append(
+                    {
+                        "asset": asset,
+                        "level": level,
+                        "group_name": group,
+                        "metric": metric,
+                        "size": size,
+                        "count": int(counts[i]),
+                        "mean": _float_or_none(means[i]),
+                        "median": _float_or_none(median),
+                        "p25": _float_or_none(p25),
+                        "p75": _float_or_none(p75),
+                        "min": _float_or_none(lo),
+                        "max": _float_or_none(hi),
+                        "updated_at": now,
+                    }
+                )
+
+    db.session.execute(delete(SectorStat).where(SectorStat.asset == asset))
+    if records:
+        db.session.execute(insert(SectorStat), records)
+    bump_version(SECTOR_STATS)
+    return len(records)
+
+
+class SectorStatsCache:
+    """Estatísticas de todos os grupos em memória, no formato da resposta.
+
+    Recarregado quando a versão do dataset "sector_stats" muda (a cada
+    refresh_sector_stats); a tabela tem poucos milhares de linhas.
+    """
+
+    def __init__(self):
+        self._data = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+            self._version = None
+
+    def get(self):
+        version = get_version(SECTOR_STATS)
+        with self._lock:
+            if self._data is not None and version == self._version:
+                return self._data
+
+            data = {}
+            stats = db.session.query(SectorStat).order_by(
+                SectorStat.asset, SectorStat.level, SectorStat.group_name
+            )
+            for stat in stats:
+                asset = data.setdefault(stat.asset, {"updated_at": None, "levels": {}})
+                groups = asset["levels"].setdefault(stat.level, {})
+                group = groups.setdefault(
+                    stat.group_name,
+                    {"group": stat.group_name, "size": stat.size, "metrics": {}},
+                )
+                group["metrics"][stat.metric] = stat.to_json()
+                if stat.updated_at and (
+                    asset["updated_at"] is None or stat.updated_at > asset["updated_at"]
+                ):
+                    asset["updated_at"] = stat.updated_at
+            self._data = data
+            self._version = version
+            return self._data
+
+
+sector_stats_cache = SectorStatsCache()
+
+
+def get_sector_stats(asset, level="sector", group=None, metrics=None):
+    try:
+        if level not in SECTOR_SOURCES[asset][1]:
+            return jsonify({"message": "Invalid level"}), 400
+        allowed = SECTOR_SOURCES[asset][2]
+        wanted = parse_fields(metrics, allowed, always=()) or list(allowed)
+
+        cached = sector_stats_cache.get().get(asset, {"updated_at": None, "levels": {}})
+        groups = cached["levels"].get(level, {})
+        if group is not None:
+            if group not in groups:
+                return jsonify({"message": "Group not found"}), 404
+            groups = {group: groups[group]}
+
+        data = [
+            {
+                "group": item["group"],
+                "size": item["size"],
+                "metrics": {
+                    name: item["metrics"][name]
+                    for name in wanted
+                    if name in item["metrics"]
+                },
+            }
+            for item in groups.values()
+        ]
+        updated_at = cached["updated_at"]
+        return (
+            jsonify(
+                {
+                    "level": level,
+                    "updated_at": updated_at.isoformat() if updated_at else None,
+                    "data": data,
+                }
+            ),
+            200,
+        )
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def rebuild_sector_stats(asset):
+    try:
+        rows = refresh_sector_stats(asset)
+        db.session.commit()
+        return jsonify({"message": "Sector stats updated", "rows": rows}), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
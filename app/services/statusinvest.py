@@ -0,0 +1,138 @@
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from flask import current_app, has_app_context
+
+from services.ingestion_http import ingestion_client, retry_policy
+
+BASE_URL = "https://statusinvest.com.br"
+SEARCH_PATH = "/category/advancedsearchresultpaginated"
+
+STOCK_CATEGORY = 1
+FII_CATEGORY = 2
+
+CATEGORY_NAMES = {STOCK_CATEGORY: "stocks", FII_CATEGORY: "fiis"}
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+    )
+}
+
+DEFAULTS = {
+    "STATUSINVEST_BASE_URL": BASE_URL,
+    "STATUSINVEST_PAGE_SIZE": 500,
+    "STATUSINVEST_MAX_WORKERS": 4,
+    "STATUSINVEST_TIMEOUT": 15,
+}
+
+
+class StatusInvestError(RuntimeError):
+    pass
+
+
+def _settings():
+    config = current_app.config if has_app_context() else {}
+    return {key: config.get(key, default) for key, default in DEFAULTS.items()}
+
+
+def _fetch_page(url, category_type, search, page, take, timeout, policy):
+    params = {
+        "search": search,
+        "orderColumn": "",
+        "isAsc": "",
+        "page": page,
+        "take": take,
+        "CategoryType": category_type,
+    }
+    response = ingestion_client.get(
+        url,
+        f"statusinvest:{CATEGORY_NAMES.get(category_type, category_type)}",
+        policy=policy,
+        timeout=timeout,
+        params=params,
+        headers=HEADERS,
+    )
+    if response.status_code != 200:
+        raise StatusInvestError(
+            f"HTTP error occurred: {response.status_code} (page {page})"
+        )
+    return response.json()
+
+
+def fetch_category(category_type, search_params):
+    """Universo completo de uma categoria do StatusInvest.
+
+    A primeira página informa totalResults; as demais são pedidas em paralelo
+    (no máximo STATUSINVEST_MAX_WORKERS por vez, cada uma com timeout próprio)
+    e juntadas na ordem das páginas, sem tickers repetidos. O passo é o
+    tamanho real da primeira página: se o servidor limitar take abaixo de
+    STATUSINVEST_PAGE_SIZE, as páginas seguintes são pedidas com esse limite.
+    A leitura continua enquanto faltarem tickers para chegar a totalResults ou
+    a última página vier cheia (o universo cresceu entre as chamadas). Uma
+    página com erro ou menos linhas recebidas que totalResults invalidam o
+    resultado (retorna None), para que ranks e percentis nunca sejam
+    calculados sobre um universo parcial.
+    """
+    try:
+        settings = _settings()
+        take = settings["STATUSINVEST_PAGE_SIZE"]
+        timeout = settings["STATUSINVEST_TIMEOUT"]
+        fetch = partial(
+            _fetch_page,
+            settings["STATUSINVEST_BASE_URL"].rstrip("/") + SEARCH_PATH,
+            category_type,
+            json.dumps(search_params),
+            take=take,
+            timeout=timeout,
+            policy=retry_policy(),
+        )
+
+        first = fetch(0)
+        pages = [first.get("list") or []]
+        total = first.get("totalResults")
+        step = len(pages[0])
+        if step < take:
+            fetch = partial(fetch, take=step)
+        if total is not None and 0 < step < total:
+            count = math.ceil(total / step)
+            workers = max(1, min(settings["STATUSINVEST_MAX_WORKERS"], count - 1))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(fetch, range(1, count))
+                pages.extend(result.get("list") or [] for result in results)
+
+        merged = {}
+        for page in pages:
+            for item in page:
+                merged.setdefault(item.get("ticker"), item)
+        while (
+            total is not None
+            and step > 0
+            and (len(merged) < total or len(pages[-1]) >= step)
+        ):
+            result = fetch(len(pages))
+            pages.append(result.get("list") or [])
+            before = len(merged)
+            for item in pages[-1]:
+                merged.setdefault(item.get("ticker"), item)
+            if len(merged) == before:
+                break  # página vazia ou repetida: não há mais o que ler
+
+        if total is not None and len(merged) < total:
+            received = sum(len(page) for page in pages)
+            if received < total:
+                raise StatusInvestError(
+                    f"Incomplete universe: {received} of {total} results"
+                )
+            logging.warning(
+                f"StatusInvest returned {received - len(merged)} repeated tickers "
+                f"({len(merged)} of {total} results)"
+            )
+        return {"list": list(merged.values()), "totalResults": len(merged)}
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return None
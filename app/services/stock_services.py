@@ -1,11 +1,33 @@
 import logging
-import json
-import requests
-from flask import jsonify
+from flask import current_app, jsonify
+from sqlalchemy import Boolean, select, type_coerce
 from models.stock import Stock
 from models.favorite import Favorite
 from config import db
-from services.prediction_service import get_latest_predictions_map, attach_ml_fields
+from models.latest_stock_prediction import LatestStockPrediction
+from services.prediction_service import (
+    ML_FIELDS,
+    get_predictions_for_tickers,
+    attach_ml_fields,
+)
+from services.fieldsets import load_only_option, model_fields, parse_fields, project
+from services.screener_engine import ScreenerEngine
+from services.pagination import InvalidCursorError, keyset_paginate
+from services.dataset_versions import STOCKS, bump_version
+from services.sector_stats_service import refresh_sector_stats
+from services.percentile_service import percentile_filter, refresh_percentiles
+from services.statusinvest import STOCK_CATEGORY, fetch_category
+from services.job_runner import IngestionError, JobProgress, enqueue_job
+from services.change_detection import forget_row_hash, write_changed_rows
+from services.history_service import record_snapshot
+from services.enrichment import enrich_stocks
+from services.export_services import InvalidExportFormatError, export_response
+from services.arrow_export import (
+    ARROW_FORMATS,
+    ArrowUnavailableError,
+    arrow_response,
+    round_score,
+)
 
 STOCK_ALLOWED_COLS = {
     "ticker",
@@ -46,12 +68,20 @@ STOCK_ALLOWED_COLS = {
     "magic_formula_rank",
 }
 
+MAX_BATCH_TICKERS = 300
+
+stock_screener = ScreenerEngine(Stock, STOCK_ALLOWED_COLS, dataset=STOCKS)
+
 
 def _apply_filters_and_sort(query, model, allowed_cols, sort_by, sort_dir, filters):
     if filters:
         for f in filters:
             col_id = f.get("id")
             value = f.get("value")
+            clause = percentile_filter(model, col_id, value)
+            if clause is not None:
+                query = query.filter(clause)
+                continue
             if col_id not in allowed_cols or value is None:
                 continue
             col = getattr(model, col_id)
@@ -69,37 +99,238 @@ def _apply_filters_and_sort(query, model, allowed_cols, sort_by, sort_dir, filte
     return query
 
 
+STOCK_FIELDS = model_fields(Stock) + ("favorita",) + ML_FIELDS
+
+
+def _wants_ml(fields):
+    return fields is None or any(name in ML_FIELDS for name in fields)
+
+
+def _stocks_with_predictions(fields=None, extra_cols=()):
+    """Query de (Stock, LatestStockPrediction): a predição vem no mesmo round
+    trip da página, por LEFT JOIN na chave primária da tabela de últimas.
+
+    Com fields, carrega só as colunas pedidas e dispensa o JOIN quando nenhum
+    campo de ML foi pedido (as linhas passam a ser só Stock).
+    """
+    query = Stock.query
+    if fields is not None:
+        query = query.options(load_only_option(Stock, fields, extra_cols))
+    if not _wants_ml(fields):
+        return query
+    return query.outerjoin(
+        LatestStockPrediction, LatestStockPrediction.ticker == Stock.ticker
+    ).add_entity(LatestStockPrediction)
+
+
+def _stock_json(stock, pred, favorites, fields=None):
+    if fields is None:
+        return attach_ml_fields(
+            {**stock.to_json(), "favorita": stock.ticker in favorites}, pred
+        )
+    stock_json = stock.to_json([f for f in fields if f in Stock.__table__.columns])
+    if "favorita" in fields:
+        stock_json["favorita"] = stock.ticker in favorites
+    return attach_ml_fields(stock_json, pred, fields)
+
+
+def _stock_columns(fields=None):
+    """Cabeçalho da exportação, na ordem das chaves de _stock_json."""
+    if fields is None:
+        return list(STOCK_FIELDS)
+    return (
+        [f for f in fields if f in Stock.__table__.columns]
+        + [f for f in ("favorita",) if f in fields]
+        + [f for f in ML_FIELDS if f in fields]
+    )
+
+
+def _stock_rows_to_json(rows, favorites, fields=None):
+    stocks_json = []
+    for row in rows:
+        stock, pred = (row, None) if isinstance(row, Stock) else row
+        stocks_json.append(_stock_json(stock, pred, favorites, fields))
+    return stocks_json
+
+
+def _list_stocks_from_engine(
+    favorites, page, per_page, sort_by, sort_dir, filters, fields=None
+):
+    result = stock_screener.select(page, per_page, sort_by, sort_dir, filters)
+    if result is None:
+        return None
+    pred_map = {}
+    if _wants_ml(fields):
+        pred_map = get_predictions_for_tickers([row["ticker"] for row in result.rows])
+    stocks_json = [
+        project(
+            attach_ml_fields(
+                {**row, "favorita": row["ticker"] in favorites},
+                pred_map.get(row["ticker"]),
+                fields,
+            ),
+            fields,
+        )
+        for row in result.rows
+    ]
+    pagination = {
+        "total": result.total,
+        "pages": result.pages,
+        "current_page": result.page,
+        "per_page": per_page,
+    }
+    return stocks_json, pagination
+
+
+def _list_stocks_from_db(
+    favorites, page, per_page, sort_by, sort_dir, filters, fields=None
+):
+    query = _stocks_with_predictions(fields)
+    query = _apply_filters_and_sort(
+        query, Stock, STOCK_ALLOWED_COLS, sort_by, sort_dir, filters
+    )
+    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+    stocks_json = _stock_rows_to_json(paginated.items, favorites, fields)
+    pagination = {
+        "total": paginated.total,
+        "pages": paginated.pages,
+        "current_page": paginated.page,
+        "per_page": per_page,
+    }
+    return stocks_json, pagination
+
+
+def _list_stocks_by_cursor(
+    favorites, cursor, per_page, sort_by, sort_dir, filters, with_total, fields=None
+):
+    if sort_by not in STOCK_ALLOWED_COLS:
+        sort_by = None
+    query = _apply_filters_and_sort(
+        _stocks_with_predictions(fields, extra_cols=(sort_by,)),
+        Stock,
+        STOCK_ALLOWED_COLS,
+        None,
+        sort_dir,
+        filters,
+    )
+    rows, pagination = keyset_paginate(
+        query,
+        Stock,
+        "ticker",
+        sort_by,
+        sort_dir,
+        filters,
+        cursor,
+        per_page,
+        with_total,
+    )
+    return _stock_rows_to_json(rows, favorites, fields), pagination
+
+
 def list_stocks(
-    user_id, page=1, per_page=50, sort_by=None, sort_dir="asc", filters=None
+    user_id,
+    page=1,
+    per_page=50,
+    sort_by=None,
+    sort_dir="asc",
+    filters=None,
+    cursor=None,
+    with_total=False,
+    fields=None,
 ):
+    """Lista ações paginadas.
+
+    Com cursor=None usa paginação por página (OFFSET + total). Com cursor
+    informado ("" para a primeira página) usa paginação por chave e devolve
+    pagination.next_cursor. fields ("ticker,price,dy") restringe as colunas
+    lidas do banco e os campos serializados.
+    """
     try:
         per_page = min(per_page, 500)
-        favorites = {
-            fav.stock_ticker for fav in Favorite.query.filter_by(user_id=user_id).all()
-        }
-        query = Stock.query
-        query = _apply_filters_and_sort(
-            query, Stock, STOCK_ALLOWED_COLS, sort_by, sort_dir, filters
-        )
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        pred_map = get_latest_predictions_map()
-        stocks_json = [
-            attach_ml_fields(
-                {**stock.to_json(), "favorita": stock.ticker in favorites},
-                pred_map.get(stock.ticker),
+        fields = parse_fields(fields, STOCK_FIELDS)
+        favorites = set()
+        if fields is None or "favorita" in fields:
+            favorites = {
+                fav.stock_ticker
+                for fav in Favorite.query.filter_by(user_id=user_id).all()
+            }
+        result = None
+        if cursor is not None:
+            result = _list_stocks_by_cursor(
+                favorites,
+                cursor,
+                per_page,
+                sort_by,
+                sort_dir,
+                filters,
+                with_total,
+                fields,
+            )
+        elif current_app.config.get("SCREENER_ENGINE_ENABLED"):
+            result = _list_stocks_from_engine(
+                favorites, page, per_page, sort_by, sort_dir, filters, fields
+            )
+        if result is None:
+            result = _list_stocks_from_db(
+                favorites, page, per_page, sort_by, sort_dir, filters, fields
+            )
+        stocks_json, pagination = result
+        return jsonify({"data": stocks_json, "pagination": pagination}), 200
+    except InvalidCursorError:
+        return jsonify({"message": "Invalid cursor"}), 400
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def view_stock(ticker, fields=None):
+    try:
+        fields = parse_fields(fields, model_fields(Stock) + ML_FIELDS)
+        row = _stocks_with_predictions(fields).filter(Stock.ticker == ticker).first()
+        if not row:
+            return jsonify({"message": "Stock not found"}), 404
+        stock, pred = (row, None) if isinstance(row, Stock) else row
+        if fields is None:
+            return jsonify(attach_ml_fields(stock.to_json(), pred)), 200
+        stock_json = stock.to_json([f for f in fields if f in Stock.__table__.columns])
+        return jsonify(attach_ml_fields(stock_json, pred, fields)), 200
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def batch_stocks(user_id, tickers, fields=None):
+    """Várias ações por ticker em uma consulta (IN + JOIN das predições).
+
+    Devolve as encontradas na ordem pedida e os tickers ausentes em missing.
+    """
+    try:
+        if not tickers:
+            return jsonify({"message": "tickers is required"}), 400
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return (
+                jsonify(
+                    {"message": f"At most {MAX_BATCH_TICKERS} tickers per request"}
+                ),
+                400,
             )
-            for stock in paginated.items
-        ]
+        fields = parse_fields(fields, STOCK_FIELDS)
+        favorites = set()
+        if fields is None or "favorita" in fields:
+            favorites = {
+                fav.stock_ticker
+                for fav in Favorite.query.filter_by(user_id=user_id).all()
+            }
+        rows = _stocks_with_predictions(fields).filter(Stock.ticker.in_(tickers)).all()
+        found = {}
+        for row in rows:
+            stock, pred = (row, None) if isinstance(row, Stock) else row
+            found[stock.ticker] = _stock_json(stock, pred, favorites, fields)
         return (
             jsonify(
                 {
-                    "data": stocks_json,
-                    "pagination": {
-                        "total": paginated.total,
-                        "pages": paginated.pages,
-                        "current_page": paginated.page,
-                        "per_page": per_page,
-                    },
+                    "data": [found[t] for t in tickers if t in found],
+                    "missing": [t for t in tickers if t not in found],
                 }
             ),
             200,
@@ -109,13 +340,79 @@ def list_stocks(
         return jsonify({"message": "An error occurred, please try again later"}), 500
 
 
-def view_stock(ticker):
+ML_COLUMNS = {
+    "ml_label": LatestStockPrediction.label,
+    "ml_score": LatestStockPrediction.composite_score,
+    "ml_prob_barata": LatestStockPrediction.prob_barata,
+    "ml_prob_neutra": LatestStockPrediction.prob_neutra,
+    "ml_prob_cara": LatestStockPrediction.prob_cara,
+}
+
+
+def _export_stocks_arrow(favorites, sort_by, sort_dir, filters, fmt, fields=None):
+    """Exportação colunar: um select() do Core só com as colunas pedidas, sem
+    passar por objetos Stock nem dicts."""
+    names = list(STOCK_FIELDS) if fields is None else fields
+    table_cols = Stock.__table__.columns
+    exprs = []
+    columns = []
+    for name in names:
+        if name in table_cols:
+            expr, sa_type = getattr(Stock, name), table_cols[name].type
+        elif name == "favorita":
+            expr = type_coerce(Stock.ticker.in_(sorted(favorites)), Boolean)
+            sa_type = Boolean()
+        else:
+            expr, sa_type = ML_COLUMNS[name], ML_COLUMNS[name].type
+        exprs.append(expr.label(name))
+        columns.append((name, sa_type))
+
+    stmt = select(*exprs).select_from(Stock)
+    if _wants_ml(names):
+        stmt = stmt.outerjoin(
+            LatestStockPrediction, LatestStockPrediction.ticker == Stock.ticker
+        )
+    stmt = _apply_filters_and_sort(
+        stmt, Stock, STOCK_ALLOWED_COLS, sort_by, sort_dir, filters
+    ).order_by(Stock.ticker)
+    return arrow_response(stmt, columns, fmt, "stocks", {"ml_score": round_score})
+
+
+def export_stocks(
+    user_id, sort_by=None, sort_dir="asc", filters=None, fmt="ndjson", fields=None
+):
+    """Exporta todas as ações filtradas em NDJSON, CSV, Arrow ou Parquet."""
     try:
-        stock = db.session.get(Stock, ticker)
-        if not stock:
-            return jsonify({"message": "Stock not found"}), 404
-        pred = get_latest_predictions_map().get(ticker)
-        return jsonify(attach_ml_fields(stock.to_json(), pred)), 200
+        fields = parse_fields(fields, STOCK_FIELDS)
+        favorites = set()
+        if fields is None or "favorita" in fields:
+            favorites = {
+                fav.stock_ticker
+                for fav in Favorite.query.filter_by(user_id=user_id).all()
+            }
+        if fmt in ARROW_FORMATS:
+            return _export_stocks_arrow(
+                favorites, sort_by, sort_dir, filters, fmt, fields
+            )
+
+        query = _apply_filters_and_sort(
+            _stocks_with_predictions(fields, extra_cols=(sort_by,)),
+            Stock,
+            STOCK_ALLOWED_COLS,
+            sort_by,
+            sort_dir,
+            filters,
+        ).order_by(Stock.ticker)
+
+        def to_dict(row):
+            stock, pred = (row, None) if isinstance(row, Stock) else row
+            return _stock_json(stock, pred, favorites, fields)
+
+        return export_response(query, to_dict, _stock_columns(fields), fmt, "stocks")
+    except InvalidExportFormatError:
+        return jsonify({"message": "Invalid format"}), 400
+    except ArrowUnavailableError:
+        return jsonify({"message": "Format not available"}), 501
     except Exception as e:
         logging.error(f"An error occurred: {e}")
         return jsonify({"message": "An error occurred, please try again later"}), 500
@@ -131,7 +428,10 @@ def new_stock(stock_data):
         new_stock.discount_to_graham = new_stock.get_discount_to_graham()
 
         db.session.add(new_stock)
+        refresh_percentiles(STOCKS)
+        bump_version(STOCKS)
         db.session.commit()
+        stock_screener.invalidate()
         return jsonify({"message": "Stock added successfully"}), 201
     except Exception as e:
         db.session.rollback()
@@ -151,7 +451,11 @@ def edit_stock(ticker, stock_data):
         stock.graham_formula = stock.get_graham_formula()
         stock.discount_to_graham = stock.get_discount_to_graham()
 
+        forget_row_hash(STOCKS, ticker)
+        refresh_percentiles(STOCKS)
+        bump_version(STOCKS)
         db.session.commit()
+        stock_screener.invalidate()
         return jsonify({"message": "Stock edited successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -166,7 +470,10 @@ def delete_stock(ticker):
             return jsonify({"message": "Stock not found"}), 404
 
         db.session.delete(stock)
+        refresh_percentiles(STOCKS)
+        bump_version(STOCKS)
         db.session.commit()
+        stock_screener.invalidate()
         return jsonify({"message": "Stock deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -175,174 +482,130 @@ def delete_stock(ticker):
 
 
 def get_all_stocks_from_statusinvest():
-    try:
-        url = "https://statusinvest.com.br/category/advancedsearchresultpaginated"
-        search_params = {
-            "Sector": "",
-            "SubSector": "",
-            "Segment": "",
-            "my_range": "-20;100",
-            "forecast": {
-                "upsidedownside": {"Item1": None, "Item2": None},
-                "estimatesnumber": {"Item1": None, "Item2": None},
-                "revisedup": True,
-                "reviseddown": True,
-                "consensus": [],
-            },
-            "dy": {"Item1": None, "Item2": None},
-            "p_l": {"Item1": None, "Item2": None},
-            "peg_ratio": {"Item1": None, "Item2": None},
-            "p_vp": {"Item1": None, "Item2": None},
-            "p_ativo": {"Item1": None, "Item2": None},
-            "margembruta": {"Item1": None, "Item2": None},
-            "margemebit": {"Item1": None, "Item2": None},
-            "margemliquida": {"Item1": None, "Item2": None},
-            "p_ebit": {"Item1": None, "Item2": None},
-            "ev_ebit": {"Item1": None, "Item2": None},
-            "dividaliquidaebit": {"Item1": None, "Item2": None},
-            "dividaliquidapatrimonioliquido": {"Item1": None, "Item2": None},
-            "p_sr": {"Item1": None, "Item2": None},
-            "p_capitalgiro": {"Item1": None, "Item2": None},
-            "p_ativocirculante": {"Item1": None, "Item2": None},
-            "roe": {"Item1": None, "Item2": None},
-            "roic": {"Item1": None, "Item2": None},
-            "roa": {"Item1": None, "Item2": None},
-            "liquidezcorrente": {"Item1": None, "Item2": None},
-            "pl_ativo": {"Item1": None, "Item2": None},
-            "passivo_ativo": {"Item1": None, "Item2": None},
-            "giroativos": {"Item1": None, "Item2": None},
-            "receitas_cagr5": {"Item1": None, "Item2": None},
-            "lucros_cagr5": {"Item1": None, "Item2": None},
-            "liquidezmediadiaria": {"Item1": None, "Item2": None},
-            "vpa": {"Item1": None, "Item2": None},
-            "lpa": {"Item1": None, "Item2": None},
-            "valormercado": {"Item1": None, "Item2": None},
-        }
-        params = {
-            "search": json.dumps(search_params),
-            "orderColumn": "",
-            "isAsc": "",
-            "page": 0,
-            "take": 1000,
-            "CategoryType": 1,
-        }
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-            )
-        }
-
-        response = requests.get(url, params=params, headers=headers)
-
-        if response.status_code != 200:
-            logging.error(f"HTTP error occurred: {response.status_code}")
-            return None
-
-        return response.json()
-    except Exception as e:
-        logging.error(f"An error occurred: {e}")
-        return None
-
-
-def calculate_ey(stock_data):
-    earnings = stock_data.get("lpa", 0)
-    price = stock_data.get("price", 0)
-    ey = earnings / price if price != 0 else 0
-    return ey
+    search_params = {
+        "Sector": "",
+        "SubSector": "",
+        "Segment": "",
+        "my_range": "-20;100",
+        "forecast": {
+            "upsidedownside": {"Item1": None, "Item2": None},
+            "estimatesnumber": {"Item1": None, "Item2": None},
+            "revisedup": True,
+            "reviseddown": True,
+            "consensus": [],
+        },
+        "dy": {"Item1": None, "Item2": None},
+        "p_l": {"Item1": None, "Item2": None},
+        "peg_ratio": {"Item1": None, "Item2": None},
+        "p_vp": {"Item1": None, "Item2": None},
+        "p_ativo": {"Item1": None, "Item2": None},
+        "margembruta": {"Item1": None, "Item2": None},
+        "margemebit": {"Item1": None, "Item2": None},
+        "margemliquida": {"Item1": None, "Item2": None},
+        "p_ebit": {"Item1": None, "Item2": None},
+        "ev_ebit": {"Item1": None, "Item2": None},
+        "dividaliquidaebit": {"Item1": None, "Item2": None},
+        "dividaliquidapatrimonioliquido": {"Item1": None, "Item2": None},
+        "p_sr": {"Item1": None, "Item2": None},
+        "p_capitalgiro": {"Item1": None, "Item2": None},
+        "p_ativocirculante": {"Item1": None, "Item2": None},
+        "roe": {"Item1": None, "Item2": None},
+        "roic": {"Item1": None, "Item2": None},
+        "roa": {"Item1": None, "Item2": None},
+        "liquidezcorrente": {"Item1": None, "Item2": None},
+        "pl_ativo": {"Item1": None, "Item2": None},
+        "passivo_ativo": {"Item1": None, "Item2": None},
+        "giroativos": {"Item1": None, "Item2": None},
+        "receitas_cagr5": {"Item1": None, "Item2": None},
+        "lucros_cagr5": {"Item1": None, "Item2": None},
+        "liquidezmediadiaria": {"Item1": None, "Item2": None},
+        "vpa": {"Item1": None, "Item2": None},
+        "lpa": {"Item1": None, "Item2": None},
+        "valormercado": {"Item1": None, "Item2": None},
+    }
+    return fetch_category(STOCK_CATEGORY, search_params)
+
+
+def run_stock_update(progress):
+    """Busca, transforma e grava o universo de ações (uma transação).
+
+    Usada pelo job de atualização e por update_all_stocks; as etapas e
+    contagens vão para progress (ver services.job_runner).
+    """
+    progress.phase("fetch")
+    stocks_data = get_all_stocks_from_statusinvest()
+    if not stocks_data or "list" not in stocks_data:
+        raise IngestionError("Error fetching stock data from StatusInvest.")
+
+    progress.phase("parse")
+    cached_stocks = stocks_data["list"]
+
+    numeric_fields = [
+        "price",
+        "p_l",
+        "dy",
+        "p_vp",
+        "p_ebit",
+        "p_ativo",
+        "ev_ebit",
+        "margembruta",
+        "margemebit",
+        "margemliquida",
+        "p_sr",
+        "p_capitalgiro",
+        "p_ativocirculante",
+        "giroativos",
+        "roe",
+        "roa",
+        "roic",
+        "dividaliquidapatrimonioliquido",
+        "dividaliquidaebit",
+        "pl_ativo",
+        "passivo_ativo",
+        "liquidezcorrente",
+        "peg_ratio",
+        "receitas_cagr5",
+        "vpa",
+        "lpa",
+        "valormercado",
+    ]
+
+    for stock_data in cached_stocks:
+        for field in numeric_fields:
+            stock_data.setdefault(field, 0.0)
+
+    progress.phase("enrich")
+    enrich_stocks(cached_stocks)
+
+    progress.phase("write")
+    counts = write_changed_rows(STOCKS, Stock, cached_stocks)
+    changed = counts["inserted"] + counts["updated"]
+    if changed:
+        refresh_sector_stats(STOCKS)
+        refresh_percentiles(STOCKS)
+        bump_version(STOCKS)
+    snapshot = record_snapshot(STOCKS, cached_stocks)
+    db.session.commit()
+    progress.count(fetched=len(cached_stocks), snapshot=snapshot, **counts)
+    if not changed:
+        return
+
+    stock_screener.invalidate()
+    if current_app.config.get("SCREENER_ENGINE_ENABLED"):
+        stock_screener.reload()
 
 
 def update_all_stocks():
     try:
-        stocks_data = get_all_stocks_from_statusinvest()
-        if not stocks_data or "list" not in stocks_data:
-            return (
-                jsonify({"error": "Error fetching stock data from StatusInvest."}),
-                500,
-            )
-
-        cached_stocks = stocks_data["list"]
-        tickers = {stock["ticker"] for stock in cached_stocks}
-
-        existing_stocks = Stock.query.filter(Stock.ticker.in_(tickers)).all()
-        existing_map = {stock.ticker: stock for stock in existing_stocks}
-        existing_tickers = set(existing_map.keys())
-
-        numeric_fields = [
-            "price",
-            "p_l",
-            "dy",
-            "p_vp",
-            "p_ebit",
-            "p_ativo",
-            "ev_ebit",
-            "margembruta",
-            "margemebit",
-            "margemliquida",
-            "p_sr",
-            "p_capitalgiro",
-            "p_ativocirculante",
-            "giroativos",
-            "roe",
-            "roa",
-            "roic",
-            "dividaliquidapatrimonioliquido",
-            "dividaliquidaebit",
-            "pl_ativo",
-            "passivo_ativo",
-            "liquidezcorrente",
-            "peg_ratio",
-            "receitas_cagr5",
-            "vpa",
-            "lpa",
-            "valormercado",
-        ]
-
-        for stock_data in cached_stocks:
-            stock_data["ey"] = calculate_ey(stock_data)
-            for field in numeric_fields:
-                stock_data.setdefault(field, 0.0)
-
-        ey_ranks = {
-            stock["ticker"]: rank + 1
-            for rank, stock in enumerate(
-                sorted(cached_stocks, key=lambda x: x["ey"], reverse=True)
-            )
-        }
-
-        roic_ranks = {
-            stock["ticker"]: rank + 1
-            for rank, stock in enumerate(
-                sorted(cached_stocks, key=lambda x: x["roic"], reverse=True)
-            )
-        }
-
-        new_stocks = []
-        for stock_data in cached_stocks:
-            stock_data["roic_rank"] = roic_ranks[stock_data["ticker"]]
-            stock_data["ey_rank"] = ey_ranks[stock_data["ticker"]]
-            stock_data["magic_formula_rank"] = (
-                stock_data["roic_rank"] + stock_data["ey_rank"]
-            )
-
-            if stock_data["ticker"] in existing_tickers:
-                stock = existing_map[stock_data["ticker"]]
-                for key, value in stock_data.items():
-                    setattr(stock, key, value)
-                stock.graham_formula = stock.get_graham_formula()
-                stock.discount_to_graham = stock.get_discount_to_graham()
-                stock.roic_rank = stock_data["roic_rank"]
-                stock.ey_rank = stock_data["ey_rank"]
-                stock.magic_formula_rank = stock_data["magic_formula_rank"]
-            else:
-                new_stocks.append(Stock(**{**stock_data}))
-
-        db.session.add_all(new_stocks)
-        db.session.commit()
-
+        run_stock_update(JobProgress())
         return jsonify({"message": "Stocks updated successfully"}), 200
-
+    except IngestionError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         db.session.rollback()
         logging.error(f"An error occurred: {e}")
         return jsonify({"message": "An error occurred, please try again later"}), 500
+
+
+def enqueue_stock_update(user_id=None):
+    return enqueue_job(STOCKS, run_stock_update, user_id, message="Stock update queued")
@@ -1,9 +1,23 @@
-from flask import jsonify
+import hashlib
+import json
+
+from flask import current_app, jsonify, make_response, request
 from functools import wraps
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from models.user import User
 from config import db
+from compression import ENCODINGS
+from services.dataset_versions import (
+    STOCKS,
+    FIIS,
+    PREDICTIONS,
+    favorites_key,
+    favorites_fii_key,
+    get_versions,
+)
+from services.sector_stats_service import SECTOR_STATS
+from services.history_service import FII_HISTORY, STOCK_HISTORY
 
 from routes.stock_routes import (
     list_stocks_json,
@@ -11,7 +25,10 @@ from routes.stock_routes import (
     new_stock_json,
     edit_stock_json,
     delete_stock_json,
-    update_all_stocks,
+    update_stocks,
+    export_stocks_json,
+    batch_stocks_json,
+    stock_history_json,
 )
 from routes.user_routes import (
     list_users_json,
@@ -37,7 +54,10 @@ from routes.fii_routes import (
     new_fii_json,
     edit_fii_json,
     delete_fii_json,
-    update_all_fiis,
+    update_fiis,
+    export_fiis_json,
+    batch_fiis_json,
+    fii_history_json,
 )
 from routes.favorite_fii_routes import (
     list_favorites_fii_json,
@@ -48,7 +68,23 @@ from routes.favorite_fii_routes import (
     add_favorite_fii_json,
     remove_favorite_fii_json,
 )
-from routes.prediction_routes import list_predictions_json, view_prediction_json
+from routes.prediction_routes import (
+    list_predictions_json,
+    view_prediction_json,
+    prediction_cache_stats_json,
+    export_predictions_json,
+)
+from routes.ingestion_routes import (
+    ingestion_http_stats_json,
+    job_json,
+    scheduler_json,
+)
+from routes.sector_routes import (
+    stock_sector_stats_json,
+    fii_sector_stats_json,
+    rebuild_stock_sector_stats_json,
+    rebuild_fii_sector_stats_json,
+)
 
 
 def protected_route(view_func, required_profile=None):
@@ -75,15 +111,78 @@ def protected_route(view_func, required_profile=None):
     return decorated_view
 
 
+def etag_route(view_func, datasets, user_dataset=None):
+    """ETag forte a partir das versões dos datasets lidos pela rota, da URL
+    com a query string e, quando a resposta depende do usuário, da versão dos
+    favoritos dele. Se o cliente já tem essa versão (If-None-Match), responde
+    304 sem chamar a view."""
+
+    @wraps(view_func)
+    def decorated_view(*args, **kwargs):
+        names = list(datasets)
+        user_id = None
+        if user_dataset is not None:
+            user_id = get_jwt_identity()
+            names.append(user_dataset(user_id))
+        versions = get_versions(names)
+        key = json.dumps(
+            [
+                request.path,
+                sorted(request.args.items(multi=True)),
+                user_id,
+                [versions[name] for name in names],
+            ],
+            default=str,
+        )
+        etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+        # Variantes comprimidas levam o sufixo da codificação (ver compression).
+        known = [etag] + [f"{etag}-{encoding}" for encoding in ENCODINGS]
+        matched = next((tag for tag in known if tag in request.if_none_match), None)
+        if matched is not None:
+            response = current_app.response_class(status=304)
+            response.set_etag(matched)
+        else:
+            response = make_response(view_func(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return decorated_view
+
+
 def setup_routes(app):
     # Stock routes
     app.add_url_rule(
-        "/v1/stocks", methods=["GET"], view_func=protected_route(list_stocks_json)
+        "/v1/stocks",
+        methods=["GET"],
+        view_func=protected_route(
+            etag_route(list_stocks_json, (STOCKS, PREDICTIONS), favorites_key)
+        ),
     )
     app.add_url_rule(
         "/v1/stock/<string:ticker>",
         methods=["GET"],
-        view_func=protected_route(view_stock_json),
+        view_func=protected_route(etag_route(view_stock_json, (STOCKS, PREDICTIONS))),
+    )
+    app.add_url_rule(
+        "/v1/stock/<string:ticker>/history",
+        methods=["GET"],
+        view_func=protected_route(etag_route(stock_history_json, (STOCK_HISTORY,))),
+    )
+    app.add_url_rule(
+        "/v1/stocks/batch",
+        methods=["GET"],
+        view_func=protected_route(
+            etag_route(batch_stocks_json, (STOCKS, PREDICTIONS), favorites_key)
+        ),
+    )
+    app.add_url_rule(
+        "/v1/stocks/export",
+        methods=["GET"],
+        view_func=protected_route(export_stocks_json),
     )
     app.add_url_rule(
         "/v1/stocks", methods=["POST"], view_func=protected_route(new_stock_json)
@@ -101,7 +200,7 @@ def setup_routes(app):
     app.add_url_rule(
         "/v1/stocks/update-stocks",
         methods=["PUT"],
-        view_func=protected_route(update_all_stocks, required_profile="ADMIN"),
+        view_func=protected_route(update_stocks, required_profile="ADMIN"),
     )
 
     # User routes
@@ -128,7 +227,11 @@ def setup_routes(app):
 
     # Favorite routes
     app.add_url_rule(
-        "/v1/favorites", methods=["GET"], view_func=protected_route(list_favorites_json)
+        "/v1/favorites",
+        methods=["GET"],
+        view_func=protected_route(
+            etag_route(list_favorites_json, (STOCKS, PREDICTIONS), favorites_key)
+        ),
     )
     app.add_url_rule(
         "/v1/favorite/<int:favorite_id>",
@@ -173,12 +276,33 @@ def setup_routes(app):
 
     # FII routes
     app.add_url_rule(
-        "/v1/fiis", methods=["GET"], view_func=protected_route(list_fiis_json)
+        "/v1/fiis",
+        methods=["GET"],
+        view_func=protected_route(
+            etag_route(list_fiis_json, (FIIS,), favorites_fii_key)
+        ),
     )
     app.add_url_rule(
         "/v1/fii/<string:ticker>",
         methods=["GET"],
-        view_func=protected_route(view_fii_json),
+        view_func=protected_route(etag_route(view_fii_json, (FIIS,))),
+    )
+    app.add_url_rule(
+        "/v1/fii/<string:ticker>/history",
+        methods=["GET"],
+        view_func=protected_route(etag_route(fii_history_json, (FII_HISTORY,))),
+    )
+    app.add_url_rule(
+        "/v1/fiis/batch",
+        methods=["GET"],
+        view_func=protected_route(
+            etag_route(batch_fiis_json, (FIIS,), favorites_fii_key)
+        ),
+    )
+    app.add_url_rule(
+        "/v1/fiis/export",
+        methods=["GET"],
+        view_func=protected_route(export_fiis_json),
     )
     app.add_url_rule(
         "/v1/fiis", methods=["POST"], view_func=protected_route(new_fii_json)
@@ -196,14 +320,16 @@ def setup_routes(app):
     app.add_url_rule(
         "/v1/fiis/update-fiis",
         methods=["PUT"],
-        view_func=protected_route(update_all_fiis, required_profile="ADMIN"),
+        view_func=protected_route(update_fiis, required_profile="ADMIN"),
     )
 
     # Favorite FII routes
     app.add_url_rule(
         "/v1/favorites/fii",
         methods=["GET"],
-        view_func=protected_route(list_favorites_fii_json),
+        view_func=protected_route(
+            etag_route(list_favorites_fii_json, (FIIS,), favorites_fii_key)
+        ),
     )
     app.add_url_rule(
         "/v1/favorite/fii/<int:favorite_id>",
@@ -240,10 +366,65 @@ def setup_routes(app):
     app.add_url_rule(
         "/v1/stocks/predictions",
         methods=["GET"],
-        view_func=protected_route(list_predictions_json),
+        view_func=protected_route(etag_route(list_predictions_json, (PREDICTIONS,))),
     )
     app.add_url_rule(
         "/v1/stocks/<string:ticker>/prediction",
         methods=["GET"],
-        view_func=protected_route(view_prediction_json),
+        view_func=protected_route(etag_route(view_prediction_json, (PREDICTIONS,))),
+    )
+    app.add_url_rule(
+        "/v1/stocks/predictions/export",
+        methods=["GET"],
+        view_func=protected_route(export_predictions_json),
+    )
+    app.add_url_rule(
+        "/v1/stocks/predictions/cache",
+        methods=["GET"],
+        view_func=protected_route(
+            prediction_cache_stats_json, required_profile="ADMIN"
+        ),
+    )
+
+    # Sector stats routes
+    app.add_url_rule(
+        "/v1/stocks/sector-stats",
+        methods=["GET"],
+        view_func=protected_route(etag_route(stock_sector_stats_json, (SECTOR_STATS,))),
+    )
+    app.add_url_rule(
+        "/v1/fiis/sector-stats",
+        methods=["GET"],
+        view_func=protected_route(etag_route(fii_sector_stats_json, (SECTOR_STATS,))),
+    )
+    app.add_url_rule(
+        "/v1/stocks/sector-stats",
+        methods=["PUT"],
+        view_func=protected_route(
+            rebuild_stock_sector_stats_json, required_profile="ADMIN"
+        ),
+    )
+    app.add_url_rule(
+        "/v1/fiis/sector-stats",
+        methods=["PUT"],
+        view_func=protected_route(
+            rebuild_fii_sector_stats_json, required_profile="ADMIN"
+        ),
+    )
+
+    # Ingestion routes
+    app.add_url_rule(
+        "/v1/ingestion/http-stats",
+        methods=["GET"],
+        view_func=protected_route(ingestion_http_stats_json, required_profile="ADMIN"),
+    )
+    app.add_url_rule(
+        "/v1/jobs/<int:job_id>",
+        methods=["GET"],
+        view_func=protected_route(job_json, required_profile="ADMIN"),
+    )
+    app.add_url_rule(
+        "/v1/ingestion/schedule",
+        methods=["GET"],
+        view_func=protected_route(scheduler_json, required_profile="ADMIN"),
     )
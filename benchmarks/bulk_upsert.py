@@ -0,0 +1,96 @@
+"""Compara a gravação da atualização de ações: ORM (carregar, setattr, add_all)
+x upsert em lote (services.bulk_upsert).
+
+Uso:
+    python benchmarks/bulk_upsert.py
+    DATABASE_URL=postgresql://... python benchmarks/bulk_upsert.py --sizes 1000 10000
+
+Para cada tamanho a tabela stocks é recriada e gravada duas vezes: a primeira
+só insere, a segunda atualiza todas as linhas (preços diferentes). Em
+PostgreSQL aponte para um banco descartável.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import create_app, db  # noqa: E402
+from models.stock import Stock, discount_to_graham, graham_formula  # noqa: E402
+from services.bulk_upsert import upsert_rows  # noqa: E402
+
+METRICS = ["p_l", "dy", "p_vp", "p_ebit", "roe", "roic", "lpa", "vpa"]
+
+
+def make_rows(size, seed):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(size):
+        row = {"ticker": f"T{i:06d}", "companyname": f"Empresa {i}"}
+        row["price"] = rnd.uniform(1, 200)
+        row.update({metric: rnd.uniform(-5, 40) for metric in METRICS})
+        row["sectorname"] = f"Setor {i % 40}"
+        rows.append(row)
+    return rows
+
+
+def write_orm(rows):
+    # O caminho antigo: todas as ações como objetos, setattr coluna a coluna e
+    # Graham recalculado por objeto. (Carrega a tabela inteira em vez do
+    # IN (tickers), que no SQLite passa do limite de variáveis com 100k.)
+    existing = {stock.ticker: stock for stock in Stock.query.all()}
+    new = []
+    for row in rows:
+        stock = existing.get(row["ticker"])
+        if stock is None:
+            new.append(Stock(**row))
+            continue
+        for key, value in row.items():
+            setattr(stock, key, value)
+        stock.graham_formula = stock.get_graham_formula()
+        stock.discount_to_graham = stock.get_discount_to_graham()
+    db.session.add_all(new)
+    db.session.commit()
+
+
+def write_upsert(rows):
+    for row in rows:
+        graham = graham_formula(row["lpa"], row["vpa"])
+        row["graham_formula"] = graham
+        row["discount_to_graham"] = discount_to_graham(row["price"], graham)
+    upsert_rows(Stock, rows)
+    db.session.commit()
+
+
+def timed(writer, rows):
+    db.session.expunge_all()
+    started = time.perf_counter()
+    writer(rows)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"banco: {db.engine.dialect.name}")
+        print(f"{'linhas':>8} {'caminho':>8} {'insert ms':>11} {'update ms':>11}")
+        for size in args.sizes:
+            for name, writer in (("orm", write_orm), ("upsert", write_upsert)):
+                Stock.__table__.drop(db.engine, checkfirst=True)
+                Stock.__table__.create(db.engine)
+                insert_ms = timed(writer, make_rows(size, seed=1))
+                update_ms = timed(writer, make_rows(size, seed=2))
+                print(f"{size:>8} {name:>8} {insert_ms:>11.1f} {update_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compara o enriquecimento das ações: por linha (como era) x uma passada
+NumPy (services.enrichment).
+
+Uso:
+    python benchmarks/enrichment.py
+    python benchmarks/enrichment.py --rows 20000 --repeat 5
+
+Não usa banco. O caminho por linha reproduz o antigo update_all_stocks:
+LPA / preço em cada dict (o antigo calculate_ey), duas ordenações com sorted()
+para os ranks e um Stock por linha, com Graham recalculado por
+get_discount_to_graham e de novo depois do setattr.
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from models.stock import Stock  # noqa: E402
+from models.user import User  # noqa: E402, F401
+from services.enrichment import enrich_stocks  # noqa: E402
+
+
+def make_rows(size):
+    rnd = random.Random(11)
+    return [
+        {
+            "ticker": f"T{i:06d}",
+            "price": 0.0 if rnd.random() < 0.05 else rnd.uniform(1, 200),
+            "lpa": round(rnd.uniform(-5, 15), 2),
+            "vpa": round(rnd.uniform(-10, 60), 2),
+            # Arredondado para haver empates nos ranks.
+            "roic": round(rnd.uniform(-0.3, 0.5), 3),
+        }
+        for i in range(size)
+    ]
+
+
+def enrich_per_row(rows):
+    for row in rows:
+        row["ey"] = row["lpa"] / row["price"] if row["price"] != 0 else 0
+    ey_ranks = {
+        row["ticker"]: rank + 1
+        for rank, row in enumerate(sorted(rows, key=lambda x: x["ey"], reverse=True))
+    }
+    roic_ranks = {
+        row["ticker"]: rank + 1
+        for rank, row in enumerate(sorted(rows, key=lambda x: x["roic"], reverse=True))
+    }
+    stocks = []
+    for row in rows:
+        row["roic_rank"] = roic_ranks[row["ticker"]]
+        row["ey_rank"] = ey_ranks[row["ticker"]]
+        row["magic_formula_rank"] = row["roic_rank"] + row["ey_rank"]
+        stock = Stock(**row)
+        stock.graham_formula = stock.get_graham_formula()
+        stock.discount_to_graham = stock.get_discount_to_graham()
+        stocks.append(stock)
+    return stocks
+
+
+def best_of(func, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        batch = copy.deepcopy(rows)
+        started = time.perf_counter()
+        func(batch)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    per_row = best_of(enrich_per_row, rows, args.repeat)
+    vectorized = best_of(enrich_stocks, rows, args.repeat)
+    print(f"linhas: {args.rows} (melhor de {args.repeat})")
+    print(f"por linha: {per_row:10.1f} ms")
+    print(f"NumPy:     {vectorized:10.1f} ms  ({per_row / vectorized:.1f}x)")
+
+    legacy = enrich_per_row(copy.deepcopy(rows))
+    numpy_rows = enrich_stocks(copy.deepcopy(rows))
+    graham_diff = max(
+        abs(stock.graham_formula - row["graham_formula"])
+        for stock, row in zip(legacy, numpy_rows)
+    )
+    rank_diff = sum(
+        stock.roic_rank != row["roic_rank"] for stock, row in zip(legacy, numpy_rows)
+    )
+    print(f"maior diferença em Graham: {graham_diff:.4f}")
+    print(f"roic_rank diferente (empates na menor posição): {rank_diff} linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Mostra os planos de consulta das rotas quentes antes e depois dos índices
+da revision 3f1c9a7d2e41.
+
+Uso:
+    python benchmarks/index_plans.py
+    DATABASE_URL=postgresql://... python benchmarks/index_plans.py --rows 50000
+
+Em PostgreSQL o script usa EXPLAIN ANALYZE e deve apontar para um banco
+descartável: as tabelas são recriadas do zero.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text  # noqa: E402
+
+from config import create_app, db  # noqa: E402
+from models.user import User  # noqa: E402
+from models.stock import Stock  # noqa: E402
+from models.fii import Fii  # noqa: E402
+from models.favorite import Favorite  # noqa: E402
+from models.favorite_fiis import FavoriteFii  # noqa: E402
+from models.stock_prediction import StockPrediction  # noqa: E402
+
+QUERIES = {
+    "favorites by user": "SELECT * FROM favorites WHERE user_id = 42",
+    "favorite exists": (
+        "SELECT id FROM favorites WHERE user_id = 42 AND stock_ticker = 'T00042'"
+    ),
+    "favorites_fii by user": "SELECT * FROM favorites_fii WHERE user_id = 42",
+    "latest predictions": (
+        "SELECT p.* FROM stock_predictions p JOIN ("
+        "SELECT ticker, MAX(run_date) AS max_run_date FROM stock_predictions "
+        "GROUP BY ticker) l ON p.ticker = l.ticker AND p.run_date = l.max_run_date"
+    ),
+    "prediction by ticker": (
+        "SELECT * FROM stock_predictions WHERE ticker = 'T00042' "
+        "ORDER BY run_date DESC LIMIT 1"
+    ),
+    "stocks by magic_formula_rank": (
+        "SELECT * FROM stocks ORDER BY magic_formula_rank, ticker LIMIT 50"
+    ),
+    "stocks by discount_to_graham desc": (
+        "SELECT * FROM stocks ORDER BY discount_to_graham DESC, ticker DESC LIMIT 50"
+    ),
+    "stocks dy seek": (
+        "SELECT * FROM stocks WHERE dy > 0.05 OR (dy = 0.05 AND ticker > 'T00100') "
+        "ORDER BY dy, ticker LIMIT 50"
+    ),
+    "fiis by p_vp": "SELECT * FROM fiis ORDER BY p_vp, ticker LIMIT 50",
+}
+
+PERF_TABLES = [Stock, Fii, Favorite, FavoriteFii, StockPrediction]
+
+
+def populate(rows, runs):
+    rnd = random.Random(7)
+    users = [User(id=i, user_name=f"user{i}") for i in range(1, 201)]
+    db.session.add_all(users)
+    stocks = [
+        {
+            "ticker": f"T{i:05d}",
+            "price": rnd.uniform(1, 200),
+            "dy": rnd.uniform(0, 0.2),
+            "p_l": rnd.uniform(-20, 60),
+            "p_vp": rnd.uniform(0.2, 8),
+            "graham_formula": rnd.uniform(0, 200),
+            "discount_to_graham": rnd.uniform(-300, 100),
+            "magic_formula_rank": rnd.randint(2, 2 * rows),
+        }
+        for i in range(rows)
+    ]
+    db.session.execute(Stock.__table__.insert(), stocks)
+    db.session.execute(
+        Fii.__table__.insert(),
+        [
+            {
+                "ticker": f"F{i:05d}",
+                "dy": rnd.uniform(0, 0.2),
+                "p_vp": rnd.uniform(0.3, 2),
+            }
+            for i in range(max(rows // 2, 1))
+        ],
+    )
+    db.session.execute(
+        Favorite.__table__.insert(),
+        [
+            {"user_id": u, "stock_ticker": f"T{t:05d}"}
+            for u in range(1, 201)
+            for t in rnd.sample(range(rows), min(40, rows))
+        ],
+    )
+    db.session.execute(
+        FavoriteFii.__table__.insert(),
+        [
+            {"user_id": u, "fii_ticker": f"F{t:05d}"}
+            for u in range(1, 201)
+            for t in rnd.sample(range(max(rows // 2, 1)), min(20, rows // 2 or 1))
+        ],
+    )
+    start = datetime(2026, 1, 1)
+    db.session.execute(
+        StockPrediction.__table__.insert(),
+        [
+            {
+                "ticker": s["ticker"],
+                "run_date": start + timedelta(days=7 * r),
+                "label": rnd.choice(["barata", "neutra", "cara"]),
+                "composite_score": rnd.uniform(0, 100),
+            }
+            for r in range(runs)
+            for s in stocks
+        ],
+    )
+    db.session.commit()
+
+
+def explain(sql):
+    if db.engine.dialect.name == "postgresql":
+        started = time.perf_counter()
+        plan = db.session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).all()
+        elapsed = (time.perf_counter() - started) * 1000
+        return [row[0] for row in plan], elapsed
+    plan = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    started = time.perf_counter()
+    db.session.execute(text(sql)).all()
+    elapsed = (time.perf_counter() - started) * 1000
+    return [row[-1] for row in plan], elapsed
+
+
+def report(title):
+    print(f"\n===== {title} =====")
+    for name, sql in QUERIES.items():
+        plan, elapsed = explain(sql)
+        print(f"\n-- {name} ({elapsed:.2f} ms)")
+        for line in plan:
+            print(f"   {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        indexes = [index for model in PERF_TABLES for index in model.__table__.indexes]
+        for index in indexes:
+            index.drop(db.engine)
+
+        populate(args.rows, args.runs)
+        db.session.execute(text("ANALYZE"))
+        report("sem índices")
+
+        for index in indexes:
+            index.create(db.engine)
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        report("com índices")
+
+
+if __name__ == "__main__":
+    main()
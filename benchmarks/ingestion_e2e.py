@@ -0,0 +1,92 @@
+"""Roda a atualização completa de ações e FIIs contra o replay local do
+StatusInvest e mostra o tempo de cada etapa (fetch, parse, enrich, write).
+
+Uso:
+    python benchmarks/ingestion_e2e.py --stocks 10000 --fiis 2000
+    DATABASE_URL=postgresql://... python benchmarks/ingestion_e2e.py --stocks 100000
+
+São três rodadas: a primeira carga, uma sem mudanças e uma com --change das
+linhas com preço novo. As tabelas são recriadas: em PostgreSQL aponte para um
+banco descartável.
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from statusinvest_replay import (  # noqa: E402
+    FII_CATEGORY,
+    STOCK_CATEGORY,
+    ReplayApp,
+    build_universes,
+    serve,
+)
+from config import create_app, db  # noqa: E402
+from models.user import User  # noqa: E402, F401
+from services.fii_services import run_fii_update  # noqa: E402
+from services.job_runner import JobProgress  # noqa: E402
+from services.stock_services import run_stock_update  # noqa: E402
+
+PHASES = ("fetch", "parse", "enrich", "write", "total")
+
+
+def report(label, asset, progress):
+    timings = " ".join(f"{progress.timings.get(phase, 0):>9.1f}" for phase in PHASES)
+    rows = progress.rows
+    print(
+        f"{label:<16} {asset:<7} {timings}  "
+        f"ins={rows.get('inserted', 0)} upd={rows.get('updated', 0)} "
+        f"igual={rows.get('unchanged', 0)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stocks", type=int, default=10000)
+    parser.add_argument("--fiis", type=int, default=2000)
+    parser.add_argument("--change", type=float, default=0.05)
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="latência por página (s)"
+    )
+    parser.add_argument("--stocks-fixture")
+    parser.add_argument("--fiis-fixture")
+    args = parser.parse_args()
+
+    replay = ReplayApp(
+        build_universes(args.stocks, args.fiis, args.stocks_fixture, args.fiis_fixture),
+        delay=args.delay,
+    )
+    server, base_url = serve(replay)
+
+    app = create_app()
+    app.config["STATUSINVEST_BASE_URL"] = base_url
+    app.config["SCREENER_ENGINE_ENABLED"] = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f"banco: {db.engine.dialect.name}  replay: {base_url}")
+        print(f"{'rodada':<16} {'ativo':<7} " + " ".join(f"{p:>9}" for p in PHASES))
+        rounds = (
+            ("primeira carga", 0),
+            ("sem mudanças", 0),
+            (f"{args.change:.0%} alterado", args.change),
+        )
+        for label, change in rounds:
+            if change:
+                replay.mutate(STOCK_CATEGORY, change)
+                replay.mutate(FII_CATEGORY, change)
+            for asset, run in (("stocks", run_stock_update), ("fiis", run_fii_update)):
+                progress = JobProgress()
+                run(progress)
+                progress.finish()
+                report(label, asset, progress)
+        print(f"páginas servidas: {replay.requests}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Compara o tempo de serialização das páginas de list_stocks/list_fiis entre o
+provider JSON padrão do Flask e o FastJSONProvider (orjson e fallback stdlib).
+
+Uso:
+    python benchmarks/json_providers.py
+    python benchmarks/json_providers.py --rows 500 --repeat 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from config import create_app, db  # noqa: E402
+from json_provider import FastJSONProvider, orjson  # noqa: E402
+from models.user import User  # noqa: E402
+from models.stock import Stock  # noqa: E402
+from models.fii import Fii  # noqa: E402
+from models.latest_stock_prediction import LatestStockPrediction  # noqa: E402
+from services.stock_services import list_stocks  # noqa: E402
+from services.fii_services import list_fiis  # noqa: E402
+
+
+def populate(rows):
+    rnd = random.Random(7)
+    db.session.add(User(id=1, user_name="bench"))
+    numeric = [
+        c.name
+        for c in Stock.__table__.columns
+        if c.name != "ticker" and c.type.python_type in (float, int)
+    ]
+    db.session.execute(
+        Stock.__table__.insert(),
+        [
+            {
+                "ticker": f"T{i:05d}",
+                "companyname": f"Companhia {i}",
+                "sectorname": rnd.choice(["Bancos", "Energia", "Varejo"]),
+                **{col: rnd.uniform(-50, 200) for col in numeric},
+            }
+            for i in range(rows)
+        ],
+    )
+    fii_numeric = [
+        c.name
+        for c in Fii.__table__.columns
+        if c.name != "ticker" and c.type.python_type in (float, int)
+    ]
+    db.session.execute(
+        Fii.__table__.insert(),
+        [
+            {
+                "ticker": f"F{i:05d}",
+                "companyname": f"Fundo {i}",
+                **{col: rnd.uniform(0, 100) for col in fii_numeric},
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.execute(
+        LatestStockPrediction.__table__.insert(),
+        [
+            {
+                "ticker": f"T{i:05d}",
+                "prediction_id": i,
+                "run_date": datetime(2026, 10, 1),
+                "label": rnd.choice(["barata", "neutra", "cara"]),
+                "prob_barata": rnd.random(),
+                "prob_neutra": rnd.random(),
+                "prob_cara": rnd.random(),
+                "composite_score": rnd.uniform(0, 100),
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.commit()
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    app = create_app()
+    providers = [("flask default", DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("fast (orjson)", FastJSONProvider(app)))
+    stdlib = FastJSONProvider(app)
+    stdlib.use_orjson = False
+    providers.append(("fast (stdlib)", stdlib))
+
+    with app.app_context():
+        db.create_all()
+        populate(args.rows)
+        pages = {}
+        with app.test_request_context():
+            for name, func in (("list_stocks", list_stocks), ("list_fiis", list_fiis)):
+                response, _ = func(1, per_page=args.rows)
+                pages[name] = response.get_json()
+
+        print(f"rows={args.rows} repeat={args.repeat} (mediana, ms)")
+        print(f"{'payload':<12} {'provider':<15} {'serialize':>10} {'bytes':>9}")
+        for page_name, payload in pages.items():
+            for name, provider in providers:
+                with app.test_request_context():
+                    elapsed = timed(lambda: provider.response(payload), args.repeat)
+                    size = len(provider.response(payload).get_data())
+                print(f"{page_name:<12} {name:<15} {elapsed:>10.2f} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Substituto local da busca avançada do StatusInvest.
+
+Um app WSGI (sem dependências) que responde a
+GET /category/advancedsearchresultpaginated?CategoryType=&page=&take=... como o
+site: {"totalResults": n, "list": [...]} com a fatia pedida do universo. O
+universo é sintético, do tamanho que se quiser, ou uma resposta gravada
+(--stocks-fixture/--fiis-fixture, o JSON de uma página real) replicada até o
+tamanho pedido.
+
+Uso:
+    python benchmarks/statusinvest_replay.py --stocks 100000 --fiis 5000
+    STATUSINVEST_BASE_URL=http://127.0.0.1:8765 flask run   # em outro terminal
+
+benchmarks/ingestion_e2e.py sobe o mesmo servidor em uma thread.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+SEARCH_PATH = "/category/advancedsearchresultpaginated"
+STOCK_CATEGORY = 1
+FII_CATEGORY = 2
+
+STOCK_METRICS = (
+    "price",
+    "p_l",
+    "dy",
+    "p_vp",
+    "p_ebit",
+    "p_ativo",
+    "ev_ebit",
+    "margembruta",
+    "margemebit",
+    "margemliquida",
+    "p_sr",
+    "p_capitalgiro",
+    "p_ativocirculante",
+    "giroativos",
+    "roe",
+    "roa",
+    "roic",
+    "dividaliquidapatrimonioliquido",
+    "dividaliquidaebit",
+    "pl_ativo",
+    "passivo_ativo",
+    "liquidezcorrente",
+    "peg_ratio",
+    "receitas_cagr5",
+    "vpa",
+    "lpa",
+    "valormercado",
+)
+
+FII_METRICS = (
+    "price",
+    "dy",
+    "p_vp",
+    "valorpatrimonialcota",
+    "liquidezmediadiaria",
+    "percentualcaixa",
+    "dividend_cagr",
+    "cota_cagr",
+    "numerocotistas",
+    "numerocotas",
+    "patrimonio",
+    "lastdividend",
+)
+
+SECTORS = ("Financeiro", "Utilidade Pública", "Consumo", "Materiais", "Saúde")
+
+
+def synthetic_stocks(size, seed=1):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(size):
+        sector = i % len(SECTORS)
+        row = {
+            "companyid": str(1000 + i),
+            "companyname": f"Empresa {i}",
+            "ticker": f"S{i:06d}",
+            "sectorid": sector,
+            "sectorname": SECTORS[sector],
+            "subsectorid": i % 20,
+            "subsectorname": f"Subsetor {i % 20}",
+            "segmentid": i % 60,
+            "segmentname": f"Segmento {i % 60}",
+        }
+        for metric in STOCK_METRICS:
+            # Como no site, métricas sem valor simplesmente não vêm.
+            if rnd.random() > 0.03:
+                row[metric] = round(rnd.uniform(-10, 60), 2)
+        row["price"] = round(rnd.uniform(1, 200), 2)
+        rows.append(row)
+    return rows
+
+
+def synthetic_fiis(size, seed=2):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(size):
+        row = {
+            "companyid": str(5000 + i),
+            "companyname": f"Fundo {i}",
+            "ticker": f"F{i:05d}11",
+            "sectorid": i % 3,
+            "sectorname": "Financeiro",
+            "subsectorid": i % 8,
+            "subsectorname": "Fundos Imobiliários",
+            "segment": f"Segmento {i % 8}",
+            "segmentid": i % 8,
+            "gestao": 1 + i % 2,
+            "gestao_f": ("Ativa", "Passiva")[i % 2],
+        }
+        for metric in FII_METRICS:
+            if rnd.random() > 0.03:
+                row[metric] = round(rnd.uniform(0, 150), 2)
+        row["price"] = round(rnd.uniform(5, 150), 2)
+        rows.append(row)
+    return rows
+
+
+def load_fixture(path):
+    """Linhas de uma resposta gravada ({"list": [...]} ou a própria lista)."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data["list"] if isinstance(data, dict) else data
+
+
+def scale(rows, size):
+    """Repete rows até size linhas, com tickers distintos nas cópias."""
+    if not rows:
+        return []
+    out = []
+    for i in range(size):
+        row = dict(rows[i % len(rows)])
+        copy_number = i // len(rows)
+        if copy_number:
+            row["ticker"] = f"{row['ticker']}X{copy_number}"
+        out.append(row)
+    return out
+
+
+class ReplayApp:
+    """App WSGI com um universo (lista de dicts) por CategoryType."""
+
+    def __init__(self, universes, delay=0.0):
+        self.universes = universes
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def mutate(self, category_type, fraction, seed=3):
+        """Muda o preço de uma fração das linhas, como um novo pregão."""
+        rnd = random.Random(seed)
+        rows = self.universes[category_type]
+        for row in rnd.sample(rows, int(len(rows) * fraction)):
+            row["price"] = round(row["price"] * rnd.uniform(0.95, 1.05), 2)
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") != SEARCH_PATH:
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"not found"]
+        with self._lock:
+            self.requests += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        category = int(query.get("CategoryType", ["1"])[0])
+        page = int(query.get("page", ["0"])[0])
+        take = int(query.get("take", ["10"])[0])
+        rows = self.universes.get(category, [])
+        body = json.dumps(
+            {"totalResults": len(rows), "list": rows[page * take : (page + 1) * take]}
+        ).encode("utf-8")
+        start_response(
+            "200 OK",
+            [("Content-Type", "application/json"), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+
+class _ThreadingServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(app, host="127.0.0.1", port=0):
+    """Sobe app numa thread; retorna (servidor, URL base)."""
+    server = make_server(
+        host, port, app, server_class=_ThreadingServer, handler_class=_QuietHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def build_universes(stocks, fiis, stocks_fixture=None, fiis_fixture=None):
+    stock_rows = (
+        scale(load_fixture(stocks_fixture), stocks)
+        if stocks_fixture
+        else synthetic_stocks(stocks)
+    )
+    fii_rows = (
+        scale(load_fixture(fiis_fixture), fiis)
+        if fiis_fixture
+        else synthetic_fiis(fiis)
+    )
+    return {STOCK_CATEGORY: stock_rows, FII_CATEGORY: fii_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stocks", type=int, default=500)
+    parser.add_argument("--fiis", type=int, default=500)
+    parser.add_argument("--stocks-fixture")
+    parser.add_argument("--fiis-fixture")
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="latência por página (s)"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    app = ReplayApp(
+        build_universes(args.stocks, args.fiis, args.stocks_fixture, args.fiis_fixture),
+        delay=args.delay,
+    )
+    server, base_url = serve(app, port=args.port)
+    print(f"STATUSINVEST_BASE_URL={base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""asset snapshots
+
+Revision ID: 2f7c9e1b4a86
+Revises: 8b3d5f7a1c64
+Create Date: 2026-10-18 20:31:07.442913
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "2f7c9e1b4a86"
+down_revision = "8b3d5f7a1c64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("ticker", sa.String(length=10), nullable=False),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("p_l", sa.Float(), nullable=True),
+        sa.Column("dy", sa.Float(), nullable=True),
+        sa.Column("p_vp", sa.Float(), nullable=True),
+        sa.Column("p_ebit", sa.Float(), nullable=True),
+        sa.Column("p_ativo", sa.Float(), nullable=True),
+        sa.Column("ev_ebit", sa.Float(), nullable=True),
+        sa.Column("margembruta", sa.Float(), nullable=True),
+        sa.Column("margemebit", sa.Float(), nullable=True),
+        sa.Column("margemliquida", sa.Float(), nullable=True),
+        sa.Column("p_sr", sa.Float(), nullable=True),
+        sa.Column("p_capitalgiro", sa.Float(), nullable=True),
+        sa.Column("p_ativocirculante", sa.Float(), nullable=True),
+        sa.Column("giroativos", sa.Float(), nullable=True),
+        sa.Column("roe", sa.Float(), nullable=True),
+        sa.Column("roa", sa.Float(), nullable=True),
+        sa.Column("roic", sa.Float(), nullable=True),
+        sa.Column("dividaliquidapatrimonioliquido", sa.Float(), nullable=True),
+        sa.Column("dividaliquidaebit", sa.Float(), nullable=True),
+        sa.Column("pl_ativo", sa.Float(), nullable=True),
+        sa.Column("passivo_ativo", sa.Float(), nullable=True),
+        sa.Column("liquidezcorrente", sa.Float(), nullable=True),
+        sa.Column("peg_ratio", sa.Float(), nullable=True),
+        sa.Column("receitas_cagr5", sa.Float(), nullable=True),
+        sa.Column("vpa", sa.Float(), nullable=True),
+        sa.Column("lpa", sa.Float(), nullable=True),
+        sa.Column("valormercado", sa.Float(), nullable=True),
+        sa.Column("graham_formula", sa.Float(), nullable=True),
+        sa.Column("discount_to_graham", sa.Float(), nullable=True),
+        sa.Column("roic_rank", sa.Integer(), nullable=True),
+        sa.Column("ey_rank", sa.Integer(), nullable=True),
+        sa.Column("magic_formula_rank", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("ticker", "snapshot_date"),
+    )
+    op.create_table(
+        "fii_snapshots",
+        sa.Column("ticker", sa.String(length=10), nullable=False),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("dy", sa.Float(), nullable=True),
+        sa.Column("p_vp", sa.Float(), nullable=True),
+        sa.Column("valorpatrimonialcota", sa.Float(), nullable=True),
+        sa.Column("liquidezmediadiaria", sa.Float(), nullable=True),
+        sa.Column("percentualcaixa", sa.Float(), nullable=True),
+        sa.Column("dividend_cagr", sa.Float(), nullable=True),
+        sa.Column("cota_cagr", sa.Float(), nullable=True),
+        sa.Column("numerocotistas", sa.Float(), nullable=True),
+        sa.Column("numerocotas", sa.Float(), nullable=True),
+        sa.Column("patrimonio", sa.Float(), nullable=True),
+        sa.Column("lastdividend", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("ticker", "snapshot_date"),
+    )
+
+
+def downgrade():
+    op.drop_table("fii_snapshots")
+    op.drop_table("stock_snapshots")
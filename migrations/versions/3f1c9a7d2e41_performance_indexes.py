@@ -0,0 +1,97 @@
+"""performance indexes
+
+Revision ID: 3f1c9a7d2e41
+Revises: b8e9822a6a2b
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3f1c9a7d2e41"
+down_revision = "b8e9822a6a2b"
+branch_labels = None
+depends_on = None
+
+
+# (nome, tabela, colunas, unique)
+INDEXES = [
+    ("uq_favorites_user_stock", "favorites", ["user_id", "stock_ticker"], True),
+    ("uq_favorites_fii_user_fii", "favorites_fii", ["user_id", "fii_ticker"], True),
+    (
+        "ix_stocks_magic_formula_rank",
+        "stocks",
+        ["magic_formula_rank", "ticker"],
+        False,
+    ),
+    (
+        "ix_stocks_discount_to_graham",
+        "stocks",
+        ["discount_to_graham", "ticker"],
+        False,
+    ),
+    ("ix_stocks_dy", "stocks", ["dy", "ticker"], False),
+    ("ix_stocks_p_l", "stocks", ["p_l", "ticker"], False),
+    ("ix_stocks_p_vp", "stocks", ["p_vp", "ticker"], False),
+    ("ix_fiis_dy", "fiis", ["dy", "ticker"], False),
+    ("ix_fiis_p_vp", "fiis", ["p_vp", "ticker"], False),
+]
+
+PREDICTIONS_INDEX = "ix_stock_predictions_ticker_run_date"
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_index(table, name):
+    indexes = sa.inspect(op.get_bind()).get_indexes(table)
+    return any(index["name"] == name for index in indexes)
+
+
+def upgrade():
+    # Os índices únicos falham se já houver favoritos duplicados; mantém o
+    # registro mais antigo de cada par (usuário, ticker).
+    op.execute(
+        "DELETE FROM favorites WHERE id NOT IN "
+        "(SELECT MIN(id) FROM favorites GROUP BY user_id, stock_ticker)"
+    )
+    op.execute(
+        "DELETE FROM favorites_fii WHERE id NOT IN "
+        "(SELECT MIN(id) FROM favorites_fii GROUP BY user_id, fii_ticker)"
+    )
+
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação no PostgreSQL.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(
+                name, table, columns, unique=unique, postgresql_concurrently=True
+            )
+
+        # stock_predictions é criada pelo pipeline de ML, fora destas migrations,
+        # e pode já ter vindo com o índice.
+        if _has_table("stock_predictions") and not _has_index(
+            "stock_predictions", PREDICTIONS_INDEX
+        ):
+            op.create_index(
+                PREDICTIONS_INDEX,
+                "stock_predictions",
+                ["ticker", sa.text("run_date DESC")],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        if _has_table("stock_predictions") and _has_index(
+            "stock_predictions", PREDICTIONS_INDEX
+        ):
+            op.drop_index(
+                PREDICTIONS_INDEX,
+                table_name="stock_predictions",
+                postgresql_concurrently=True,
+            )
+        for name, table, _columns, _unique in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
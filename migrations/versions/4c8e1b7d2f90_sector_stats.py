@@ -0,0 +1,40 @@
+"""sector stats
+
+Revision ID: 4c8e1b7d2f90
+Revises: 9a4e2f6c8b17
+Create Date: 2026-10-18 15:02:41.118305
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "4c8e1b7d2f90"
+down_revision = "9a4e2f6c8b17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sector_stats",
+        sa.Column("asset", sa.String(length=16), nullable=False),
+        sa.Column("level", sa.String(length=16), nullable=False),
+        sa.Column("group_name", sa.String(length=255), nullable=False),
+        sa.Column("metric", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("mean", sa.Float(), nullable=True),
+        sa.Column("median", sa.Float(), nullable=True),
+        sa.Column("p25", sa.Float(), nullable=True),
+        sa.Column("p75", sa.Float(), nullable=True),
+        sa.Column("min", sa.Float(), nullable=True),
+        sa.Column("max", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("asset", "level", "group_name", "metric"),
+    )
+
+
+def downgrade():
+    op.drop_table("sector_stats")
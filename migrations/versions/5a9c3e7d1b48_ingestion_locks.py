@@ -0,0 +1,29 @@
+"""ingestion locks
+
+Revision ID: 5a9c3e7d1b48
+Revises: 2f7c9e1b4a86
+Create Date: 2026-10-18 21:47:19.605132
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5a9c3e7d1b48"
+down_revision = "2f7c9e1b4a86"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingestion_locks",
+        sa.Column("name", sa.String(length=32), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("ingestion_locks")
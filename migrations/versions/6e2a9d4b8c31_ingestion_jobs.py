@@ -0,0 +1,42 @@
+"""ingestion jobs
+
+Revision ID: 6e2a9d4b8c31
+Revises: d1f5a3c7e9b2
+Create Date: 2026-10-18 18:05:52.671904
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "6e2a9d4b8c31"
+down_revision = "d1f5a3c7e9b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("phase", sa.String(length=32), nullable=False),
+        sa.Column("rows", sa.JSON(), nullable=True),
+        sa.Column("timings", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_ingestion_jobs_kind_status", "ingestion_jobs", ["kind", "status"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ingestion_jobs_kind_status", table_name="ingestion_jobs")
+    op.drop_table("ingestion_jobs")
@@ -0,0 +1,111 @@
+"""latest stock predictions
+
+Revision ID: 7c2d4e9b1a53
+Revises: 3f1c9a7d2e41
+Create Date: 2026-10-18 10:03:17.552961
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7c2d4e9b1a53"
+down_revision = "3f1c9a7d2e41"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "ticker, prediction_id, run_date, label, prob_barata, prob_neutra, "
+    "prob_cara, composite_score, model_version"
+)
+
+NEW_VALUES = (
+    "NEW.ticker, NEW.id, NEW.run_date, NEW.label, NEW.prob_barata, "
+    "NEW.prob_neutra, NEW.prob_cara, NEW.composite_score, NEW.model_version"
+)
+
+UPSERT_SET = (
+    "prediction_id = excluded.prediction_id, run_date = excluded.run_date, "
+    "label = excluded.label, prob_barata = excluded.prob_barata, "
+    "prob_neutra = excluded.prob_neutra, prob_cara = excluded.prob_cara, "
+    "composite_score = excluded.composite_score, "
+    "model_version = excluded.model_version"
+)
+
+UPSERT = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) VALUES ({NEW_VALUES}) "
+    f"ON CONFLICT (ticker) DO UPDATE SET {UPSERT_SET} "
+    "WHERE latest_stock_predictions.run_date <= excluded.run_date"
+)
+
+BACKFILL = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) "
+    "SELECT p.ticker, p.id, p.run_date, p.label, p.prob_barata, p.prob_neutra, "
+    "p.prob_cara, p.composite_score, p.model_version "
+    "FROM stock_predictions p WHERE p.id = ("
+    "SELECT p2.id FROM stock_predictions p2 WHERE p2.ticker = p.ticker "
+    "ORDER BY p2.run_date DESC, p2.id DESC LIMIT 1)"
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    op.create_table(
+        "latest_stock_predictions",
+        sa.Column("ticker", sa.String(length=10), nullable=False),
+        sa.Column("prediction_id", sa.Integer(), nullable=False),
+        sa.Column("run_date", sa.DateTime(), nullable=False),
+        sa.Column("label", sa.String(length=20), nullable=False),
+        sa.Column("prob_barata", sa.Float(), nullable=True),
+        sa.Column("prob_neutra", sa.Float(), nullable=True),
+        sa.Column("prob_cara", sa.Float(), nullable=True),
+        sa.Column("composite_score", sa.Float(), nullable=True),
+        sa.Column("model_version", sa.String(length=50), nullable=True),
+        sa.PrimaryKeyConstraint("ticker"),
+    )
+
+    # stock_predictions é criada pelo pipeline de ML; sem ela não há o que
+    # copiar nem onde pendurar o trigger.
+    if not _has_table("stock_predictions"):
+        return
+
+    op.execute(BACKFILL)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE OR REPLACE FUNCTION refresh_latest_stock_prediction() "
+            "RETURNS trigger AS $$ BEGIN "
+            f"{UPSERT}; "
+            "RETURN NULL; END; $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "CREATE TRIGGER trg_latest_stock_prediction "
+            "AFTER INSERT ON stock_predictions FOR EACH ROW "
+            "EXECUTE FUNCTION refresh_latest_stock_prediction()"
+        )
+    else:
+        op.execute(
+            "CREATE TRIGGER trg_latest_stock_prediction "
+            "AFTER INSERT ON stock_predictions FOR EACH ROW "
+            f"BEGIN {UPSERT}; END"
+        )
+
+
+def downgrade():
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    if _has_table("stock_predictions"):
+        if is_postgresql:
+            op.execute(
+                "DROP TRIGGER IF EXISTS trg_latest_stock_prediction "
+                "ON stock_predictions"
+            )
+        else:
+            op.execute("DROP TRIGGER IF EXISTS trg_latest_stock_prediction")
+    if is_postgresql:
+        op.execute("DROP FUNCTION IF EXISTS refresh_latest_stock_prediction()")
+    op.drop_table("latest_stock_predictions")
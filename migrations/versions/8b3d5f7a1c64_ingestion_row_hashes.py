@@ -0,0 +1,30 @@
+"""ingestion row hashes
+
+Revision ID: 8b3d5f7a1c64
+Revises: 6e2a9d4b8c31
+Create Date: 2026-10-18 19:12:40.318275
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8b3d5f7a1c64"
+down_revision = "6e2a9d4b8c31"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingestion_row_hashes",
+        sa.Column("asset", sa.String(length=16), nullable=False),
+        sa.Column("ticker", sa.String(length=10), nullable=False),
+        sa.Column("row_hash", sa.String(length=40), nullable=False),
+        sa.PrimaryKeyConstraint("asset", "ticker"),
+    )
+
+
+def downgrade():
+    op.drop_table("ingestion_row_hashes")
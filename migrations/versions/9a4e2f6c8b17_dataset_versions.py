@@ -0,0 +1,103 @@
+"""dataset versions
+
+Revision ID: 9a4e2f6c8b17
+Revises: 7c2d4e9b1a53
+Create Date: 2026-10-18 11:40:05.287314
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9a4e2f6c8b17"
+down_revision = "7c2d4e9b1a53"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "ticker, prediction_id, run_date, label, prob_barata, prob_neutra, "
+    "prob_cara, composite_score, model_version"
+)
+
+NEW_VALUES = (
+    "NEW.ticker, NEW.id, NEW.run_date, NEW.label, NEW.prob_barata, "
+    "NEW.prob_neutra, NEW.prob_cara, NEW.composite_score, NEW.model_version"
+)
+
+UPSERT_SET = (
+    "prediction_id = excluded.prediction_id, run_date = excluded.run_date, "
+    "label = excluded.label, prob_barata = excluded.prob_barata, "
+    "prob_neutra = excluded.prob_neutra, prob_cara = excluded.prob_cara, "
+    "composite_score = excluded.composite_score, "
+    "model_version = excluded.model_version"
+)
+
+UPSERT = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) VALUES ({NEW_VALUES}) "
+    f"ON CONFLICT (ticker) DO UPDATE SET {UPSERT_SET} "
+    "WHERE latest_stock_predictions.run_date <= excluded.run_date"
+)
+
+BUMP_PREDICTIONS = (
+    "UPDATE dataset_versions SET version = version + 1, "
+    "updated_at = CURRENT_TIMESTAMP WHERE name = 'predictions'"
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _create_trigger(statements):
+    body = "; ".join(statements)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE OR REPLACE FUNCTION refresh_latest_stock_prediction() "
+            "RETURNS trigger AS $$ BEGIN "
+            f"{body}; "
+            "RETURN NULL; END; $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "DROP TRIGGER IF EXISTS trg_latest_stock_prediction ON stock_predictions"
+        )
+        op.execute(
+            "CREATE TRIGGER trg_latest_stock_prediction "
+            "AFTER INSERT ON stock_predictions FOR EACH ROW "
+            "EXECUTE FUNCTION refresh_latest_stock_prediction()"
+        )
+    else:
+        # SQLite não tem CREATE OR REPLACE TRIGGER.
+        op.execute("DROP TRIGGER IF EXISTS trg_latest_stock_prediction")
+        op.execute(
+            "CREATE TRIGGER trg_latest_stock_prediction "
+            "AFTER INSERT ON stock_predictions FOR EACH ROW "
+            f"BEGIN {body}; END"
+        )
+
+
+def upgrade():
+    op.create_table(
+        "dataset_versions",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute(
+        "INSERT INTO dataset_versions (name, version, updated_at) VALUES "
+        "('stocks', 1, CURRENT_TIMESTAMP), ('fiis', 1, CURRENT_TIMESTAMP), "
+        "('predictions', 1, CURRENT_TIMESTAMP)"
+    )
+
+    # O pipeline de ML grava direto em stock_predictions; o mesmo trigger que
+    # mantém latest_stock_predictions passa a incrementar a versão.
+    if _has_table("stock_predictions"):
+        _create_trigger([UPSERT, BUMP_PREDICTIONS])
+
+
+def downgrade():
+    if _has_table("stock_predictions"):
+        _create_trigger([UPSERT])
+    op.drop_table("dataset_versions")
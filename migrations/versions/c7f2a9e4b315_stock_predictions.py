@@ -0,0 +1,129 @@
+"""stock predictions
+
+Revision ID: c7f2a9e4b315
+Revises: 5a9c3e7d1b48
+Create Date: 2026-10-19 09:12:44.871203
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c7f2a9e4b315"
+down_revision = "5a9c3e7d1b48"
+branch_labels = None
+depends_on = None
+
+
+TRIGGER = "trg_latest_stock_prediction"
+
+PREDICTIONS_INDEX = "ix_stock_predictions_ticker_run_date"
+
+COLUMNS = (
+    "ticker, prediction_id, run_date, label, prob_barata, prob_neutra, "
+    "prob_cara, composite_score, model_version"
+)
+
+NEW_VALUES = (
+    "NEW.ticker, NEW.id, NEW.run_date, NEW.label, NEW.prob_barata, "
+    "NEW.prob_neutra, NEW.prob_cara, NEW.composite_score, NEW.model_version"
+)
+
+UPSERT_SET = (
+    "prediction_id = excluded.prediction_id, run_date = excluded.run_date, "
+    "label = excluded.label, prob_barata = excluded.prob_barata, "
+    "prob_neutra = excluded.prob_neutra, prob_cara = excluded.prob_cara, "
+    "composite_score = excluded.composite_score, "
+    "model_version = excluded.model_version"
+)
+
+UPSERT = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) VALUES ({NEW_VALUES}) "
+    f"ON CONFLICT (ticker) DO UPDATE SET {UPSERT_SET} "
+    "WHERE latest_stock_predictions.run_date <= excluded.run_date"
+)
+
+BUMP_PREDICTIONS = (
+    "UPDATE dataset_versions SET version = version + 1, "
+    "updated_at = CURRENT_TIMESTAMP WHERE name = 'predictions'"
+)
+
+BACKFILL = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) "
+    "SELECT p.ticker, p.id, p.run_date, p.label, p.prob_barata, p.prob_neutra, "
+    "p.prob_cara, p.composite_score, p.model_version "
+    "FROM stock_predictions p WHERE p.id = ("
+    "SELECT p2.id FROM stock_predictions p2 WHERE p2.ticker = p.ticker "
+    "ORDER BY p2.run_date DESC, p2.id DESC LIMIT 1)"
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_trigger(name):
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        sql = "SELECT 1 FROM pg_trigger WHERE tgname = :name AND NOT tgisinternal"
+    else:
+        sql = "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"
+    return bind.execute(sa.text(sql), {"name": name}).first() is not None
+
+
+def upgrade():
+    # Até aqui stock_predictions só existia se o pipeline de ML a tivesse
+    # criado antes das migrations; sem ela 7c2d4e9b1a53 e 9a4e2f6c8b17 não
+    # instalavam o trigger e latest_stock_predictions ficava vazia.
+    if not _has_table("stock_predictions"):
+        op.create_table(
+            "stock_predictions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("ticker", sa.String(length=10), nullable=False),
+            sa.Column("run_date", sa.DateTime(), nullable=False),
+            sa.Column("label", sa.String(length=20), nullable=False),
+            sa.Column("prob_barata", sa.Float(), nullable=True),
+            sa.Column("prob_neutra", sa.Float(), nullable=True),
+            sa.Column("prob_cara", sa.Float(), nullable=True),
+            sa.Column("composite_score", sa.Float(), nullable=True),
+            sa.Column("model_version", sa.String(length=50), nullable=True),
+            sa.ForeignKeyConstraint(["ticker"], ["stocks.ticker"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            PREDICTIONS_INDEX,
+            "stock_predictions",
+            ["ticker", sa.text("run_date DESC")],
+        )
+
+    if _has_trigger(TRIGGER):
+        return
+
+    body = f"{UPSERT}; {BUMP_PREDICTIONS}"
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE OR REPLACE FUNCTION refresh_latest_stock_prediction() "
+            f"RETURNS trigger AS $$ BEGIN {body}; RETURN NULL; END; $$ "
+            "LANGUAGE plpgsql"
+        )
+        op.execute(
+            f"CREATE TRIGGER {TRIGGER} AFTER INSERT ON stock_predictions "
+            "FOR EACH ROW EXECUTE FUNCTION refresh_latest_stock_prediction()"
+        )
+    else:
+        op.execute(
+            f"CREATE TRIGGER {TRIGGER} AFTER INSERT ON stock_predictions "
+            f"FOR EACH ROW BEGIN {body}; END"
+        )
+
+    # Predições gravadas sem o trigger.
+    op.execute("DELETE FROM latest_stock_predictions")
+    op.execute(BACKFILL)
+    op.execute(BUMP_PREDICTIONS)
+
+
+def downgrade():
+    # stock_predictions guarda o histórico do pipeline de ML e o trigger é o
+    # mesmo das migrations anteriores quando ela já existia; nada a desfazer.
+    pass
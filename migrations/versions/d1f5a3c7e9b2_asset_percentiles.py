@@ -0,0 +1,44 @@
+"""asset percentiles
+
+Revision ID: d1f5a3c7e9b2
+Revises: 4c8e1b7d2f90
+Create Date: 2026-10-18 16:20:13.540219
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d1f5a3c7e9b2"
+down_revision = "4c8e1b7d2f90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "asset_percentiles",
+        sa.Column("asset", sa.String(length=16), nullable=False),
+        sa.Column("ticker", sa.String(length=10), nullable=False),
+        sa.Column("metric", sa.String(length=64), nullable=False),
+        sa.Column("pct", sa.Float(), nullable=True),
+        sa.Column("sector_pct", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("asset", "ticker", "metric"),
+    )
+    op.create_index(
+        "ix_asset_percentiles_pct",
+        "asset_percentiles",
+        ["asset", "metric", "pct", "ticker"],
+    )
+    op.create_index(
+        "ix_asset_percentiles_sector_pct",
+        "asset_percentiles",
+        ["asset", "metric", "sector_pct", "ticker"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_asset_percentiles_sector_pct", table_name="asset_percentiles")
+    op.drop_index("ix_asset_percentiles_pct", table_name="asset_percentiles")
+    op.drop_table("asset_percentiles")
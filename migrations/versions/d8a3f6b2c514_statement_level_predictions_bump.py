@@ -0,0 +1,85 @@
+"""statement level predictions bump
+
+Revision ID: d8a3f6b2c514
+Revises: c7f2a9e4b315
+Create Date: 2026-10-19 10:05:31.224907
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d8a3f6b2c514"
+down_revision = "c7f2a9e4b315"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "ticker, prediction_id, run_date, label, prob_barata, prob_neutra, "
+    "prob_cara, composite_score, model_version"
+)
+
+NEW_VALUES = (
+    "NEW.ticker, NEW.id, NEW.run_date, NEW.label, NEW.prob_barata, "
+    "NEW.prob_neutra, NEW.prob_cara, NEW.composite_score, NEW.model_version"
+)
+
+UPSERT_SET = (
+    "prediction_id = excluded.prediction_id, run_date = excluded.run_date, "
+    "label = excluded.label, prob_barata = excluded.prob_barata, "
+    "prob_neutra = excluded.prob_neutra, prob_cara = excluded.prob_cara, "
+    "composite_score = excluded.composite_score, "
+    "model_version = excluded.model_version"
+)
+
+UPSERT = (
+    f"INSERT INTO latest_stock_predictions ({COLUMNS}) VALUES ({NEW_VALUES}) "
+    f"ON CONFLICT (ticker) DO UPDATE SET {UPSERT_SET} "
+    "WHERE latest_stock_predictions.run_date <= excluded.run_date"
+)
+
+BUMP_PREDICTIONS = (
+    "UPDATE dataset_versions SET version = version + 1, "
+    "updated_at = CURRENT_TIMESTAMP WHERE name = 'predictions'"
+)
+
+
+def _row_function(body):
+    op.execute(
+        "CREATE OR REPLACE FUNCTION refresh_latest_stock_prediction() "
+        f"RETURNS trigger AS $$ BEGIN {body}; RETURN NULL; END; $$ "
+        "LANGUAGE plpgsql"
+    )
+
+
+def upgrade():
+    # No PostgreSQL a versão passa a subir uma vez por INSERT, não por linha:
+    # uma carga do pipeline não serializa mais todas as linhas na mesma linha
+    # de dataset_versions. O SQLite só tem triggers FOR EACH ROW.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _row_function(UPSERT)
+    op.execute(
+        "CREATE OR REPLACE FUNCTION bump_predictions_version() "
+        f"RETURNS trigger AS $$ BEGIN {BUMP_PREDICTIONS}; RETURN NULL; END; $$ "
+        "LANGUAGE plpgsql"
+    )
+    op.execute(
+        "DROP TRIGGER IF EXISTS trg_bump_predictions_version ON stock_predictions"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_bump_predictions_version "
+        "AFTER INSERT ON stock_predictions FOR EACH STATEMENT "
+        "EXECUTE FUNCTION bump_predictions_version()"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "DROP TRIGGER IF EXISTS trg_bump_predictions_version ON stock_predictions"
+    )
+    op.execute("DROP FUNCTION IF EXISTS bump_predictions_version()")
+    _row_function(f"{UPSERT}; {BUMP_PREDICTIONS}")
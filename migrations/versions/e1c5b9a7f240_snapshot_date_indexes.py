@@ -0,0 +1,29 @@
+"""snapshot date indexes
+
+Revision ID: e1c5b9a7f240
+Revises: d8a3f6b2c514
+Create Date: 2026-10-19 11:20:08.390415
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e1c5b9a7f240"
+down_revision = "d8a3f6b2c514"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_stock_snapshots_snapshot_date", "stock_snapshots", ["snapshot_date"]
+    )
+    op.create_index(
+        "ix_fii_snapshots_snapshot_date", "fii_snapshots", ["snapshot_date"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_fii_snapshots_snapshot_date", table_name="fii_snapshots")
+    op.drop_index("ix_stock_snapshots_snapshot_date", table_name="stock_snapshots")
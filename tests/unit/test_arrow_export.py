@@ -0,0 +1,60 @@
+import io
+from unittest.mock import patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, Float, String, select
+from services.arrow_export import arrow_response
+from services.fii_services import export_fiis
+from models.fii import Fii
+from models.user import User  # noqa: F401  (configura os mappers)
+
+COLUMNS = [("ticker", String()), ("price", Float()), ("favorita", Boolean())]
+ROWS = [("HGLG11", 160.5, True), ("KNRI11", None, False)]
+
+
+def run_export(app, fmt):
+    with (
+        app.test_request_context(),
+        patch("services.arrow_export.db.session") as mock_db_session,
+    ):
+        mock_db_session.execute.return_value.partitions.return_value = [ROWS]
+        response = arrow_response(select(Fii.ticker), COLUMNS, fmt, "fiis")
+        return response, response.get_data()
+
+
+class TestArrowExport:
+
+    def test_arrow_stream_round_trip(self, app):
+        """Test the IPC stream is built column-wise from DB tuples"""
+        response, data = run_export(app, "arrow")
+
+        table = pa.ipc.open_stream(data).read_all()
+        assert response.mimetype == "application/vnd.apache.arrow.stream"
+        assert table.schema.field("price").type == pa.float64()
+        assert table.schema.field("favorita").type == pa.bool_()
+        assert table.to_pylist()[1] == {
+            "ticker": "KNRI11",
+            "price": None,
+            "favorita": False,
+        }
+
+    def test_parquet_round_trip(self, app):
+        """Test the Parquet download"""
+        response, data = run_export(app, "parquet")
+
+        table = pq.read_table(io.BytesIO(data))
+        assert "fiis.parquet" in response.headers["Content-Disposition"]
+        assert table.column("ticker").to_pylist() == ["HGLG11", "KNRI11"]
+
+    def test_export_without_pyarrow_returns_501(self, app):
+        """Test the columnar formats report when pyarrow is missing"""
+        with (
+            app.test_request_context(),
+            patch("services.arrow_export.pa", None),
+            patch("services.fii_services.FavoriteFii.query"),
+        ):
+            result, status_code = export_fiis(1, fmt="arrow")
+
+        assert status_code == 501
+        assert result.get_json()["message"] == "Format not available"
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.stock import Stock
+from services.bulk_upsert import upsert_rows, upsert_statement
+
+
+def compiled(dialect, columns):
+    with patch("services.bulk_upsert.db.session") as mock_db_session:
+        mock_db_session.get_bind.return_value.dialect.name = dialect.name
+        stmt = upsert_statement(Stock, columns)
+    return str(stmt.compile(dialect=dialect))
+
+
+class TestUpsertStatement:
+
+    def test_postgresql_on_conflict(self, app):
+        """Test that PostgreSQL gets ON CONFLICT on the primary key"""
+        sql = compiled(postgresql.dialect(), ["ticker", "price", "p_l"])
+
+        assert "ON CONFLICT (ticker) DO UPDATE SET" in sql
+        assert "price = excluded.price" in sql
+        assert "ticker = excluded.ticker" not in sql
+
+    def test_sqlite_on_conflict(self, app):
+        """Test that SQLite gets its upsert syntax"""
+        sql = compiled(sqlite.dialect(), ["ticker", "dy"])
+
+        assert "ON CONFLICT (ticker) DO UPDATE SET dy = excluded.dy" in sql
+
+    def test_only_key_does_nothing_on_conflict(self, app):
+        """Test that a payload with only the key skips existing rows"""
+        sql = compiled(sqlite.dialect(), ["ticker"])
+
+        assert "ON CONFLICT (ticker) DO NOTHING" in sql
+
+    def test_unsupported_dialect(self, app):
+        """Test that other databases are rejected"""
+        with patch("services.bulk_upsert.db.session") as mock_db_session:
+            mock_db_session.get_bind.return_value.dialect.name = "mysql"
+
+            with pytest.raises(ValueError):
+                upsert_statement(Stock, ["ticker", "price"])
+
+
+class TestUpsertRows:
+
+    def test_rows_are_batched_and_normalized(self, app):
+        """Test that rows keep only table columns and go out in batches"""
+        rows = [
+            {"ticker": f"T{i}", "price": float(i), "bogus": 1} for i in range(5)
+        ] + [{"ticker": "X", "dy": 0.1}]
+        with patch("services.bulk_upsert.db.session") as mock_db_session:
+            mock_db_session.get_bind.return_value.dialect.name = "sqlite"
+
+            written = upsert_rows(Stock, rows, batch_size=4)
+
+        assert written == 6
+        batches = [c.args[1] for c in mock_db_session.execute.call_args_list]
+        assert [len(batch) for batch in batches] == [4, 2]
+        assert batches[0][0] == {"ticker": "T0", "price": 0.0, "dy": None}
+        assert batches[1][1] == {"ticker": "X", "price": None, "dy": 0.1}
+        mock_db_session.commit.assert_not_called()
+
+    def test_no_rows(self, app):
+        """Test that an empty payload executes nothing"""
+        with patch("services.bulk_upsert.db.session") as mock_db_session:
+            assert upsert_rows(Stock, []) == 0
+
+        mock_db_session.execute.assert_not_called()
@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, patch
+
+from models.stock import Stock
+from models.user import User  # noqa: F401  (configura os mappers)
+from services.change_detection import row_hash, write_changed_rows
+from services.stock_services import run_stock_update
+
+COLUMNS = ["ticker", "price", "dy"]
+
+
+def hashed(row):
+    return row_hash(row, COLUMNS)
+
+
+class TestRowHash:
+
+    def test_row_hash_is_stable(self):
+        """Test that equal values give equal hashes regardless of key order"""
+        assert hashed({"ticker": "A", "price": 1.0, "dy": None}) == hashed(
+            {"dy": None, "price": 1.0, "ticker": "A"}
+        )
+
+    def test_row_hash_changes_with_values(self):
+        """Test that any column change moves the hash"""
+        assert hashed({"ticker": "A", "price": 1.0}) != hashed(
+            {"ticker": "A", "price": 1.01}
+        )
+
+
+class TestWriteChangedRows:
+
+    def run(self, rows, stored):
+        with (
+            patch("services.change_detection.db.session") as mock_db_session,
+            patch("services.change_detection.upsert_rows") as mock_upsert,
+        ):
+            mock_db_session.execute.return_value.all.return_value = stored
+            counts = write_changed_rows("stocks", Stock, rows)
+        return counts, mock_upsert
+
+    def test_only_new_and_changed_rows_are_written(self, app):
+        """Test the inserted/updated/unchanged/removed split"""
+        same = {"ticker": "SAME", "price": 1.0, "dy": 0.1}
+        moved = {"ticker": "MOVED", "price": 2.0, "dy": 0.1}
+        new = {"ticker": "NEW", "price": 3.0, "dy": 0.1}
+        stored = [
+            ("SAME", hashed(same)),
+            ("MOVED", hashed({**moved, "price": 1.5})),
+            ("EDITED", None),
+            ("GONE", "abc"),
+        ]
+
+        counts, mock_upsert = self.run([same, moved, new], stored)
+
+        assert counts == {"inserted": 1, "updated": 1, "unchanged": 1, "removed": 2}
+        rows_call, hashes_call = mock_upsert.call_args_list
+        assert [row["ticker"] for row in rows_call.args[1]] == ["MOVED", "NEW"]
+        assert hashes_call.args[1][1] == {
+            "asset": "stocks",
+            "ticker": "NEW",
+            "row_hash": hashed(new),
+        }
+
+    def test_nothing_written_when_unchanged(self, app):
+        """Test that an identical pull skips the upsert entirely"""
+        row = {"ticker": "A", "price": 1.0, "dy": 0.1}
+
+        counts, mock_upsert = self.run([row], [("A", hashed(row))])
+
+        assert counts["unchanged"] == 1
+        mock_upsert.assert_not_called()
+
+
+class TestRunStockUpdateWithoutChanges:
+
+    def test_unchanged_pull_keeps_versions(self, app):
+        """Test that derived tables and versions are left alone"""
+        data = {"list": [{"ticker": "PETR4", "price": 25.0, "roic": 0.1}]}
+        counts = {"inserted": 0, "updated": 0, "unchanged": 1, "removed": 0}
+        progress = MagicMock()
+        with (
+            patch(
+                "services.stock_services.get_all_stocks_from_statusinvest",
+                return_value=data,
+            ),
+            patch("services.stock_services.write_changed_rows", return_value=counts),
+            patch("services.stock_services.record_snapshot", return_value=1),
+            patch("services.stock_services.refresh_percentiles") as mock_refresh,
+            patch("services.stock_services.bump_version") as mock_bump,
+            patch("services.stock_services.db.session") as mock_db_session,
+        ):
+            run_stock_update(progress)
+
+        mock_refresh.assert_not_called()
+        mock_bump.assert_not_called()
+        mock_db_session.commit.assert_called_once()
+        progress.count.assert_called_once_with(fetched=1, snapshot=1, **counts)
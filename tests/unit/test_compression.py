@@ -0,0 +1,94 @@
+import gzip
+from unittest.mock import patch
+
+import brotli
+import zstandard
+from flask import jsonify
+from compression import CompressedCache, init_compression
+
+
+def make_client(app, payload, etag=None):
+    @app.route("/data")
+    def data():
+        response = jsonify(payload)
+        if etag:
+            response.set_etag(etag)
+        return response
+
+    init_compression(app)
+    return app.test_client()
+
+
+LARGE = {"data": [{"ticker": f"T{i:03d}", "price": i * 1.5} for i in range(200)]}
+
+
+class TestCompression:
+
+    def test_gzip_when_accepted(self, app):
+        """Test large JSON bodies are gzip-compressed on request"""
+        client = make_client(app, LARGE)
+
+        plain = client.get("/data")
+        response = client.get("/data", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(response.data) == plain.data
+        assert int(response.headers["Content-Length"]) == len(response.data)
+
+    def test_brotli_preferred_when_accepted(self, app):
+        """Test br wins over zstd and gzip when the client takes all three"""
+        client = make_client(app, LARGE)
+
+        plain = client.get("/data")
+        response = client.get("/data", headers={"Accept-Encoding": "gzip, zstd, br"})
+
+        assert response.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(response.data) == plain.data
+
+    def test_zstd_when_accepted(self, app):
+        """Test zstd for clients without brotli"""
+        client = make_client(app, LARGE)
+
+        plain = client.get("/data")
+        response = client.get("/data", headers={"Accept-Encoding": "gzip, zstd"})
+
+        assert response.headers["Content-Encoding"] == "zstd"
+        assert zstandard.ZstdDecompressor().decompress(response.data) == plain.data
+
+    def test_no_compression_without_accept_encoding_or_below_threshold(self, app):
+        """Test identity responses for clients without gzip and small bodies"""
+        app.config["COMPRESS_MIN_SIZE"] = 10**6
+        client = make_client(app, LARGE)
+
+        small = client.get("/data", headers={"Accept-Encoding": "gzip"})
+        app.config["COMPRESS_MIN_SIZE"] = 1024
+        refused = client.get("/data", headers={"Accept-Encoding": "gzip;q=0"})
+
+        assert "Content-Encoding" not in small.headers
+        assert "Content-Encoding" not in refused.headers
+
+    def test_etag_responses_reuse_compressed_bytes(self, app):
+        """Test the compressed body is cached by ETag and the tag is suffixed"""
+        cache = CompressedCache()
+        client = make_client(app, LARGE, etag="abc")
+
+        with patch("compression.compressed_cache", cache):
+            first = client.get("/data", headers={"Accept-Encoding": "gzip"})
+            second = client.get("/data", headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["ETag"] == '"abc-gzip"'
+        assert second.data == first.data
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the LRU bound of the compressed cache"""
+        cache = CompressedCache()
+        cache.put("a", b"1", 2)
+        cache.put("b", b"2", 2)
+        cache.get("a")
+        cache.put("c", b"3", 2)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
@@ -0,0 +1,158 @@
+from unittest.mock import patch, MagicMock
+from flask import jsonify
+from services.dataset_versions import VersionCache, bump_version
+from services.screener_engine import ScreenerEngine
+from services.stock_services import STOCK_ALLOWED_COLS
+from models.stock import Stock
+from utils import etag_route
+
+
+def register_view(app, view, user_dataset=None):
+    app.add_url_rule("/items", view_func=etag_route(view, ("stocks",), user_dataset))
+    return app.test_client()
+
+
+class TestVersionCache:
+
+    def test_get_many_reads_missing_names_once(self, app):
+        """Test that versions are cached and unknown names default to 0"""
+        app.config["DATASET_VERSION_CHECK_SECONDS"] = 60
+        cache = VersionCache()
+        with patch("services.dataset_versions.db.session") as mock_db_session:
+            query = mock_db_session.query.return_value.filter.return_value
+            query.all.return_value = [("stocks", 7)]
+
+            first = cache.get_many(["stocks", "fiis"])
+            second = cache.get_many(["stocks"])
+
+            assert first == {"stocks": 7, "fiis": 0}
+            assert second == {"stocks": 7}
+            assert query.all.call_count == 1
+
+    def test_forget_forces_reload(self, app):
+        """Test that a forgotten name is read again from the database"""
+        app.config["DATASET_VERSION_CHECK_SECONDS"] = 60
+        cache = VersionCache()
+        with patch("services.dataset_versions.db.session") as mock_db_session:
+            query = mock_db_session.query.return_value.filter.return_value
+            query.all.return_value = [("stocks", 7)]
+            cache.get_many(["stocks"])
+
+            query.all.return_value = [("stocks", 8)]
+            cache.forget("stocks")
+
+            assert cache.get_many(["stocks"]) == {"stocks": 8}
+
+    def test_bump_version_forgets_cached_value(self, app):
+        """Test that bumping executes an upsert and drops the local copy"""
+        with (
+            patch("services.dataset_versions.db.session") as mock_db_session,
+            patch("services.dataset_versions.version_cache") as mock_cache,
+        ):
+            mock_db_session.get_bind.return_value.dialect.name = "postgresql"
+
+            bump_version("stocks")
+
+            mock_db_session.execute.assert_called_once()
+            mock_db_session.commit.assert_not_called()
+            mock_cache.forget.assert_called_once_with("stocks")
+
+
+class TestEtagRoute:
+
+    def test_matching_etag_returns_304_without_calling_view(self, app):
+        """Test conditional requests skip the view entirely"""
+        view = MagicMock(return_value=(jsonify({"data": []}), 200))
+        view.__name__ = "list_items"
+        client = register_view(app, view)
+
+        with patch("utils.get_versions", return_value={"stocks": 3}):
+            first = client.get("/items?page=1")
+            second = client.get(
+                "/items?page=1", headers={"If-None-Match": first.headers["ETag"]}
+            )
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert view.call_count == 1
+
+    def test_compressed_variant_etag_also_matches(self, app):
+        """Test that the encoding suffix added by compression still revalidates"""
+        view = MagicMock(return_value=(jsonify({"data": []}), 200))
+        view.__name__ = "list_items"
+        client = register_view(app, view)
+
+        with patch("utils.get_versions", return_value={"stocks": 3}):
+            etag = client.get("/items").headers["ETag"].strip('"')
+            response = client.get("/items", headers={"If-None-Match": f'"{etag}-gzip"'})
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == f'"{etag}-gzip"'
+
+    def test_etag_changes_with_version_and_query(self, app):
+        """Test the tag covers dataset versions and query parameters"""
+        view = MagicMock(return_value=(jsonify({"data": []}), 200))
+        view.__name__ = "list_items"
+        client = register_view(app, view)
+
+        with patch("utils.get_versions") as mock_versions:
+            mock_versions.return_value = {"stocks": 3}
+            base = client.get("/items?page=1").headers["ETag"]
+            other_page = client.get("/items?page=2").headers["ETag"]
+            mock_versions.return_value = {"stocks": 4}
+            bumped = client.get("/items?page=1").headers["ETag"]
+
+        assert len({base, other_page, bumped}) == 3
+
+    def test_user_dataset_is_part_of_the_tag(self, app):
+        """Test per-user responses depend on the user's favorites version"""
+        view = MagicMock(return_value=(jsonify({"data": []}), 200))
+        view.__name__ = "list_items"
+        client = register_view(app, view, lambda user_id: f"favorites:{user_id}")
+
+        with (
+            patch("utils.get_jwt_identity", return_value="1"),
+            patch("utils.get_versions") as mock_versions,
+        ):
+            mock_versions.return_value = {"stocks": 3, "favorites:1": 1}
+            before = client.get("/items").headers["ETag"]
+            mock_versions.return_value = {"stocks": 3, "favorites:1": 2}
+            after = client.get("/items").headers["ETag"]
+
+            assert mock_versions.call_args[0][0] == ["stocks", "favorites:1"]
+        assert before != after
+
+    def test_errors_are_not_tagged(self, app):
+        """Test that non-200 responses go out without an ETag"""
+        view = MagicMock(return_value=(jsonify({"message": "Not found"}), 404))
+        view.__name__ = "list_items"
+        client = register_view(app, view)
+
+        with patch("utils.get_versions", return_value={"stocks": 3}):
+            response = client.get("/items")
+
+        assert response.status_code == 404
+        assert "ETag" not in response.headers
+
+
+class TestEngineVersion:
+
+    def test_snapshot_reloads_when_dataset_version_changes(self, app):
+        """Test that a new dataset version replaces the snapshot"""
+        app.config["SCREENER_ENGINE_MAX_AGE"] = 600
+        engine = ScreenerEngine(Stock, STOCK_ALLOWED_COLS, dataset="stocks")
+        with (
+            patch("services.screener_engine.get_version") as mock_version,
+            patch("services.screener_engine.db.session") as mock_db_session,
+        ):
+            mock_version.return_value = 1
+            mock_db_session.query.return_value.all.return_value = [
+                Stock(ticker="PETR4", price=30.0)
+            ]
+            first = engine.snapshot()
+            assert engine.snapshot() is first
+
+            mock_version.return_value = 2
+            assert engine.snapshot() is not first
+            assert mock_db_session.query.return_value.all.call_count == 2
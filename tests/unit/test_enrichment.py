@@ -0,0 +1,97 @@
+import random
+
+import numpy as np
+import pytest
+
+from models.stock import Stock
+from models.user import User  # noqa: F401  (configura os mappers)
+from services.enrichment import enrich_stocks, stock_metrics
+from services.ranking import descending_ranks
+
+
+class TestDescendingRanksMin:
+
+    def test_ties_share_the_lowest_position(self):
+        """Test competition ranking (1, 2, 2, 4)"""
+        assert descending_ranks([5.0, 3.0, 5.0, 1.0, 3.0], method="min").tolist() == [
+            1,
+            3,
+            1,
+            5,
+            3,
+        ]
+
+    def test_missing_values_tie_last(self):
+        """Test that None/NaN share the position after every present value"""
+        ranks = descending_ranks([None, 2.0, np.nan, 1.0], method="min")
+
+        assert ranks.tolist() == [3, 1, 3, 2]
+
+    def test_unknown_method(self):
+        """Test that an unknown tie rule is rejected"""
+        with pytest.raises(ValueError):
+            descending_ranks([1.0], method="dense")
+
+
+class TestEnrichStocks:
+
+    def test_matches_per_row_formulas(self):
+        """Test Graham, discount and EY against the Stock/service helpers"""
+        rnd = random.Random(3)
+        rows = [
+            {
+                "ticker": f"T{i}",
+                "price": rnd.choice([0.0, rnd.uniform(1, 100)]),
+                "lpa": rnd.uniform(-5, 10),
+                "vpa": rnd.choice([None, rnd.uniform(-5, 50)]),
+                "roic": rnd.uniform(-0.2, 0.4),
+            }
+            for i in range(300)
+        ]
+        expected = [
+            (
+                Stock(**row).graham_formula,
+                Stock(**row).discount_to_graham,
+                row["lpa"] / row["price"] if row["price"] else 0,
+            )
+            for row in rows
+        ]
+
+        enrich_stocks(rows)
+
+        for row, (graham, discount, ey) in zip(rows, expected):
+            assert row["graham_formula"] == pytest.approx(graham, abs=0.01)
+            assert row["discount_to_graham"] == pytest.approx(discount, abs=0.01)
+            assert row["ey"] == pytest.approx(ey)
+
+    def test_earnings_yield(self):
+        """Test EY as LPA / price, 0 without price or LPA"""
+        nan = np.nan
+        metrics = stock_metrics(
+            np.array([25.0, 0.0, 25.0, nan, 25.0]),
+            np.array([5.0, 5.0, 0.0, 5.0, nan]),
+            np.full(5, nan),
+            np.full(5, nan),
+        )
+
+        assert metrics["ey"].tolist() == [0.2, 0.0, 0.0, 0.0, 0.0]
+
+    def test_ranks_and_python_types(self):
+        """Test magic formula ranks with ties and plain Python values"""
+        rows = [
+            {"ticker": "A", "price": 10.0, "lpa": 2.0, "vpa": 8.0, "roic": 0.2},
+            {"ticker": "B", "price": 20.0, "lpa": 4.0, "vpa": 8.0, "roic": 0.1},
+            {"ticker": "C", "price": 10.0, "lpa": 1.0, "vpa": 8.0, "roic": None},
+        ]
+
+        enrich_stocks(rows)
+
+        assert [row["ey_rank"] for row in rows] == [1, 1, 3]
+        assert [row["roic_rank"] for row in rows] == [1, 2, 3]
+        assert [row["magic_formula_rank"] for row in rows] == [2, 3, 6]
+        assert type(rows[0]["magic_formula_rank"]) is int
+        assert type(rows[0]["graham_formula"]) is float
+
+    def test_empty_batch(self):
+        """Test that an empty fetch is left alone"""
+        assert enrich_stocks([]) == []
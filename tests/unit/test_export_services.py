@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+from services.export_services import InvalidExportFormatError, export_response
+from services.fii_services import _fii_columns, _fii_json, export_fiis
+from services.prediction_service import EXPORT_COLUMNS
+from services.stock_services import _stock_columns, _stock_json, export_stocks
+from models.fii import Fii
+from models.latest_stock_prediction import LatestStockPrediction
+from models.stock import Stock
+from models.user import User  # noqa: F401  (configura os mappers)
+
+ROWS = [{"ticker": f"T{i:03d}", "price": float(i)} for i in range(7)]
+
+
+def make_query(rows):
+    query = MagicMock()
+    query.yield_per.return_value = iter(rows)
+    return query
+
+
+class TestExportResponse:
+
+    def test_ndjson_streams_one_object_per_line(self, app):
+        """Test NDJSON output and chunked streaming"""
+        query = make_query(ROWS)
+        with (
+            app.test_request_context(),
+            patch("services.export_services.CHUNK_ROWS", 3),
+        ):
+            response = export_response(query, dict, ["ticker"], "ndjson", "stocks")
+            chunks = list(response.response)
+
+        assert response.mimetype == "application/x-ndjson"
+        assert len(chunks) == 3
+        lines = "".join(chunks).splitlines()
+        assert [json.loads(line) for line in lines] == ROWS
+        query.yield_per.assert_called_once()
+
+    def test_csv_has_header_and_all_rows(self, app):
+        """Test CSV output with the requested columns"""
+        with app.test_request_context():
+            response = export_response(
+                make_query(ROWS), dict, ["ticker", "price"], "csv", "stocks"
+            )
+            body = "".join(response.response)
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert response.mimetype == "text/csv"
+        assert "stocks.csv" in response.headers["Content-Disposition"]
+        assert len(rows) == 7
+        assert rows[2] == {"ticker": "T002", "price": "2.0"}
+
+    def test_csv_without_rows_still_has_header(self, app):
+        """Test an empty export keeps the header line"""
+        with app.test_request_context():
+            response = export_response(
+                make_query([]), dict, ["ticker"], "csv", "stocks"
+            )
+            body = "".join(response.response)
+
+        assert body.splitlines() == ["ticker"]
+
+    def test_invalid_format_raises(self, app):
+        """Test unknown formats are rejected before streaming"""
+        with pytest.raises(InvalidExportFormatError):
+            export_response(make_query(ROWS), dict, [], "xml", "stocks")
+
+
+class TestExportFiis:
+
+    def test_export_fiis_with_fields(self, app):
+        """Test FII export serializes only requested fields"""
+        with (
+            app.test_request_context(),
+            patch("services.fii_services.Fii.query") as mock_fii_query,
+            patch("services.fii_services.FavoriteFii.query") as mock_fav_query,
+        ):
+            query = mock_fii_query.options.return_value.order_by.return_value
+            query.yield_per.return_value = iter([Fii(ticker="HGLG11", dy=0.08)])
+
+            response = export_fiis(1, fmt="ndjson", fields="dy")
+            body = "".join(response.response)
+
+        assert json.loads(body) == {"ticker": "HGLG11", "dy": 0.08}
+        mock_fav_query.filter_by.assert_not_called()
+
+    def test_export_fiis_invalid_format(self, app):
+        """Test the service maps an invalid format to 400"""
+        with (
+            app.test_request_context(),
+            patch("services.fii_services.Fii.query"),
+            patch("services.fii_services.FavoriteFii.query"),
+        ):
+            result, status_code = export_fiis(1, fmt="xml")
+
+        assert status_code == 400
+        assert result.get_json()["message"] == "Invalid format"
+
+    def test_export_fiis_arrow_skips_orm_query(self, app):
+        """Test the columnar branch does not build the ORM query"""
+        with (
+            app.test_request_context(),
+            patch("services.fii_services.Fii.query") as mock_fii_query,
+            patch("services.fii_services.FavoriteFii.query"),
+            patch("services.fii_services._export_fiis_arrow") as mock_arrow,
+        ):
+            mock_arrow.return_value = "arrow"
+
+            assert export_fiis(1, fmt="arrow") == "arrow"
+
+        assert mock_fii_query.mock_calls == []
+
+
+class TestExportStocks:
+
+    def test_export_stocks_arrow_skips_orm_query(self, app):
+        """Test the columnar branch does not build the ORM query"""
+        with (
+            app.test_request_context(),
+            patch("services.stock_services.Favorite.query"),
+            patch("services.stock_services._stocks_with_predictions") as mock_query,
+            patch("services.stock_services._export_stocks_arrow") as mock_arrow,
+        ):
+            mock_arrow.return_value = "arrow"
+
+            assert export_stocks(1, fmt="parquet") == "arrow"
+
+        mock_query.assert_not_called()
+
+
+class TestExportColumns:
+
+    @pytest.mark.parametrize(
+        "fields", [None, ["ticker", "ml_score", "favorita", "dy", "price"]]
+    )
+    def test_stock_columns_match_serialized_keys(self, fields):
+        """Test the stock header follows the keys of each exported row"""
+        row = _stock_json(Stock(ticker="PETR4"), None, set(), fields)
+
+        assert _stock_columns(fields) == list(row)
+
+    @pytest.mark.parametrize("fields", [None, ["ticker", "favorita", "dy"]])
+    def test_fii_columns_match_serialized_keys(self, fields):
+        """Test the FII header follows the keys of each exported row"""
+        row = _fii_json(Fii(ticker="HGLG11"), set(), fields)
+
+        assert _fii_columns(fields) == list(row)
+
+    def test_prediction_columns_match_serialized_keys(self):
+        """Test the prediction header follows to_json()"""
+        assert list(EXPORT_COLUMNS) == list(LatestStockPrediction().to_json())
@@ -26,18 +26,12 @@ class TestFavoriteServices:
                 "stock": None,
             }
 
-            with (
-                patch(
-                    "services.favorite_services.Favorite.query"
-                ) as mock_favorite_query,
-                patch(
-                    "services.favorite_services.get_latest_predictions_map"
-                ) as mock_pred_map,
-            ):
-                mock_favorite_query.filter_by.return_value.all.return_value = [
-                    mock_favorite
-                ]
-                mock_pred_map.return_value = {}
+            with patch(
+                "services.favorite_services.Favorite.query"
+            ) as mock_favorite_query:
+                joined = mock_favorite_query.filter_by.return_value.outerjoin
+                rows = joined.return_value.add_entity.return_value.options
+                rows.return_value.all.return_value = [(mock_favorite, None)]
 
                 result, status_code = list_favorites(sample_user.id)
 
@@ -49,16 +43,12 @@ class TestFavoriteServices:
     def test_list_favorites_empty(self, app):
         """Test listing favorites when no favorites exist"""
         with app.app_context():
-            with (
-                patch(
-                    "services.favorite_services.Favorite.query"
-                ) as mock_favorite_query,
-                patch(
-                    "services.favorite_services.get_latest_predictions_map"
-                ) as mock_pred_map,
-            ):
-                mock_favorite_query.filter_by.return_value.all.return_value = []
-                mock_pred_map.return_value = {}
+            with patch(
+                "services.favorite_services.Favorite.query"
+            ) as mock_favorite_query:
+                joined = mock_favorite_query.filter_by.return_value.outerjoin
+                rows = joined.return_value.add_entity.return_value.options
+                rows.return_value.all.return_value = []
 
                 result, status_code = list_favorites(1)
 
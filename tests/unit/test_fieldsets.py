@@ -0,0 +1,67 @@
+from unittest.mock import patch, MagicMock
+from services.fieldsets import parse_fields, project
+from services.stock_services import list_stocks, view_stock
+from models.stock import Stock
+
+
+class TestParseFields:
+
+    def test_parse_fields_missing_returns_none(self):
+        """Test that an absent or blank parameter means the full response"""
+        assert parse_fields(None, {"price"}) is None
+        assert parse_fields("  ", {"price"}) is None
+
+    def test_parse_fields_keeps_order_and_ticker(self):
+        """Test ticker always comes first and unknown fields are dropped"""
+        fields = parse_fields("dy, price,password,dy", {"ticker", "price", "dy"})
+
+        assert fields == ["ticker", "dy", "price"]
+
+    def test_project_restricts_keys(self):
+        """Test projection of an already serialized row"""
+        row = {"ticker": "PETR4", "price": 30.0, "dy": 0.1}
+
+        assert project(row, ["ticker", "dy"]) == {"ticker": "PETR4", "dy": 0.1}
+        assert project(row, None) is row
+
+
+class TestStockFields:
+
+    def test_list_stocks_with_fields_skips_joins(self, app):
+        """Test that only requested fields are serialized and queried"""
+        with app.app_context():
+            with (
+                patch("services.stock_services.Favorite.query") as mock_favorite_query,
+                patch("services.stock_services.Stock.query") as mock_stock_query,
+            ):
+                stock = Stock(ticker="PETR4", price=30.0, dy=0.1)
+                query = mock_stock_query.options.return_value
+                paginated = query.paginate.return_value
+                paginated.items = [stock]
+                paginated.total = 1
+                paginated.pages = 1
+                paginated.page = 1
+
+                result, status_code = list_stocks(1, fields="price")
+
+                assert status_code == 200
+                assert result.get_json()["data"] == [{"ticker": "PETR4", "price": 30.0}]
+                mock_favorite_query.filter_by.assert_not_called()
+                query.outerjoin.assert_not_called()
+
+    def test_view_stock_with_ml_fields(self, app):
+        """Test that ML fields keep the prediction join"""
+        with app.app_context():
+            with patch("services.stock_services.Stock.query") as mock_stock_query:
+                pred = MagicMock(label="barata")
+                joined = mock_stock_query.options.return_value.outerjoin.return_value
+                filtered = joined.add_entity.return_value.filter.return_value
+                filtered.first.return_value = (
+                    Stock(ticker="PETR4", price=30.0),
+                    pred,
+                )
+
+                result, status_code = view_stock("PETR4", fields="ml_label")
+
+                assert status_code == 200
+                assert result.get_json() == {"ticker": "PETR4", "ml_label": "barata"}
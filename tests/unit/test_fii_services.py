@@ -7,6 +7,7 @@ from services.fii_services import (
     delete_fii,
     get_all_fiis_from_statusinvest,
     update_all_fiis,
+    batch_fiis,
 )
 from models.fii import Fii
 from models.favorite_fiis import FavoriteFii
@@ -156,6 +157,8 @@ class TestFiiServices:
                 patch("services.fii_services.Fii.query") as mock_fii_query,
                 patch("services.fii_services.FavoriteFii.query"),
                 patch("services.fii_services.db") as mock_db,
+                patch("services.fii_services.bump_version") as mock_bump,
+                patch("services.fii_services.refresh_percentiles") as mock_refresh,
             ):
 
                 mock_fii_query.filter_by.return_value.first.return_value = None
@@ -166,6 +169,8 @@ class TestFiiServices:
                 assert status_code == 201
                 result_data = result.get_json()
                 assert result_data["message"] == "FII added successfully"
+                mock_bump.assert_called_once_with("fiis")
+                mock_refresh.assert_called_once_with("fiis")
 
     def test_new_fii_already_exists(self, app):
         """Test creating a FII that already exists"""
@@ -323,7 +328,7 @@ class TestFiiServices:
                 result_data = result.get_json()
                 assert "An error occurred" in result_data["message"]
 
-    @patch("services.fii_services.requests.get")
+    @patch("services.ingestion_http.requests.Session.get")
     def test_get_all_fiis_from_statusinvest_success(self, mock_get):
         """Test successful retrieval of FIIs from StatusInvest"""
         mock_response = MagicMock()
@@ -348,8 +353,9 @@ class TestFiiServices:
         assert len(result["list"]) == 1
         assert result["list"][0]["ticker"] == "KNRI11"
 
-    @patch("services.fii_services.requests.get")
-    def test_get_all_fiis_from_statusinvest_http_error(self, mock_get):
+    @patch("services.ingestion_http.time.sleep")
+    @patch("services.ingestion_http.requests.Session.get")
+    def test_get_all_fiis_from_statusinvest_http_error(self, mock_get, mock_sleep):
         """Test retrieval of FIIs when HTTP error occurs"""
         mock_response = MagicMock()
         mock_response.status_code = 500
@@ -358,8 +364,11 @@ class TestFiiServices:
         result = get_all_fiis_from_statusinvest()
 
         assert result is None
+        # 500 é transitório: 1 chamada + 3 novas tentativas
+        assert mock_get.call_count == 4
+        assert mock_sleep.call_count == 3
 
-    @patch("services.fii_services.requests.get")
+    @patch("services.ingestion_http.requests.Session.get")
     def test_get_all_fiis_from_statusinvest_exception(self, mock_get):
         """Test retrieval of FIIs when an exception occurs"""
         mock_get.side_effect = Exception("Network error")
@@ -384,19 +393,19 @@ class TestFiiServices:
                 ]
             }
 
-            mock_existing_fii = MagicMock(spec=Fii)
-            mock_existing_fii.ticker = "KNRI11"
-
             with (
-                patch("services.fii_services.Fii.query") as mock_fii_query,
+                patch("services.fii_services.write_changed_rows") as mock_write,
+                patch("services.fii_services.record_snapshot"),
                 patch("services.fii_services.db.session") as mock_db_session,
             ):
 
                 mock_get_fiis.return_value = mock_fii_data
-                mock_fii_query.filter.return_value.all.return_value = [
-                    mock_existing_fii
-                ]
-                mock_db_session.add_all = MagicMock()
+                mock_write.return_value = {
+                    "inserted": 1,
+                    "updated": 0,
+                    "unchanged": 0,
+                    "removed": 0,
+                }
                 mock_db_session.commit = MagicMock()
 
                 result, status_code = update_all_fiis()
@@ -404,6 +413,8 @@ class TestFiiServices:
                 assert status_code == 200
                 result_data = result.get_json()
                 assert result_data["message"] == "FIIs updated successfully."
+                [row] = mock_write.call_args.args[2]
+                assert row["patrimonio"] == 0.0
 
     @patch("services.fii_services.get_all_fiis_from_statusinvest")
     def test_update_all_fiis_no_data(self, mock_get_fiis, app):
@@ -432,3 +443,22 @@ class TestFiiServices:
                 assert status_code == 500
                 result_data = result.get_json()
                 assert "An error occurred" in result_data["message"]
+
+    def test_batch_fiis_with_fields(self, app):
+        """Test FII batch lookup with sparse fields and missing tickers"""
+        with app.app_context():
+            with (
+                patch("services.fii_services.Fii.query") as mock_fii_query,
+                patch("services.fii_services.FavoriteFii.query") as mock_fav_query,
+            ):
+                query = mock_fii_query.options.return_value.filter.return_value
+                query.all.return_value = [Fii(ticker="HGLG11", price=160.0)]
+
+                result, status_code = batch_fiis(1, ["HGLG11", "XXXX11"], "price")
+
+                assert status_code == 200
+                assert result.get_json() == {
+                    "data": [{"ticker": "HGLG11", "price": 160.0}],
+                    "missing": ["XXXX11"],
+                }
+                mock_fav_query.filter_by.assert_not_called()
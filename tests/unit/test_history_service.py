@@ -0,0 +1,119 @@
+from datetime import date
+from unittest.mock import patch
+
+from models.fii_snapshot import FiiSnapshot
+from services.history_service import get_history, record_snapshot, snapshot_metrics
+
+
+class TestRecordSnapshot:
+
+    def test_record_snapshot_keeps_only_metrics(self, app):
+        """Test that a dated row with the snapshot columns is upserted"""
+        rows = [{"ticker": "PETR4", "price": 25.0, "companyname": "Petrobras"}]
+        with (
+            patch("services.history_service.db.session") as mock_db_session,
+            patch("services.history_service.upsert_rows") as mock_upsert,
+            patch("services.history_service.bump_version") as mock_bump,
+        ):
+            mock_db_session.execute.return_value = []
+            written = record_snapshot("stocks", rows, date(2026, 10, 1))
+
+        assert written == 1
+        model, [record] = mock_upsert.call_args.args
+        assert model.__tablename__ == "stock_snapshots"
+        assert record["snapshot_date"] == date(2026, 10, 1)
+        assert record["price"] == 25.0 and record["p_l"] is None
+        assert "companyname" not in record
+        mock_bump.assert_called_once_with("stock_history")
+
+    def test_record_snapshot_skips_rows_already_in_the_day(self, app):
+        """Test that a rerun rewrites only moved tickers and bumps only then"""
+        metrics = snapshot_metrics(FiiSnapshot)
+        same = {"ticker": "KNRI11", "price": 150.0}
+        moved = {"ticker": "HGLG11", "price": 160.0}
+        stored = [
+            ("KNRI11",) + tuple(same.get(m) for m in metrics),
+            ("HGLG11",) + tuple(158.0 if m == "price" else None for m in metrics),
+        ]
+        with (
+            patch("services.history_service.db.session") as mock_db_session,
+            patch("services.history_service.upsert_rows") as mock_upsert,
+            patch("services.history_service.bump_version") as mock_bump,
+        ):
+            mock_db_session.execute.return_value = stored
+            written = record_snapshot("fiis", [same, moved], date(2026, 10, 1))
+
+        assert written == 1
+        [record] = mock_upsert.call_args.args[1]
+        assert record["ticker"] == "HGLG11" and record["price"] == 160.0
+        mock_bump.assert_called_once_with("fii_history")
+        query = str(mock_db_session.execute.call_args.args[0])
+        assert "fii_snapshots.snapshot_date =" in query
+
+    def test_record_snapshot_unchanged_keeps_version(self, app):
+        """Test that a run with nothing new writes nothing and keeps the ETag"""
+        metrics = snapshot_metrics(FiiSnapshot)
+        row = {"ticker": "KNRI11", "price": 150.0}
+        with (
+            patch("services.history_service.db.session") as mock_db_session,
+            patch("services.history_service.upsert_rows") as mock_upsert,
+            patch("services.history_service.bump_version") as mock_bump,
+        ):
+            mock_db_session.execute.return_value = [
+                ("KNRI11",) + tuple(row.get(m) for m in metrics)
+            ]
+            assert record_snapshot("fiis", [row], date(2026, 10, 1)) == 0
+
+        mock_upsert.assert_not_called()
+        mock_bump.assert_not_called()
+
+    def test_record_snapshot_without_rows(self, app):
+        """Test that an empty pull writes nothing and keeps the version"""
+        with (
+            patch("services.history_service.upsert_rows") as mock_upsert,
+            patch("services.history_service.bump_version") as mock_bump,
+        ):
+            assert record_snapshot("fiis", []) == 0
+
+        mock_upsert.assert_not_called()
+        mock_bump.assert_not_called()
+
+
+class TestGetHistory:
+
+    def test_get_history_reads_requested_columns_and_range(self, app):
+        """Test that only the asked fields and dates are queried"""
+        rows = [(date(2026, 9, 1), 6.5, 0.08), (date(2026, 10, 1), 7.0, 0.07)]
+        with patch("services.history_service.db.session") as mock_db_session:
+            mock_db_session.execute.return_value = rows
+
+            response, status = get_history(
+                "stocks", "PETR4", "2026-09-01", "2026-10-31", "p_l,dy,bogus"
+            )
+
+        assert status == 200
+        assert response.get_json()["data"] == [
+            {"date": "2026-09-01", "p_l": 6.5, "dy": 0.08},
+            {"date": "2026-10-01", "p_l": 7.0, "dy": 0.07},
+        ]
+        query = mock_db_session.execute.call_args.args[0]
+        assert [c.name for c in query.selected_columns] == [
+            "snapshot_date",
+            "p_l",
+            "dy",
+        ]
+        sql = str(query)
+        assert "snapshot_date >=" in sql and "snapshot_date <=" in sql
+
+    def test_get_history_invalid_date(self, app):
+        """Test that a malformed date returns 400"""
+        response, status = get_history("fiis", "KNRI11", "01/10/2026")
+
+        assert status == 400
+        assert response.get_json()["message"] == "Invalid date"
+
+    def test_get_history_inverted_range(self, app):
+        """Test that from after to returns 400"""
+        response, status = get_history("stocks", "PETR4", "2026-10-02", "2026-10-01")
+
+        assert status == 400
@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from services.ingestion_http import (
+    DEFAULT_POLICY,
+    IngestionClient,
+    backoff_delay,
+    retry_policy,
+)
+
+
+def response(status, headers=None):
+    mock_response = MagicMock()
+    mock_response.status_code = status
+    mock_response.headers = headers or {}
+    return mock_response
+
+
+class TestIngestionClient:
+
+    @patch("services.ingestion_http.time.sleep")
+    @patch("services.ingestion_http.requests.Session.get")
+    def test_get_retries_transient_status(self, mock_get, mock_sleep):
+        """Test that a 503 is retried and the successful response returned"""
+        mock_get.side_effect = [response(503), response(200)]
+        client = IngestionClient()
+
+        result = client.get("http://x", "src", policy=DEFAULT_POLICY, timeout=7)
+
+        assert result.status_code == 200
+        assert mock_get.call_args.kwargs["timeout"] == (5.0, 7)
+        assert mock_sleep.call_count == 1
+        stats = client.stats()["src"]
+        assert (stats["calls"], stats["errors"], stats["retries"]) == (2, 1, 1)
+
+    @patch("services.ingestion_http.time.sleep")
+    @patch("services.ingestion_http.requests.Session.get")
+    def test_get_does_not_retry_client_errors(self, mock_get, mock_sleep):
+        """Test that a 404 comes back on the first attempt"""
+        mock_get.return_value = response(404)
+
+        result = IngestionClient().get("http://x", "src", policy=DEFAULT_POLICY)
+
+        assert result.status_code == 404
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("services.ingestion_http.time.sleep")
+    @patch("services.ingestion_http.requests.Session.get")
+    def test_get_raises_after_last_network_error(self, mock_get, mock_sleep):
+        """Test that network errors are retried and the last one propagates"""
+        mock_get.side_effect = requests.ConnectionError("reset")
+        client = IngestionClient()
+
+        with pytest.raises(requests.ConnectionError):
+            client.get("http://x", "src", policy=DEFAULT_POLICY._replace(retries=2))
+
+        assert mock_get.call_count == 3
+        assert client.stats()["src"]["errors"] == 3
+
+    def test_session_is_shared(self):
+        """Test that every call reuses one pooled session"""
+        client = IngestionClient()
+        session = client.session(DEFAULT_POLICY)
+
+        assert client.session(DEFAULT_POLICY) is session
+        assert session.get_adapter("https://x")._pool_maxsize == 10
+
+
+class TestBackoff:
+
+    def test_backoff_delay_grows_and_is_capped(self):
+        """Test exponential growth with full jitter under backoff_max"""
+        with patch("services.ingestion_http.random.uniform", lambda a, b: b):
+            delays = [backoff_delay(n, DEFAULT_POLICY) for n in range(6)]
+
+        assert delays == [0.5, 1.0, 2.0, 4.0, 8.0, 8.0]
+
+    def test_backoff_delay_honors_retry_after(self):
+        """Test that a numeric Retry-After is used up to the cap"""
+        with patch("services.ingestion_http.random.uniform", lambda a, b: 0.0):
+            assert (
+                backoff_delay(0, DEFAULT_POLICY, response(429, {"Retry-After": "3"}))
+                == 3.0
+            )
+            assert (
+                backoff_delay(0, DEFAULT_POLICY, response(429, {"Retry-After": "60"}))
+                == 8.0
+            )
+
+    def test_retry_policy_reads_config(self, app):
+        """Test that the policy comes from the app configuration"""
+        app.config["INGESTION_HTTP_RETRIES"] = 1
+        app.config["INGESTION_HTTP_BACKOFF"] = 0.1
+
+        policy = retry_policy()
+
+        assert policy.retries == 1
+        assert policy.backoff == 0.1
+        assert policy.pool_size == DEFAULT_POLICY.pool_size
@@ -0,0 +1,224 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from models.user import User  # noqa: F401  (configura os mappers)
+from services.ingestion_lock import (
+    JobAlreadyRunning,
+    NamedLock,
+    _advisory_key,
+    acquire_ingestion_lock,
+)
+from services.job_runner import JobRunner, enqueue_job
+
+
+def sql_of(call):
+    return str(call.args[0])
+
+
+class TestAdvisoryLock:
+
+    def test_acquire_holds_connection_until_release(self, app):
+        """Test that the Postgres lock keeps its session open and unlocks"""
+        with patch("services.ingestion_lock.db") as mock_db:
+            mock_db.engine.dialect.name = "postgresql"
+            conn = mock_db.engine.connect.return_value
+            conn.execute.return_value.scalar.return_value = True
+
+            lock = NamedLock("stocks")
+            assert lock.acquire() is True
+            conn.close.assert_not_called()
+
+            lock.release()
+
+        first, second = conn.execute.call_args_list
+        assert "pg_try_advisory_lock" in sql_of(first)
+        assert first.args[1] == {"key": _advisory_key("stocks")}
+        assert "pg_advisory_unlock" in sql_of(second)
+        conn.close.assert_called_once()
+        assert lock.held is False
+
+    def test_busy_lock_closes_connection(self, app):
+        """Test that a refused try-lock gives the connection back"""
+        with patch("services.ingestion_lock.db") as mock_db:
+            mock_db.engine.dialect.name = "postgresql"
+            conn = mock_db.engine.connect.return_value
+            conn.execute.return_value.scalar.return_value = False
+
+            assert NamedLock("stocks").acquire() is False
+
+        conn.close.assert_called_once()
+
+    def test_failed_unlock_discards_connection(self, app):
+        """Test that a connection that may still hold the lock is not pooled"""
+        with patch("services.ingestion_lock.db") as mock_db:
+            mock_db.engine.dialect.name = "postgresql"
+            conn = mock_db.engine.connect.return_value
+            conn.execute.return_value.scalar.return_value = True
+            lock = NamedLock("fiis")
+            lock.acquire()
+            conn.execute.side_effect = Exception("connection lost")
+
+            lock.release()
+
+        conn.invalidate.assert_called_once()
+        conn.close.assert_called_once()
+
+    def test_keys_are_stable_and_distinct(self):
+        """Test that each lock name maps to its own signed bigint"""
+        assert _advisory_key("stocks") == _advisory_key("stocks")
+        assert _advisory_key("stocks") != _advisory_key("fiis")
+        assert -(2**63) <= _advisory_key("predictions") < 2**63
+
+
+class TestRowLock:
+
+    def test_acquire_inserts_row_and_release_deletes_it(self, app):
+        """Test the lock row used on SQLite"""
+        with patch("services.ingestion_lock.db") as mock_db:
+            mock_db.engine.dialect.name = "sqlite"
+            conn = mock_db.engine.begin.return_value.__enter__.return_value
+
+            lock = NamedLock("stocks")
+            assert lock.acquire() is True
+            lock.release()
+
+        stale, insert, delete = conn.execute.call_args_list
+        assert "DELETE FROM ingestion_locks" in sql_of(stale)
+        assert "acquired_at <" in sql_of(stale)
+        assert "INSERT INTO ingestion_locks" in sql_of(insert)
+        assert "acquired_at =" in sql_of(delete)
+
+    def test_existing_row_means_busy(self, app):
+        """Test that a primary key conflict refuses the lock"""
+        with patch("services.ingestion_lock.db") as mock_db:
+            mock_db.engine.dialect.name = "sqlite"
+            conn = mock_db.engine.begin.return_value.__enter__.return_value
+            conn.execute.side_effect = [None, IntegrityError("insert", {}, None)]
+
+            lock = NamedLock("stocks")
+            assert lock.acquire() is False
+            lock.release()
+
+        assert conn.execute.call_count == 2
+
+    def test_acquire_ingestion_lock_reports_running_job(self, app):
+        """Test that the busy error carries the job holding the lock"""
+        with (
+            patch("services.ingestion_lock.NamedLock") as mock_lock,
+            patch("services.ingestion_lock.db.session") as mock_db_session,
+        ):
+            mock_lock.return_value.acquire.return_value = False
+            mock_db_session.scalar.return_value = 31
+
+            with pytest.raises(JobAlreadyRunning) as error:
+                acquire_ingestion_lock("stocks", 32)
+
+        assert error.value.job_id == 31
+        assert str(error.value) == "Update already running, job id 31"
+        assert "ingestion_jobs.id !=" in str(mock_db_session.scalar.call_args.args[0])
+
+    def test_unknown_holder_message(self):
+        """Test that the message leaves out an unknown job id"""
+        assert str(JobAlreadyRunning("stocks")) == "Update already running"
+
+
+class TestJobRunnerLock:
+
+    def test_submit_commits_job_before_taking_lock(self, app):
+        """Test that the lock is asked for the already stored job"""
+        runner = JobRunner()
+        runner._executor = MagicMock()
+        calls = MagicMock()
+        with (
+            patch("services.job_runner.acquire_ingestion_lock") as mock_acquire,
+            patch("services.job_runner.db.session") as mock_db_session,
+        ):
+            calls.attach_mock(mock_db_session.commit, "commit")
+            calls.attach_mock(mock_acquire, "acquire")
+            mock_db_session.add.side_effect = lambda job: setattr(job, "id", 7)
+
+            job = runner.submit("stocks", MagicMock())
+
+        assert [name for name, _, _ in calls.mock_calls] == ["commit", "acquire"]
+        mock_acquire.assert_called_once_with("stocks", 7)
+        assert runner._executor.submit.call_args.args[2] == job.id == 7
+
+    def test_submit_busy_marks_job_failed(self, app):
+        """Test that the job that lost the lock is closed as failed"""
+        with (
+            patch(
+                "services.job_runner.acquire_ingestion_lock",
+                side_effect=JobAlreadyRunning("stocks", 31),
+            ),
+            patch("services.job_runner.db.session") as mock_db_session,
+            patch("services.job_runner._update_job") as mock_update,
+        ):
+            mock_db_session.add.side_effect = lambda job: setattr(job, "id", 32)
+            with pytest.raises(JobAlreadyRunning):
+                JobRunner().submit("stocks", MagicMock())
+
+        job_id = mock_update.call_args.args[0]
+        values = mock_update.call_args.kwargs
+        assert job_id == 32
+        assert values["status"] == "failed"
+        assert values["error"] == "Update already running, job id 31"
+
+    def test_submit_releases_lock_when_job_cannot_start(self, app):
+        """Test that a failed hand-off does not leave the lock taken"""
+        lock = MagicMock()
+        runner = JobRunner()
+        runner._executor = MagicMock()
+        runner._executor.submit.side_effect = RuntimeError("shut down")
+        with (
+            patch("services.job_runner.acquire_ingestion_lock", return_value=lock),
+            patch("services.job_runner.db.session"),
+            patch("services.job_runner._update_job") as mock_update,
+        ):
+            with pytest.raises(RuntimeError):
+                runner.submit("stocks", MagicMock())
+
+        lock.release.assert_called_once()
+        assert mock_update.call_args.kwargs["status"] == "failed"
+
+    def test_run_releases_lock_after_failure(self, app):
+        """Test that the lock is released once the job has finished"""
+        lock = MagicMock()
+        with (
+            patch("services.job_runner._update_job"),
+            patch("services.job_runner.db.session"),
+        ):
+            JobRunner()._run(app, 5, MagicMock(side_effect=RuntimeError("boom")), lock)
+
+        lock.release.assert_called_once()
+
+    def test_enqueue_job_returns_409_when_running(self, app):
+        """Test the conflict answer pointing at the running job"""
+        with (
+            patch("services.job_runner.job_runner") as mock_runner,
+            patch("services.job_runner.db.session"),
+        ):
+            mock_runner.submit.side_effect = JobAlreadyRunning("stocks", 31)
+
+            response, status = enqueue_job("stocks", MagicMock(), "1")
+
+        assert status == 409
+        assert response.get_json() == {
+            "message": "Update already running, job id 31",
+            "job_id": 31,
+            "status_url": "/v1/jobs/31",
+        }
+
+    def test_enqueue_job_409_without_known_job(self, app):
+        """Test that an unknown holder gives no job id nor status URL"""
+        with (
+            patch("services.job_runner.job_runner") as mock_runner,
+            patch("services.job_runner.db.session"),
+        ):
+            mock_runner.submit.side_effect = JobAlreadyRunning("stocks")
+
+            response, status = enqueue_job("stocks", MagicMock(), "1")
+
+        assert status == 409
+        assert response.get_json() == {"message": "Update already running"}
@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock, patch
+
+from models.ingestion_job import IngestionJob
+from services.job_runner import JobProgress, JobRunner, enqueue_job, get_job
+
+
+class TestJobProgress:
+
+    def test_progress_without_job_only_accumulates(self, app):
+        """Test that a synchronous run records timings without touching the db"""
+        with patch("services.job_runner._update_job") as mock_update:
+            progress = JobProgress()
+            progress.phase("fetch")
+            progress.phase("write")
+            progress.count(fetched=3, inserted=1)
+            progress.finish()
+
+        mock_update.assert_not_called()
+        assert set(progress.timings) == {"fetch", "write", "total"}
+        assert progress.rows == {"fetched": 3, "inserted": 1}
+
+    def test_progress_saves_each_phase(self, app):
+        """Test that every phase change is written to the job row"""
+        with patch("services.job_runner._update_job") as mock_update:
+            progress = JobProgress(7)
+            progress.phase("fetch")
+            progress.count(fetched=2)
+            progress.finish(status="succeeded")
+
+        first, last = mock_update.call_args_list
+        assert first.args == (7,) and first.kwargs["phase"] == "fetch"
+        assert last.kwargs["status"] == "succeeded"
+        assert last.kwargs["rows"] == {"fetched": 2}
+        assert "fetch" in last.kwargs["timings"]
+
+
+class TestJobRunner:
+
+    def test_run_success(self, app):
+        """Test that a finished job is marked as succeeded"""
+        func = MagicMock()
+        with (
+            patch("services.job_runner._update_job") as mock_update,
+            patch("services.job_runner.db.session") as mock_db_session,
+        ):
+            JobRunner()._run(app, 5, func)
+
+        assert isinstance(func.call_args.args[0], JobProgress)
+        assert mock_update.call_args_list[0].kwargs["status"] == "running"
+        final = mock_update.call_args_list[-1].kwargs
+        assert final["status"] == "succeeded" and final["phase"] == "done"
+        mock_db_session.remove.assert_called_once()
+
+    def test_run_failure(self, app):
+        """Test that an exception marks the job as failed with the error"""
+        func = MagicMock(side_effect=RuntimeError("boom"))
+        with (
+            patch("services.job_runner._update_job") as mock_update,
+            patch("services.job_runner.db.session") as mock_db_session,
+        ):
+            JobRunner()._run(app, 5, func)
+
+        final = mock_update.call_args_list[-1].kwargs
+        assert final["status"] == "failed" and final["error"] == "boom"
+        mock_db_session.rollback.assert_called_once()
+        mock_db_session.remove.assert_called_once()
+
+    def test_enqueue_job_returns_202(self, app):
+        """Test that enqueueing answers 202 with the polling URL"""
+        with patch("services.job_runner.job_runner") as mock_runner:
+            mock_runner.submit.return_value = IngestionJob(id=12)
+
+            response, status, headers = enqueue_job("stocks", MagicMock(), "1")
+
+        assert status == 202
+        assert response.get_json()["job_id"] == 12
+        assert headers["Location"] == "/v1/jobs/12"
+
+
+class TestGetJob:
+
+    def test_get_job_not_found(self, app):
+        """Test that an unknown job returns 404"""
+        with patch("services.job_runner.db.session") as mock_db_session:
+            mock_db_session.get.return_value = None
+
+            response, status = get_job(99)
+
+        assert status == 404
+        assert response.get_json()["message"] == "Job not found"
+
+    def test_get_job_success(self, app):
+        """Test that an existing job is serialized"""
+        job = IngestionJob(id=3, kind="fiis", status="running", phase="write")
+        with patch("services.job_runner.db.session") as mock_db_session:
+            mock_db_session.get.return_value = job
+
+            response, status = get_job(3)
+
+        assert status == 200
+        data = response.get_json()
+        assert data["status"] == "running" and data["rows"] == {}
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from json_provider import FastJSONProvider, orjson
+
+PAYLOAD = {
+    "data": [
+        {
+            "ticker": "PETR4",
+            "price": 30.5,
+            "dy": float("nan"),
+            "p_l": float("inf"),
+            "ceiling": Decimal("12.50"),
+            "run_date": datetime(2026, 10, 1, 12, 30),
+            "companyname": "Petróleo Brasileiro",
+        }
+    ],
+    1: "chave inteira",
+}
+
+EXPECTED = {
+    "data": [
+        {
+            "ticker": "PETR4",
+            "price": 30.5,
+            "dy": None,
+            "p_l": None,
+            "ceiling": 12.5,
+            "run_date": "2026-10-01T12:30:00",
+            "companyname": "Petróleo Brasileiro",
+        }
+    ],
+    "1": "chave inteira",
+}
+
+MODES = [False] + ([True] if orjson is not None else [])
+
+
+def make_provider(app, use_orjson):
+    provider = FastJSONProvider(app)
+    provider.use_orjson = use_orjson
+    return provider
+
+
+class TestFastJSONProvider:
+
+    @pytest.mark.parametrize("use_orjson", MODES)
+    def test_dumps_bytes_normalizes_values(self, app, use_orjson):
+        """Test NaN/Infinity, Decimal, datetimes and keys in both encoders"""
+        encoded = make_provider(app, use_orjson).dumps_bytes(PAYLOAD)
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == EXPECTED
+        assert b"NaN" not in encoded
+
+    @pytest.mark.parametrize("use_orjson", MODES)
+    def test_response_is_json_from_bytes(self, app, use_orjson):
+        """Test jsonify-style responses built by the provider"""
+        with app.test_request_context():
+            response = make_provider(app, use_orjson).response({"ok": True})
+
+        assert response.mimetype == "application/json"
+        assert response.get_json() == {"ok": True}
+
+    def test_both_encoders_emit_the_same_document(self, app):
+        """Test that the fallback keeps key order and compact separators"""
+        if orjson is None:
+            pytest.skip("orjson not installed")
+        fast = make_provider(app, True).dumps_bytes(PAYLOAD)
+        fallback = make_provider(app, False).dumps_bytes(PAYLOAD)
+
+        assert fast == fallback
+
+    def test_unknown_type_raises(self, app):
+        """Test that unsupported objects are rejected"""
+        with pytest.raises(TypeError):
+            make_provider(app, False).dumps_bytes({"x": object()})
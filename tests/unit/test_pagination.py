@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from services.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    filters_fingerprint,
+    keyset_paginate,
+)
+from services.fii_services import list_fiis
+from models.stock import Stock
+
+
+class TestPagination:
+
+    def test_cursor_round_trip(self):
+        """Test that an encoded cursor decodes to the same payload"""
+        payload = {"s": "dy", "d": "desc", "f": "abc", "v": 0.12, "k": "PETR4"}
+
+        assert decode_cursor(encode_cursor(payload)) == payload
+
+    def test_decode_cursor_rejects_garbage(self):
+        """Test decoding an invalid cursor"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor!!")
+
+    def test_filters_fingerprint_ignores_key_order(self):
+        """Test that the fingerprint is stable across dict key order"""
+        a = [{"id": "dy", "value": [1, 2]}]
+        b = [{"value": [1, 2], "id": "dy"}]
+
+        assert filters_fingerprint(a) == filters_fingerprint(b)
+        assert filters_fingerprint(a) != filters_fingerprint(None)
+
+    def test_keyset_paginate_returns_next_cursor(self):
+        """Test that a full page yields a cursor built from the last row"""
+        stocks = [
+            Stock(ticker=t, dy=d) for t, d in (("A", 1.0), ("B", 2.0), ("C", 3.0))
+        ]
+        query = MagicMock()
+        ordered = query.order_by.return_value.order_by.return_value
+        ordered.limit.return_value.all.return_value = stocks
+        query.order_by.return_value.count.return_value = 10
+
+        items, pagination = keyset_paginate(
+            query, Stock, "ticker", "dy", "asc", None, "", 2, with_total=True
+        )
+
+        assert [s.ticker for s in items] == ["A", "B"]
+        assert pagination["total"] == 10
+        assert pagination["pages"] == 5
+        state = decode_cursor(pagination["next_cursor"])
+        assert state["k"] == "B"
+        assert state["v"] == 2.0
+        assert state["n"] == 10
+
+    def test_keyset_paginate_reuses_total_from_cursor(self):
+        """Test that following pages do not count again"""
+        cursor = encode_cursor(
+            {"s": None, "d": "asc", "f": filters_fingerprint(None), "k": "B", "n": 7}
+        )
+        query = MagicMock()
+        seek = query.filter.return_value
+        ordered = seek.order_by.return_value.order_by.return_value
+        ordered.limit.return_value.all.return_value = []
+
+        items, pagination = keyset_paginate(
+            query, Stock, "ticker", None, "asc", None, cursor, 2, with_total=True
+        )
+
+        assert items == []
+        assert pagination["total"] == 7
+        assert pagination["next_cursor"] is None
+        query.order_by.return_value.count.assert_not_called()
+
+    def test_keyset_paginate_rejects_cursor_from_other_sort(self):
+        """Test that a cursor cannot be replayed with a different sort"""
+        cursor = encode_cursor(
+            {"s": "dy", "d": "asc", "f": filters_fingerprint(None), "k": "B"}
+        )
+
+        with pytest.raises(InvalidCursorError):
+            keyset_paginate(MagicMock(), Stock, "ticker", "p_l", "asc", None, cursor, 2)
+
+    def test_list_fiis_invalid_cursor(self, app):
+        """Test that list_fiis answers 400 for a malformed cursor"""
+        with app.app_context():
+            with (
+                patch("services.fii_services.Fii.query"),
+                patch("services.fii_services.FavoriteFii.query") as mock_favorite_query,
+            ):
+                mock_favorite_query.filter_by.return_value.all.return_value = []
+
+                result, status_code = list_fiis(1, cursor="%%%")
+
+                assert status_code == 400
+                assert result.get_json()["message"] == "Invalid cursor"
@@ -0,0 +1,153 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+
+from models.fii import Fii
+from models.stock import Stock
+from models.user import User  # noqa: F401 - relação de Favorite
+from services.percentile_service import (
+    FII_PERCENTILE_METRICS,
+    STOCK_PERCENTILE_METRICS,
+    percentile_filter,
+    refresh_percentiles,
+)
+from services.ranking import descending_ranks, percentile_ranks, split_percentile_id
+from services.screener_engine import ScreenerEngine
+from services.stock_services import STOCK_ALLOWED_COLS
+from services.fii_services import FII_ALLOWED_COLS
+
+
+class TestRanking:
+
+    def test_descending_ranks_matches_sorted(self):
+        """Test that ranks match sorted(reverse=True), ties in input order"""
+        values = [0.1, 0.3, 0.2, 0.3, -1.0]
+        expected = {
+            i: rank + 1
+            for rank, i in enumerate(
+                sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+            )
+        }
+
+        assert descending_ranks(values).tolist() == [
+            expected[i] for i in range(len(values))
+        ]
+
+    def test_descending_ranks_puts_missing_last(self):
+        """Test that None values get the worst ranks"""
+        assert descending_ranks([None, 1.0, 2.0]).tolist() == [3, 2, 1]
+
+    def test_percentile_ranks_average_ties(self):
+        """Test percentile of each value with averaged ties and NaN passthrough"""
+        result = percentile_ranks([10.0, 20.0, 20.0, None, 40.0])
+
+        assert result[[0, 1, 2, 4]].tolist() == [25.0, 62.5, 62.5, 100.0]
+        assert np.isnan(result[3])
+
+    def test_percentile_ranks_within_groups(self):
+        """Test that each group is ranked on its own"""
+        result = percentile_ranks([1.0, 5.0, 3.0, 9.0], ["A", "B", "A", None])
+
+        assert result[:3].tolist() == [50.0, 100.0, 100.0]
+        assert np.isnan(result[3])
+
+    def test_split_percentile_id(self):
+        """Test parsing of percentile filter ids"""
+        assert split_percentile_id("p_l__pct") == ("p_l", "pct")
+        assert split_percentile_id("dy__sector_pct") == ("dy", "sector_pct")
+        assert split_percentile_id("p_l") is None
+        assert split_percentile_id("__pct") is None
+
+
+class TestPercentileService:
+
+    def test_metrics_cover_numeric_allowed_columns(self):
+        """Test that every numeric screener column gets percentiles"""
+        stock_numeric = ScreenerEngine(Stock, STOCK_ALLOWED_COLS).numeric_cols
+        fii_numeric = ScreenerEngine(Fii, FII_ALLOWED_COLS).numeric_cols
+
+        assert set(STOCK_PERCENTILE_METRICS) == stock_numeric
+        assert set(FII_PERCENTILE_METRICS) == fii_numeric
+
+    def test_refresh_percentiles_writes_every_metric(self, app):
+        """Test that one row per ticker and metric is written, not committed"""
+        rows = [
+            ("A11", "Papel", 10.0) + (None,) * 11,
+            ("B11", "Papel", 20.0) + (None,) * 11,
+            ("C11", None, 30.0) + (None,) * 11,
+        ]
+        with (
+            patch("services.percentile_service.db.session") as mock_db_session,
+            patch("services.percentile_service.upsert_rows") as mock_upsert,
+        ):
+            mock_db_session.execute.return_value.all.return_value = rows
+            mock_db_session.execute.return_value.__iter__.return_value = []
+
+            written = refresh_percentiles("fiis")
+
+            assert written == 3 * len(FII_PERCENTILE_METRICS)
+            inserted = mock_upsert.call_args.args[1]
+            price = {r["ticker"]: r for r in inserted if r["metric"] == "price"}
+            assert price["A11"]["pct"] == pytest.approx(100 / 3)
+            assert price["B11"]["sector_pct"] == 100.0
+            assert price["C11"]["sector_pct"] is None
+            assert all(r["pct"] is None for r in inserted if r["metric"] == "dy")
+            mock_db_session.commit.assert_not_called()
+
+    def test_refresh_percentiles_writes_only_changes(self, app):
+        """Test that unchanged percentiles are skipped and gone tickers deleted"""
+        rows = [
+            ("A11", "Papel", 10.0) + (None,) * 11,
+            ("B11", "Papel", 20.0) + (None,) * 11,
+        ]
+        stored = [
+            (ticker, metric, None, None)
+            for ticker in ("A11", "B11")
+            for metric in FII_PERCENTILE_METRICS
+        ]
+        stored += [("A11", "price", 50.0, 50.0), ("Z11", "price", 100.0, 100.0)]
+        stored.remove(("A11", "price", None, None))
+        stored.remove(("B11", "price", None, None))
+        with (
+            patch("services.percentile_service.db.session") as mock_db_session,
+            patch("services.percentile_service.upsert_rows") as mock_upsert,
+        ):
+            mock_db_session.execute.return_value.all.return_value = rows
+            mock_db_session.execute.return_value.__iter__.return_value = stored
+
+            written = refresh_percentiles("fiis")
+
+        # Só o price de B11 mudou (A11 continua 50/50) e Z11 saiu.
+        [record] = mock_upsert.call_args.args[1]
+        assert (record["ticker"], record["metric"], record["pct"]) == (
+            "B11",
+            "price",
+            100.0,
+        )
+        delete_sql = str(mock_db_session.execute.call_args_list[-1].args[0])
+        assert delete_sql.startswith("DELETE FROM asset_percentiles")
+        assert written == 1
+
+    def test_percentile_filter_builds_range_subquery(self):
+        """Test that a percentile filter becomes ticker IN (range on the index)"""
+        clause = percentile_filter(Stock, "p_l__sector_pct", [0, 20])
+        sql = str(
+            select(Stock.ticker)
+            .where(clause)
+            .compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+        )
+
+        assert "stocks.ticker IN (SELECT asset_percentiles.ticker" in sql
+        assert "asset_percentiles.metric = 'p_l'" in sql
+        assert "asset_percentiles.sector_pct >= 0.0" in sql
+        assert "asset_percentiles.sector_pct <= 20.0" in sql
+
+    def test_percentile_filter_ignores_other_ids(self):
+        """Test that plain columns and unknown metrics are not handled"""
+        assert percentile_filter(Stock, "p_l", [0, 20]) is None
+        assert percentile_filter(Stock, "password__pct", [0, 20]) is None
+        assert percentile_filter(Fii, "p_l__pct", [0, 20]) is None
+        assert percentile_filter(Stock, "p_l__pct", "20") is None
@@ -0,0 +1,207 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from services.prediction_service import (
+    CachedPrediction,
+    PredictionCache,
+    attach_ml_fields,
+    get_latest_predictions_map,
+    get_prediction_by_ticker,
+    get_predictions_for_tickers,
+    init_prediction_triggers,
+)
+from services.prediction_triggers import ensure_prediction_triggers, trigger_statements
+from models.latest_stock_prediction import LatestStockPrediction
+
+
+def make_prediction(ticker="PETR4"):
+    return LatestStockPrediction(
+        ticker=ticker,
+        prediction_id=10,
+        run_date=datetime(2026, 10, 1),
+        label="barata",
+        prob_barata=0.7,
+        prob_neutra=0.2,
+        prob_cara=0.1,
+        composite_score=81.26,
+        model_version="v3",
+    )
+
+
+class TestPredictionService:
+
+    def test_attach_ml_fields_with_prediction(self):
+        """Test ML fields are copied from the prediction"""
+        result = attach_ml_fields({"ticker": "PETR4"}, make_prediction())
+
+        assert result["ml_label"] == "barata"
+        assert result["ml_score"] == 81.3
+        assert result["ml_prob_barata"] == 0.7
+
+    def test_attach_ml_fields_without_prediction(self):
+        """Test ML fields are None when there is no prediction"""
+        result = attach_ml_fields({"ticker": "PETR4"}, None)
+
+        assert result["ml_label"] is None
+        assert result["ml_score"] is None
+
+    def test_cache_loads_once_and_counts_hits(self, app):
+        """Test the map is loaded on first use and then served from memory"""
+        with app.app_context():
+            cache = PredictionCache()
+            with (
+                patch("services.prediction_service.prediction_cache", cache),
+                patch("services.prediction_service.get_version", return_value=3),
+                patch("services.prediction_service.db.session") as mock_db_session,
+            ):
+                mock_db_session.query.return_value.all.return_value = [
+                    make_prediction("PETR4"),
+                    make_prediction("VALE3"),
+                ]
+
+                first = get_latest_predictions_map()
+                second = get_latest_predictions_map()
+
+                assert set(first) == {"PETR4", "VALE3"}
+                assert second is first
+                assert isinstance(first["PETR4"], CachedPrediction)
+                assert not hasattr(first["PETR4"], "__dict__")
+                assert cache.misses == 1
+                assert cache.hits == 1
+
+    def test_cache_reloads_only_when_version_changes(self, app):
+        """Test that the map is reused while the dataset version holds"""
+        with app.app_context():
+            cache = PredictionCache()
+            with (
+                patch("services.prediction_service.prediction_cache", cache),
+                patch("services.prediction_service.get_version") as version,
+                patch("services.prediction_service.db.session") as mock_db_session,
+            ):
+                version.return_value = 3
+                mock_db_session.query.return_value.all.return_value = [
+                    make_prediction("PETR4")
+                ]
+
+                get_latest_predictions_map()
+                get_latest_predictions_map()
+                assert cache.misses == 1
+                assert cache.hits == 1
+
+                version.return_value = 4
+                get_latest_predictions_map()
+                assert cache.misses == 2
+                assert cache.stats()["version"] == 4
+
+    def test_get_predictions_for_tickers_empty_page(self, app):
+        """Test that an empty page does not touch the cache"""
+        with app.app_context():
+            with patch("services.prediction_service.prediction_cache") as cache:
+                assert get_predictions_for_tickers([]) == {}
+                cache.get_map.assert_not_called()
+
+    def test_get_predictions_for_tickers(self, app):
+        """Test lookup scoped to the requested tickers"""
+        with app.app_context():
+            with patch("services.prediction_service.prediction_cache") as cache:
+                cache.get_map.return_value = {
+                    "VALE3": make_prediction("VALE3"),
+                    "PETR4": make_prediction("PETR4"),
+                }
+
+                result = get_predictions_for_tickers(["VALE3", "ITUB4"])
+
+                assert list(result) == ["VALE3"]
+
+    def test_get_prediction_by_ticker_success(self, app):
+        """Test lookup of a single ticker"""
+        with app.app_context():
+            with patch("services.prediction_service.prediction_cache") as cache:
+                cache.get_map.return_value = {"PETR4": make_prediction()}
+
+                result, status_code = get_prediction_by_ticker("PETR4")
+
+                assert status_code == 200
+                assert result.get_json()["run_date"] == "2026-10-01T00:00:00"
+
+    def test_get_prediction_by_ticker_not_found(self, app):
+        """Test lookup of a ticker without predictions"""
+        with app.app_context():
+            with patch("services.prediction_service.prediction_cache") as cache:
+                cache.get_map.return_value = {}
+
+                result, status_code = get_prediction_by_ticker("XXXX3")
+
+                assert status_code == 404
+                assert result.get_json()["message"] == "Prediction not found"
+
+
+class TestPredictionTriggers:
+
+    def mock_engine(self, mock_db, dialect, has_table, has_trigger):
+        conn = mock_db.engine.begin.return_value.__enter__.return_value
+        conn.dialect.name = dialect
+        conn.execute.return_value.first.return_value = (1,) if has_trigger else None
+        inspector = MagicMock()
+        inspector.has_table.return_value = has_table
+        return conn, inspector
+
+    def test_ensure_without_table(self, app):
+        """Test that nothing is installed before the pipeline creates the table"""
+        with patch("services.prediction_triggers.db") as mock_db:
+            conn, inspector = self.mock_engine(mock_db, "sqlite", False, False)
+            with patch("services.prediction_triggers.inspect", return_value=inspector):
+                assert ensure_prediction_triggers() is False
+
+        conn.exec_driver_sql.assert_not_called()
+
+    def test_ensure_keeps_existing_trigger(self, app):
+        """Test that an installed trigger is left alone"""
+        with patch("services.prediction_triggers.db") as mock_db:
+            conn, inspector = self.mock_engine(mock_db, "postgresql", True, True)
+            with patch("services.prediction_triggers.inspect", return_value=inspector):
+                assert ensure_prediction_triggers() is False
+
+        assert "pg_trigger" in str(conn.execute.call_args.args[0])
+        conn.exec_driver_sql.assert_not_called()
+
+    def test_ensure_installs_missing_trigger(self, app):
+        """Test that a recreated stock_predictions gets its trigger back"""
+        with patch("services.prediction_triggers.db") as mock_db:
+            conn, inspector = self.mock_engine(mock_db, "sqlite", True, False)
+            with patch("services.prediction_triggers.inspect", return_value=inspector):
+                assert ensure_prediction_triggers() is True
+
+        ddl = [call.args[0] for call in conn.exec_driver_sql.call_args_list]
+        assert ddl[-1].startswith("CREATE TRIGGER trg_latest_stock_prediction")
+        assert "INSERT INTO latest_stock_predictions" in ddl[-1]
+
+    def test_postgres_bumps_version_once_per_statement(self):
+        """Test that bulk loads do not update the version row per prediction"""
+        row_function, bump_function, *triggers = trigger_statements("postgresql")
+
+        assert "dataset_versions" not in row_function
+        assert "dataset_versions" in bump_function
+        assert "FOR EACH ROW" in triggers[1]
+        assert "FOR EACH STATEMENT EXECUTE FUNCTION bump_predictions_version" in (
+            triggers[3]
+        )
+
+    def test_sqlite_keeps_row_level_bump(self):
+        """Test that SQLite, without statement triggers, bumps per row"""
+        *_, trigger = trigger_statements("sqlite")
+
+        assert "FOR EACH ROW" in trigger and "dataset_versions" in trigger
+
+    def test_init_rebuilds_latest_after_installing(self, app):
+        """Test that startup rebuilds the latest table with a new trigger"""
+        with (
+            patch(
+                "services.prediction_service.ensure_prediction_triggers",
+                return_value=True,
+            ),
+            patch("services.prediction_service.refresh_latest_predictions") as refresh,
+            patch("services.prediction_service.db.session"),
+        ):
+            init_prediction_triggers(app)
+
+        refresh.assert_called_once()
@@ -0,0 +1,289 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from models.user import User  # noqa: F401  (configura os mappers)
+from services.ingestion_lock import JobAlreadyRunning
+from services.scheduler import (
+    CronSchedule,
+    Schedule,
+    Scheduler,
+    _ran_since,
+    get_scheduler_status,
+)
+
+SP = ZoneInfo("America/Sao_Paulo")
+
+
+def at(*args):
+    return datetime(*args, tzinfo=SP)
+
+
+def make_scheduler(jitter=0, **schedules):
+    scheduler = Scheduler()
+    config = {
+        "SCHEDULER_TIMEZONE": "America/Sao_Paulo",
+        "SCHEDULER_JITTER_SECONDS": jitter,
+        "SCHEDULE_STOCKS": "",
+        "SCHEDULE_FIIS": "",
+        "SCHEDULE_PREDICTIONS": "",
+    }
+    config.update(schedules)
+    scheduler.configure(config)
+    return scheduler
+
+
+class TestCronSchedule:
+
+    def test_parses_lists_ranges_and_steps(self):
+        """Test the supported field syntax"""
+        cron = CronSchedule("*/15 10-17 1,15 * 1-5")
+
+        assert cron.minutes == {0, 15, 30, 45}
+        assert cron.hours == set(range(10, 18))
+        assert cron.days == {1, 15}
+        assert cron.weekdays == {1, 2, 3, 4, 5}
+
+    def test_sunday_as_seven(self):
+        """Test that 7 is accepted as Sunday"""
+        assert CronSchedule("0 0 * * 7").weekdays == {0}
+
+    @pytest.mark.parametrize(
+        "expr", ["* * * *", "60 * * * *", "* 10-8 * * *", "*/0 * * * *", "a * * * *"]
+    )
+    def test_invalid_expressions(self, expr):
+        """Test that malformed expressions are rejected"""
+        with pytest.raises(ValueError):
+            CronSchedule(expr)
+
+    def test_next_run_inside_trading_hours(self):
+        """Test the next quarter hour during the session"""
+        cron = CronSchedule("*/15 10-17 * * 1-5")
+
+        assert cron.next_after(at(2026, 10, 14, 11, 7, 30)) == at(2026, 10, 14, 11, 15)
+        assert cron.next_after(at(2026, 10, 14, 11, 15)) == at(2026, 10, 14, 11, 30)
+
+    def test_next_run_after_close_and_on_weekend(self):
+        """Test that the session schedule skips to the next business day"""
+        cron = CronSchedule("*/15 10-17 * * 1-5")
+
+        # Quarta depois do fechamento -> quinta 10h.
+        assert cron.next_after(at(2026, 10, 14, 17, 50)) == at(2026, 10, 15, 10, 0)
+        # Sexta à noite -> segunda 10h.
+        assert cron.next_after(at(2026, 10, 16, 18, 0)) == at(2026, 10, 19, 10, 0)
+
+    def test_next_run_rolls_over_month_and_year(self):
+        """Test month and year boundaries"""
+        assert CronSchedule("0 0 1 * *").next_after(at(2026, 1, 31, 12, 0)) == at(
+            2026, 2, 1, 0, 0
+        )
+        assert CronSchedule("30 9 * 3 *").next_after(at(2026, 3, 31, 10, 0)) == at(
+            2027, 3, 1, 9, 30
+        )
+
+    def test_day_or_weekday(self):
+        """Test that restricting both day fields matches either one"""
+        cron = CronSchedule("0 12 1 * 1")
+
+        # 2026-10-01 é quinta; a segunda seguinte é 05.
+        assert cron.next_after(at(2026, 9, 30, 13, 0)) == at(2026, 10, 1, 12, 0)
+        assert cron.next_after(at(2026, 10, 1, 13, 0)) == at(2026, 10, 5, 12, 0)
+
+
+class TestSchedule:
+
+    def test_earliest_of_several_crons(self):
+        """Test that the session and evening crons are combined"""
+        schedule = Schedule("*/15 10-17 * * 1-5; 0 21 * * *")
+
+        assert schedule.next_after(at(2026, 10, 14, 18, 0)) == at(2026, 10, 14, 21, 0)
+        assert schedule.next_after(at(2026, 10, 17, 9, 0)) == at(2026, 10, 17, 21, 0)
+
+    def test_empty_schedule_disables_job(self):
+        """Test that an empty setting leaves the job out"""
+        scheduler = make_scheduler(SCHEDULE_STOCKS="0 21 * * *")
+
+        assert list(scheduler.jobs) == ["stocks"]
+
+
+class TestScheduler:
+
+    def test_tick_submits_due_jobs_and_replans(self, app):
+        """Test that a due job goes to the job runner once"""
+        scheduler = make_scheduler(SCHEDULE_STOCKS="*/15 10-17 * * 1-5")
+        job = scheduler.jobs["stocks"]
+        now = at(2026, 10, 14, 11, 0, 5)
+        job.next_run = at(2026, 10, 14, 11, 0)
+
+        with patch("services.scheduler.job_runner") as mock_runner:
+            mock_runner.submit.return_value = MagicMock(id=42)
+            wait = scheduler.tick(now)
+            scheduler.tick(now + timedelta(seconds=10))
+
+        mock_runner.submit.assert_called_once_with("stocks", job.func)
+        assert job.last_job_id == 42
+        assert job.next_run == at(2026, 10, 14, 11, 15)
+        assert wait == 60
+
+    def test_tick_sleeps_until_next_run(self, app):
+        """Test that the wait never passes the next run"""
+        scheduler = make_scheduler(SCHEDULE_FIIS="30 21 * * *")
+        scheduler.jobs["fiis"].next_run = at(2026, 10, 14, 21, 30)
+
+        with patch("services.scheduler.job_runner") as mock_runner:
+            wait = scheduler.tick(at(2026, 10, 14, 21, 29, 50))
+
+        mock_runner.submit.assert_not_called()
+        assert wait == 10
+
+    def test_tick_keeps_schedule_when_submit_fails(self, app):
+        """Test that a failed submit is logged and the job replanned"""
+        scheduler = make_scheduler(SCHEDULE_STOCKS="0 21 * * *")
+        job = scheduler.jobs["stocks"]
+        job.next_run = at(2026, 10, 14, 21, 0)
+
+        with (
+            patch("services.scheduler.job_runner") as mock_runner,
+            patch("services.scheduler.db.session") as mock_db_session,
+        ):
+            mock_runner.submit.side_effect = Exception("db down")
+            scheduler.tick(at(2026, 10, 14, 21, 0))
+
+        mock_db_session.rollback.assert_called_once()
+        assert job.next_run == at(2026, 10, 15, 21, 0)
+
+    def test_tick_skips_when_update_already_running(self, app):
+        """Test that a slot taken by another process is just skipped"""
+        scheduler = make_scheduler(SCHEDULE_STOCKS="0 21 * * *")
+        job = scheduler.jobs["stocks"]
+        job.next_run = at(2026, 10, 14, 21, 0)
+
+        with (
+            patch("services.scheduler.job_runner") as mock_runner,
+            patch("services.scheduler.db.session"),
+            patch("services.scheduler.logging") as mock_logging,
+        ):
+            mock_runner.submit.side_effect = JobAlreadyRunning("stocks", 8)
+            scheduler.tick(at(2026, 10, 14, 21, 0))
+
+        mock_logging.error.assert_not_called()
+        assert job.last_job_id is None
+        assert job.next_run == at(2026, 10, 15, 21, 0)
+
+    def test_slot_runs_once_across_processes(self, app):
+        """Test that a second process skips a slot the first already ran"""
+        workers = [
+            make_scheduler(jitter=90, SCHEDULE_STOCKS="0 21 * * *") for _ in range(2)
+        ]
+        created = []
+
+        def submit(kind, func):
+            created.append((kind, clock))
+            return MagicMock(id=len(created))
+
+        def ran_since(kind, moment):
+            return any(k == kind and when >= moment for k, when in created)
+
+        for worker, delay in zip(workers, (10, 60)):
+            job = worker.jobs["stocks"]
+            worker._plan(job, at(2026, 10, 14, 20, 0))
+            job.next_run = job.slot + timedelta(seconds=delay)
+
+        with (
+            patch("services.scheduler.job_runner") as mock_runner,
+            patch("services.scheduler._ran_since", side_effect=ran_since),
+        ):
+            mock_runner.submit.side_effect = submit
+            # O job do primeiro já terminou quando o jitter do segundo vence.
+            for clock in (at(2026, 10, 14, 21, 0, 10), at(2026, 10, 14, 21, 1)):
+                for worker in workers:
+                    worker.tick(clock)
+
+        assert created == [("stocks", at(2026, 10, 14, 21, 0, 10))]
+        assert workers[1].jobs["stocks"].last_job_id is None
+        assert workers[1].jobs["stocks"].slot == at(2026, 10, 15, 21, 0)
+
+    def test_ran_since_compares_in_utc(self, app):
+        """Test that the slot is compared with the naive UTC created_at"""
+        with patch("services.scheduler.db.session") as mock_db_session:
+            mock_db_session.scalar.return_value = None
+
+            assert _ran_since("stocks", at(2026, 10, 14, 21, 0)) is False
+
+        query = mock_db_session.scalar.call_args.args[0].compile()
+        assert "created_at >=" in str(query)
+        assert datetime(2026, 10, 15, 0, 0) in query.params.values()
+
+    def test_jitter_bounds(self, app):
+        """Test that the planned run is delayed by at most the jitter"""
+        scheduler = make_scheduler(jitter=90, SCHEDULE_STOCKS="0 21 * * *")
+        job = scheduler.jobs["stocks"]
+
+        for _ in range(50):
+            planned = scheduler._plan(job, at(2026, 10, 14, 12, 0))
+            delay = (planned - at(2026, 10, 14, 21, 0)).total_seconds()
+            assert 0 <= delay <= 90
+
+    def test_catch_up_runs_missed_jobs_now(self, app):
+        """Test that a job whose next run already passed starts at once"""
+        scheduler = make_scheduler(
+            SCHEDULE_STOCKS="0 21 * * *", SCHEDULE_FIIS="30 21 * * *"
+        )
+        now = at(2026, 10, 15, 9, 0)
+        # Ações rodaram ontem às 21h (horário de Brasília); FIIs, anteontem.
+        last_runs = {
+            "stocks": datetime(2026, 10, 15, 0, 0),
+            "fiis": datetime(2026, 10, 14, 0, 30),
+        }
+
+        with patch("services.scheduler.db.session") as mock_db_session:
+            mock_db_session.scalar.side_effect = [
+                last_runs["stocks"],
+                last_runs["fiis"],
+            ]
+            scheduler.catch_up(now)
+
+        assert scheduler.jobs["stocks"].next_run == at(2026, 10, 15, 21, 0)
+        assert scheduler.jobs["fiis"].next_run == now
+        assert scheduler.jobs["fiis"].slot == at(2026, 10, 14, 21, 30)
+        assert scheduler.jobs["stocks"].last_run == datetime(
+            2026, 10, 15, 0, 0, tzinfo=timezone.utc
+        )
+
+    def test_catch_up_without_history(self, app):
+        """Test that a job never run before starts at once"""
+        scheduler = make_scheduler(SCHEDULE_PREDICTIONS="0 22 * * 1-5")
+        now = at(2026, 10, 15, 9, 0)
+
+        with patch("services.scheduler.db.session") as mock_db_session:
+            mock_db_session.scalar.return_value = None
+            scheduler.catch_up(now)
+
+        assert scheduler.jobs["predictions"].next_run == now
+
+
+class TestSchedulerStatus:
+
+    def test_status_lists_jobs(self, app):
+        """Test the admin view of schedules and next runs"""
+        scheduler = make_scheduler(SCHEDULE_STOCKS="0 21 * * *")
+        scheduler.jobs["stocks"].next_run = at(2026, 10, 14, 21, 0)
+
+        with patch("services.scheduler.scheduler", scheduler):
+            response, status = get_scheduler_status()
+
+        data = response.get_json()
+        assert status == 200
+        assert data["enabled"] is False and data["running"] is False
+        assert data["timezone"] == "America/Sao_Paulo"
+        assert data["jobs"] == [
+            {
+                "kind": "stocks",
+                "schedule": "0 21 * * *",
+                "next_run": "2026-10-14T21:00:00-03:00",
+                "last_run": None,
+                "last_job_id": None,
+            }
+        ]
@@ -0,0 +1,150 @@
+from unittest.mock import patch, MagicMock
+from services.screener_engine import ScreenerSnapshot, ScreenerEngine
+from services.stock_services import STOCK_ALLOWED_COLS, list_stocks
+from models.stock import Stock
+
+NUMERIC_COLS = {"price", "dy"}
+ALLOWED_COLS = {"ticker", "sectorname", "price", "dy"}
+
+
+def make_snapshot():
+    rows = [
+        {"ticker": "VALE3", "sectorname": "Mineração", "price": 60.0, "dy": 0.09},
+        {"ticker": "PETR4", "sectorname": "Petróleo", "price": 25.0, "dy": 0.12},
+        {"ticker": "ITUB4", "sectorname": "Bancos", "price": 30.0, "dy": None},
+        {"ticker": "BBAS3", "sectorname": "Bancos", "price": 25.0, "dy": 0.1},
+        {"ticker": "MGLU3", "sectorname": None, "price": None, "dy": 0.0},
+    ]
+    return ScreenerSnapshot(rows, ALLOWED_COLS, NUMERIC_COLS)
+
+
+class TestScreenerSnapshot:
+
+    def test_select_without_sort_uses_ticker_order(self):
+        """Test that rows come back ordered by ticker when no sort is given"""
+        page = make_snapshot().select(1, 50)
+
+        assert [r["ticker"] for r in page.rows] == [
+            "BBAS3",
+            "ITUB4",
+            "MGLU3",
+            "PETR4",
+            "VALE3",
+        ]
+        assert page.total == 5
+        assert page.pages == 1
+
+    def test_select_sort_asc_puts_nulls_last_and_breaks_ties_by_ticker(self):
+        """Test ascending sort semantics"""
+        page = make_snapshot().select(1, 50, sort_by="price", sort_dir="asc")
+
+        assert [r["ticker"] for r in page.rows] == [
+            "BBAS3",
+            "PETR4",
+            "ITUB4",
+            "VALE3",
+            "MGLU3",
+        ]
+
+    def test_select_sort_desc_puts_nulls_first(self):
+        """Test descending sort mirrors PostgreSQL NULL placement"""
+        page = make_snapshot().select(1, 50, sort_by="dy", sort_dir="desc")
+
+        assert [r["ticker"] for r in page.rows] == [
+            "ITUB4",
+            "PETR4",
+            "BBAS3",
+            "VALE3",
+            "MGLU3",
+        ]
+
+    def test_select_range_filter_excludes_nulls(self):
+        """Test range filters behave like SQL comparisons"""
+        filters = [{"id": "price", "value": [25, ""]}]
+        page = make_snapshot().select(1, 50, filters=filters)
+
+        assert [r["ticker"] for r in page.rows] == ["BBAS3", "ITUB4", "PETR4", "VALE3"]
+
+    def test_select_text_filter_is_case_insensitive(self):
+        """Test ilike filter on text columns"""
+        filters = [{"id": "sectorname", "value": "banc"}]
+        page = make_snapshot().select(1, 50, filters=filters)
+
+        assert [r["ticker"] for r in page.rows] == ["BBAS3", "ITUB4"]
+
+    def test_select_ignores_unknown_columns(self):
+        """Test filters on columns outside the allow-list are ignored"""
+        filters = [{"id": "password", "value": "x"}]
+        page = make_snapshot().select(1, 50, filters=filters)
+
+        assert page.total == 5
+
+    def test_select_percentile_filters(self):
+        """Test "__pct" and "__sector_pct" range filters"""
+        snapshot = make_snapshot()
+
+        overall = snapshot.select(
+            1, 50, filters=[{"id": "price__pct", "value": [0, 50]}]
+        )
+        in_sector = snapshot.select(
+            1, 50, filters=[{"id": "price__sector_pct", "value": [100, ""]}]
+        )
+
+        assert [r["ticker"] for r in overall.rows] == ["BBAS3", "PETR4"]
+        assert [r["ticker"] for r in in_sector.rows] == ["ITUB4", "PETR4", "VALE3"]
+
+    def test_select_paginates(self):
+        """Test pagination totals and slicing"""
+        page = make_snapshot().select(2, 2, sort_by="ticker")
+
+        assert [r["ticker"] for r in page.rows] == ["MGLU3", "PETR4"]
+        assert page.total == 5
+        assert page.pages == 3
+        assert page.page == 2
+
+    def test_select_falls_back_for_unsupported_filters(self):
+        """Test that queries the engine cannot answer return None"""
+        snapshot = make_snapshot()
+
+        assert snapshot.select(1, 50, filters=[{"id": "price", "value": "25"}]) is None
+        assert snapshot.select(1, 50, filters=[{"id": "ticker", "value": "P%"}]) is None
+
+
+class TestScreenerEngine:
+
+    def test_engine_detects_numeric_columns(self):
+        """Test that numeric columns come from the model column types"""
+        engine = ScreenerEngine(Stock, STOCK_ALLOWED_COLS)
+
+        assert "price" in engine.numeric_cols
+        assert "magic_formula_rank" in engine.numeric_cols
+        assert "sectorname" not in engine.numeric_cols
+
+    def test_list_stocks_uses_engine_when_enabled(self, app):
+        """Test list_stocks serves pages from the engine snapshot"""
+        app.config["SCREENER_ENGINE_ENABLED"] = True
+        snapshot = make_snapshot()
+
+        with (
+            patch("services.stock_services.Favorite.query") as mock_favorite_query,
+            patch("services.stock_services.Stock.query") as mock_stock_query,
+            patch("services.stock_services.get_predictions_for_tickers") as mock_pm,
+            patch(
+                "services.stock_services.stock_screener.snapshot",
+                return_value=snapshot,
+            ),
+        ):
+            favorite = MagicMock()
+            favorite.stock_ticker = "PETR4"
+            mock_favorite_query.filter_by.return_value.all.return_value = [favorite]
+            mock_pm.return_value = {}
+
+            result, status_code = list_stocks(1, sort_by="dy", sort_dir="desc")
+
+            assert status_code == 200
+            data = result.get_json()
+            assert data["pagination"]["total"] == 5
+            assert data["data"][1]["ticker"] == "PETR4"
+            assert data["data"][1]["favorita"] is True
+            assert "favorita" not in snapshot.rows[3]
+            mock_stock_query.outerjoin.assert_not_called()
@@ -0,0 +1,182 @@
+import statistics
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+
+from models.sector_stat import SectorStat
+from services.sector_stats_service import (
+    SectorStatsCache,
+    get_sector_stats,
+    group_stats,
+    refresh_sector_stats,
+)
+
+
+def make_stat(group, metric, median, level="sector", asset="stocks"):
+    return SectorStat(
+        asset=asset,
+        level=level,
+        group_name=group,
+        metric=metric,
+        size=3,
+        count=3,
+        mean=median,
+        median=median,
+        p25=median,
+        p75=median,
+        min=median,
+        max=median,
+        updated_at=datetime(2026, 10, 1),
+    )
+
+
+class TestGroupStats:
+
+    def test_group_stats_matches_statistics(self):
+        """Test per-group aggregates against the statistics module"""
+        labels = ["Bancos", "Energia", "Bancos", None, "Bancos", "Energia"]
+        matrix = np.array(
+            [
+                [5.0, 1.0],
+                [10.0, 2.0],
+                [7.0, np.nan],
+                [99.0, 99.0],
+                [9.0, 3.0],
+                [12.0, 4.0],
+            ]
+        )
+
+        result = {group: rest for group, *rest in group_stats(labels, matrix)}
+
+        assert sorted(result) == ["Bancos", "Energia"]
+        size, counts, means, quantiles = result["Bancos"]
+        assert size == 3
+        assert counts.tolist() == [3, 2]
+        assert means[0] == statistics.mean([5.0, 7.0, 9.0])
+        assert quantiles[2, 0] == statistics.median([5.0, 7.0, 9.0])
+        assert quantiles[0, 1] == 1.0 and quantiles[4, 1] == 3.0
+
+    def test_group_stats_all_missing_metric(self):
+        """Test that a metric without values yields NaN and a zero count"""
+        matrix = np.array([[1.0, np.nan], [2.0, np.nan]])
+
+        [(group, size, counts, means, quantiles)] = group_stats(["A", "A"], matrix)
+
+        assert counts.tolist() == [2, 0]
+        assert np.isnan(means[1])
+        assert np.isnan(quantiles[:, 1]).all()
+
+    def test_group_stats_without_labels(self):
+        """Test that rows without a group produce no output"""
+        assert list(group_stats([None, None], np.ones((2, 1)))) == []
+
+
+class TestRefreshSectorStats:
+
+    def test_refresh_replaces_rows_and_bumps_version(self, app):
+        """Test that stats are rewritten and the version bumped, not committed"""
+        rows = [("Bancos", "Bancos", "Grandes", 10.0, 5.0) + (None,) * 24 + (1.0, 2.0)]
+        with (
+            patch("services.sector_stats_service.db.session") as mock_db_session,
+            patch("services.sector_stats_service.bump_version") as mock_bump,
+        ):
+            mock_db_session.execute.return_value.all.return_value = rows
+
+            written = refresh_sector_stats("stocks")
+
+            # 3 níveis x 28 métricas
+            assert written == 84
+            inserted = mock_db_session.execute.call_args_list[-1].args[1]
+            p_l = next(
+                r for r in inserted if r["level"] == "segment" and r["metric"] == "p_l"
+            )
+            assert p_l["group_name"] == "Grandes"
+            assert p_l["median"] == 5.0 and p_l["count"] == 1
+            assert next(r for r in inserted if r["metric"] == "roe")["mean"] is None
+            mock_bump.assert_called_once_with("sector_stats")
+            mock_db_session.commit.assert_not_called()
+
+
+class TestGetSectorStats:
+
+    def cache_with(self, stats):
+        cache = SectorStatsCache()
+        patcher_version = patch(
+            "services.sector_stats_service.get_version", return_value=1
+        )
+        patcher_session = patch("services.sector_stats_service.db.session")
+        patcher_version.start()
+        mock_db_session = patcher_session.start()
+        mock_db_session.query.return_value.order_by.return_value = stats
+        cache.get()
+        patcher_session.stop()
+        patcher_version.stop()
+        return cache
+
+    def test_get_sector_stats_filters_metrics(self, app):
+        """Test that only the requested metrics are returned"""
+        cache = self.cache_with(
+            [make_stat("Bancos", "p_l", 6.0), make_stat("Bancos", "dy", 0.08)]
+        )
+        with (
+            patch("services.sector_stats_service.sector_stats_cache", cache),
+            patch("services.sector_stats_service.get_version", return_value=1),
+        ):
+            response, status = get_sector_stats("stocks", "sector", None, "p_l,bogus")
+
+        assert status == 200
+        data = response.get_json()
+        assert data["updated_at"] == "2026-10-01T00:00:00"
+        assert data["data"] == [
+            {
+                "group": "Bancos",
+                "size": 3,
+                "metrics": {
+                    "p_l": {
+                        "count": 3,
+                        "mean": 6.0,
+                        "median": 6.0,
+                        "p25": 6.0,
+                        "p75": 6.0,
+                        "min": 6.0,
+                        "max": 6.0,
+                    }
+                },
+            }
+        ]
+
+    def test_get_sector_stats_unknown_group(self, app):
+        """Test that an unknown group returns 404"""
+        cache = self.cache_with([make_stat("Bancos", "p_l", 6.0)])
+        with (
+            patch("services.sector_stats_service.sector_stats_cache", cache),
+            patch("services.sector_stats_service.get_version", return_value=1),
+        ):
+            response, status = get_sector_stats("stocks", "sector", "Varejo")
+
+        assert status == 404
+
+    def test_get_sector_stats_invalid_level(self, app):
+        """Test that an unknown level returns 400"""
+        response, status = get_sector_stats("fiis", "segmentname")
+
+        assert status == 400
+        assert response.get_json()["message"] == "Invalid level"
+
+    def test_cache_reloads_on_version_change(self, app):
+        """Test that the cache reads the table again only when the version moves"""
+        cache = SectorStatsCache()
+        with (
+            patch("services.sector_stats_service.db.session") as mock_db_session,
+            patch("services.sector_stats_service.get_version") as mock_version,
+        ):
+            query = mock_db_session.query.return_value.order_by
+            query.return_value = [make_stat("Bancos", "p_l", 6.0)]
+            mock_version.return_value = 1
+            cache.get()
+            cache.get()
+            mock_version.return_value = 2
+            cache.get()
+
+            assert query.call_count == 2
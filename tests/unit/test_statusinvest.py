@@ -0,0 +1,161 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from services.statusinvest import STOCK_CATEGORY, fetch_category
+
+
+def paged_responses(
+    universe, total=None, fail_page=None, max_take=None, together=(), barrier=None
+):
+    """requests.get falso que pagina universe conforme page/take (limitado a
+    max_take, como um servidor que ignora takes grandes).
+
+    As páginas em together só respondem quando todas estão em andamento ao
+    mesmo tempo (barrier); get.max_in_flight guarda o maior número de
+    chamadas simultâneas.
+    """
+    calls = []
+    lock = threading.Lock()
+    in_flight = [0]
+
+    def get(url, params=None, headers=None, timeout=None):
+        page, take = params["page"], params["take"]
+        with lock:
+            calls.append((page, take, timeout))
+            in_flight[0] += 1
+            get.max_in_flight = max(get.max_in_flight, in_flight[0])
+        try:
+            if page in together:
+                barrier.wait()
+        finally:
+            with lock:
+                in_flight[0] -= 1
+        if max_take is not None:
+            take = min(take, max_take)
+        response = MagicMock()
+        response.status_code = 500 if page == fail_page else 200
+        response.json.return_value = {
+            "list": universe[page * take : (page + 1) * take],
+            "totalResults": len(universe) if total is None else total,
+        }
+        return response
+
+    get.max_in_flight = 0
+    return get, calls
+
+
+def make_universe(size):
+    return [{"ticker": f"T{i:04d}", "price": float(i)} for i in range(size)]
+
+
+class TestFetchCategory:
+
+    def test_fetch_category_merges_all_pages_in_order(self, app):
+        """Test that every page is requested and merged in page order"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        app.config["STATUSINVEST_TIMEOUT"] = 3
+        universe = make_universe(35)
+        get, calls = paged_responses(universe)
+        with patch("services.ingestion_http.requests.Session.get", side_effect=get):
+            result = fetch_category(STOCK_CATEGORY, {})
+
+        assert [item["ticker"] for item in result["list"]] == [
+            item["ticker"] for item in universe
+        ]
+        assert result["totalResults"] == 35
+        assert sorted(page for page, _, _ in calls) == [0, 1, 2, 3]
+        assert all(take == 10 and timeout == (5.0, 3) for _, take, timeout in calls)
+
+    def test_fetch_category_uses_configured_base_url(self, app):
+        """Test that STATUSINVEST_BASE_URL points the search elsewhere"""
+        app.config["STATUSINVEST_BASE_URL"] = "http://127.0.0.1:8765/"
+        get, _ = paged_responses(make_universe(3))
+        with patch(
+            "services.ingestion_http.requests.Session.get", side_effect=get
+        ) as mock_get:
+            fetch_category(STOCK_CATEGORY, {})
+
+        assert mock_get.call_args.args[0] == (
+            "http://127.0.0.1:8765/category/advancedsearchresultpaginated"
+        )
+
+    def test_fetch_category_requests_pages_in_parallel(self, app):
+        """Test that remaining pages overlap, up to STATUSINVEST_MAX_WORKERS"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        app.config["STATUSINVEST_MAX_WORKERS"] = 3
+        # As páginas 1 a 3 só respondem juntas: em série a barreira estoura.
+        get, calls = paged_responses(
+            make_universe(60),
+            together={1, 2, 3},
+            barrier=threading.Barrier(3, timeout=5),
+        )
+        with patch("services.ingestion_http.requests.Session.get", side_effect=get):
+            result = fetch_category(STOCK_CATEGORY, {})
+
+        assert len(result["list"]) == 60
+        assert 1 < get.max_in_flight <= 3
+        # A página 5 vem cheia, então a 6 é lida para ver se o universo cresceu.
+        assert sorted(page for page, _, _ in calls) == [0, 1, 2, 3, 4, 5, 6]
+
+    def test_fetch_category_fails_when_a_page_fails(self, app):
+        """Test that a failed page discards the whole universe"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        app.config["INGESTION_HTTP_RETRIES"] = 0
+        get, _ = paged_responses(make_universe(30), fail_page=2)
+        with patch("services.ingestion_http.requests.Session.get", side_effect=get):
+            assert fetch_category(STOCK_CATEGORY, {}) is None
+
+    def test_fetch_category_follows_universe_growth(self, app):
+        """Test that a full last page triggers reads past totalResults"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        get, calls = paged_responses(make_universe(25), total=20)
+        with patch("services.ingestion_http.requests.Session.get", side_effect=get):
+            result = fetch_category(STOCK_CATEGORY, {})
+
+        assert len(result["list"]) == 25
+        assert sorted(page for page, _, _ in calls) == [0, 1, 2]
+
+    def test_fetch_category_stops_on_repeated_page(self, app):
+        """Test that a server ignoring the page parameter does not loop"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {
+            "list": make_universe(10),
+            "totalResults": 10,
+        }
+        with patch(
+            "services.ingestion_http.requests.Session.get", return_value=response
+        ) as mock_get:
+            result = fetch_category(STOCK_CATEGORY, {})
+
+        assert len(result["list"]) == 10
+        assert mock_get.call_count == 2
+
+    def test_fetch_category_steps_by_capped_page_size(self, app):
+        """Test that a server capping take is paged by its real page size"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        universe = make_universe(23)
+        get, calls = paged_responses(universe, max_take=5)
+        with patch("services.ingestion_http.requests.Session.get", side_effect=get):
+            result = fetch_category(STOCK_CATEGORY, {})
+
+        assert [item["ticker"] for item in result["list"]] == [
+            item["ticker"] for item in universe
+        ]
+        assert sorted((page, take) for page, take, _ in calls) == [
+            (0, 10),
+            (1, 5),
+            (2, 5),
+            (3, 5),
+            (4, 5),
+        ]
+
+    def test_fetch_category_fails_when_results_are_missing(self, app):
+        """Test that fewer results than totalResults discard the universe"""
+        app.config["STATUSINVEST_PAGE_SIZE"] = 10
+        get, calls = paged_responses(make_universe(23), total=30)
+        with patch("services.ingestion_http.requests.Session.get", side_effect=get):
+            assert fetch_category(STOCK_CATEGORY, {}) is None
+
+        assert sorted(page for page, _, _ in calls) == [0, 1, 2, 3]
@@ -7,7 +7,7 @@ from services.stock_services import (
     delete_stock,
     get_all_stocks_from_statusinvest,
     update_all_stocks,
-    calculate_ey,
+    batch_stocks,
 )
 from models.stock import Stock
 from models.favorite import Favorite
@@ -39,21 +39,22 @@ class TestStockServices:
             mock_paginated.pages = 1
             mock_paginated.page = 1
 
+            mock_paginated.items = [(mock_stock, None)]
+
             with (
                 patch("services.stock_services.Stock.query") as mock_stock_query,
                 patch("services.stock_services.Favorite.query") as mock_favorite_query,
-                patch("services.stock_services.get_latest_predictions_map") as mock_pm,
                 patch(
                     "services.stock_services.attach_ml_fields",
                     side_effect=lambda s, p: s,
                 ) as _,
             ):
 
-                mock_stock_query.paginate.return_value = mock_paginated
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.paginate.return_value = mock_paginated
                 mock_favorite_query.filter_by.return_value.all.return_value = [
                     mock_favorite
                 ]
-                mock_pm.return_value = {}
 
                 result, status_code = list_stocks(sample_user.id)
 
@@ -77,12 +78,11 @@ class TestStockServices:
             with (
                 patch("services.stock_services.Stock.query") as mock_stock_query,
                 patch("services.stock_services.Favorite.query") as mock_favorite_query,
-                patch("services.stock_services.get_latest_predictions_map") as mock_pm,
             ):
 
-                mock_stock_query.paginate.return_value = mock_paginated
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.paginate.return_value = mock_paginated
                 mock_favorite_query.filter_by.return_value.all.return_value = []
-                mock_pm.return_value = {}
 
                 result, status_code = list_stocks(1)
 
@@ -99,7 +99,8 @@ class TestStockServices:
                 patch("services.stock_services.Favorite.query") as mock_favorite_query,
             ):
                 mock_favorite_query.filter_by.return_value.all.return_value = []
-                mock_stock_query.paginate.side_effect = Exception("Database error")
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.paginate.side_effect = Exception("Database error")
 
                 result, status_code = list_stocks(1)
 
@@ -122,15 +123,17 @@ class TestStockServices:
             }
 
             with (
-                patch("services.stock_services.db.session") as mock_db_session,
-                patch("services.stock_services.get_latest_predictions_map") as mock_pm,
+                patch("services.stock_services.Stock.query") as mock_stock_query,
                 patch(
                     "services.stock_services.attach_ml_fields",
                     side_effect=lambda s, p: s,
                 ) as _,
             ):
-                mock_db_session.get.return_value = mock_stock
-                mock_pm.return_value = {}
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.filter.return_value.first.return_value = (
+                    mock_stock,
+                    None,
+                )
 
                 result, status_code = view_stock("PETR4")
 
@@ -138,11 +141,46 @@ class TestStockServices:
                 result_data = result.get_json()
                 assert result_data["ticker"] == "PETR4"
 
+    def test_batch_stocks_reports_missing_in_request_order(self, app):
+        """Test batch lookup with one IN query and missing tickers"""
+        with app.app_context():
+            with (
+                patch("services.stock_services.Favorite.query") as mock_fav_query,
+                patch("services.stock_services.Stock.query") as mock_stock_query,
+            ):
+                favorite = MagicMock()
+                favorite.stock_ticker = "VALE3"
+                mock_fav_query.filter_by.return_value.all.return_value = [favorite]
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.filter.return_value.all.return_value = [
+                    (Stock(ticker="PETR4", price=30.0), None),
+                    (Stock(ticker="VALE3", price=60.0), None),
+                ]
+
+                result, status_code = batch_stocks(1, ["VALE3", "XXXX3", "PETR4"])
+
+                assert status_code == 200
+                data = result.get_json()
+                assert [s["ticker"] for s in data["data"]] == ["VALE3", "PETR4"]
+                assert data["data"][0]["favorita"] is True
+                assert data["missing"] == ["XXXX3"]
+
+    def test_batch_stocks_validates_ticker_count(self, app):
+        """Test empty and oversized ticker lists"""
+        with app.app_context():
+            _, empty_status = batch_stocks(1, [])
+            result, status_code = batch_stocks(1, [f"T{i}" for i in range(301)])
+
+            assert empty_status == 400
+            assert status_code == 400
+            assert "At most 300" in result.get_json()["message"]
+
     def test_view_stock_not_found(self, app):
         """Test viewing a stock that doesn't exist"""
         with app.app_context():
-            with patch("services.stock_services.db.session") as mock_db_session:
-                mock_db_session.get.return_value = None
+            with patch("services.stock_services.Stock.query") as mock_stock_query:
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.filter.return_value.first.return_value = None
 
                 result, status_code = view_stock("INVALID")
 
@@ -154,7 +192,8 @@ class TestStockServices:
         """Test viewing a stock when an exception occurs"""
         with app.app_context():
             with patch("services.stock_services.Stock.query") as mock_stock_query:
-                mock_stock_query.get.side_effect = Exception("Database error")
+                joined = mock_stock_query.outerjoin.return_value.add_entity
+                joined.return_value.filter.side_effect = Exception("Database error")
 
                 result, status_code = view_stock("PETR4")
 
@@ -359,7 +398,7 @@ class TestStockServices:
                 result_data = result.get_json()
                 assert "An error occurred" in result_data["message"]
 
-    @patch("services.stock_services.requests.get")
+    @patch("services.ingestion_http.requests.Session.get")
     def test_get_all_stocks_from_statusinvest_success(self, mock_get):
         """Test successful retrieval of stocks from StatusInvest"""
         mock_response = MagicMock()
@@ -386,8 +425,9 @@ class TestStockServices:
         assert len(result["list"]) == 1
         assert result["list"][0]["ticker"] == "PETR4"
 
-    @patch("services.stock_services.requests.get")
-    def test_get_all_stocks_from_statusinvest_http_error(self, mock_get):
+    @patch("services.ingestion_http.time.sleep")
+    @patch("services.ingestion_http.requests.Session.get")
+    def test_get_all_stocks_from_statusinvest_http_error(self, mock_get, mock_sleep):
         """Test retrieval of stocks when HTTP error occurs"""
         mock_response = MagicMock()
         mock_response.status_code = 500
@@ -396,8 +436,11 @@ class TestStockServices:
         result = get_all_stocks_from_statusinvest()
 
         assert result is None
+        # 500 é transitório: 1 chamada + 3 novas tentativas
+        assert mock_get.call_count == 4
+        assert mock_sleep.call_count == 3
 
-    @patch("services.stock_services.requests.get")
+    @patch("services.ingestion_http.requests.Session.get")
     def test_get_all_stocks_from_statusinvest_exception(self, mock_get):
         """Test retrieval of stocks when an exception occurs"""
         mock_get.side_effect = Exception("Network error")
@@ -406,29 +449,6 @@ class TestStockServices:
 
         assert result is None
 
-    def test_calculate_ey(self):
-        """Test calculation of earnings yield"""
-        # Test normal case
-        stock_data = {"lpa": 5.0, "price": 25.0}
-        result = calculate_ey(stock_data)
-        expected = 5.0 / 25.0
-        assert result == expected
-
-        # Test zero price (should return 0)
-        stock_data = {"lpa": 5.0, "price": 0.0}
-        result = calculate_ey(stock_data)
-        assert result == 0.0
-
-        # Test zero lpa (should return 0)
-        stock_data = {"lpa": 0.0, "price": 25.0}
-        result = calculate_ey(stock_data)
-        assert result == 0.0
-
-        # Test missing values (should return 0)
-        stock_data = {}
-        result = calculate_ey(stock_data)
-        assert result == 0.0
-
     @patch("services.stock_services.get_all_stocks_from_statusinvest")
     def test_update_all_stocks_success(self, mock_get_stocks, app):
         """Test successful update of all stocks"""
@@ -449,21 +469,19 @@ class TestStockServices:
                 ]
             }
 
-            mock_existing_stock = MagicMock(spec=Stock)
-            mock_existing_stock.ticker = "PETR4"
-            mock_existing_stock.get_graham_formula.return_value = 20.0
-            mock_existing_stock.get_discount_to_graham.return_value = 10.0
-
             with (
-                patch("services.stock_services.Stock.query") as mock_stock_query,
+                patch("services.stock_services.write_changed_rows") as mock_write,
+                patch("services.stock_services.record_snapshot"),
                 patch("services.stock_services.db.session") as mock_db_session,
             ):
 
                 mock_get_stocks.return_value = mock_stock_data
-                mock_stock_query.filter.return_value.all.return_value = [
-                    mock_existing_stock
-                ]
-                mock_db_session.add_all = MagicMock()
+                mock_write.return_value = {
+                    "inserted": 0,
+                    "updated": 1,
+                    "unchanged": 0,
+                    "removed": 0,
+                }
                 mock_db_session.commit = MagicMock()
 
                 result, status_code = update_all_stocks()
@@ -471,6 +489,11 @@ class TestStockServices:
                 assert status_code == 200
                 result_data = result.get_json()
                 assert result_data["message"] == "Stocks updated successfully"
+                [row] = mock_write.call_args.args[2]
+                assert row["graham_formula"] == 47.43
+                assert row["discount_to_graham"] == -89.72
+                assert row["magic_formula_rank"] == 2
+                mock_db_session.commit.assert_called_once()
 
     @patch("services.stock_services.get_all_stocks_from_statusinvest")
     def test_update_all_stocks_no_data(self, mock_get_stocks, app):